@@ -1,5 +1,6 @@
 from django.contrib import admin
 from .models import Activity
+from .health import refresh_cow_health
 
 @admin.register(Activity)
 class ActivityAdmin(admin.ModelAdmin):
@@ -19,7 +20,7 @@ class ActivityAdmin(admin.ModelAdmin):
             'fields': ('scheduled_date', 'scheduled_time', 'start_time', 'end_time')
         }),
         ('Status & Details', {
-            'fields': ('status', 'description', 'notes')
+            'fields': ('status', 'health_status', 'description', 'notes')
         }),
         ('Cost', {
             'fields': ('cost',)
@@ -42,3 +43,11 @@ class ActivityAdmin(admin.ModelAdmin):
         elif request.user.role == 'AGENT':
             return qs.filter(cow__farm__agent=request.user)
         return qs.none()
+    
+    def delete_queryset(self, request, queryset):
+        """Bulk delete bypasses Activity.delete, so refresh cow health here"""
+        cow_ids = set(queryset.filter(
+            activity_type=Activity.ActivityType.HEALTH_CHECK
+        ).values_list('cow_id', flat=True))
+        super().delete_queryset(request, queryset)
+        refresh_cow_health(cow_ids)
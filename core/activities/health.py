@@ -0,0 +1,55 @@
+"""
+Maintenance of the cow health status denormalized from health check activities
+"""
+
+from collections import defaultdict
+
+from django.db.models import Case, Q, Value, When
+from django.utils import timezone
+
+from cows.models import Cow
+
+from .models import Activity
+
+def latest_health_checks(cow_ids):
+    """Return {cow_id: (health_status, scheduled_date)} from the latest health check per cow"""
+    latest = {}
+    rows = Activity.objects.filter(
+        cow_id__in=cow_ids,
+        activity_type=Activity.ActivityType.HEALTH_CHECK,
+        health_status__isnull=False
+    ).exclude(
+        status=Activity.Status.CANCELLED
+    ).order_by('cow_id', 'scheduled_date', 'id').values_list('cow_id', 'health_status', 'scheduled_date')
+    for cow_id, health_status, scheduled_date in rows:
+        latest[cow_id] = (health_status, scheduled_date)
+    return latest
+
+def refresh_cow_health(cow_ids):
+    """
+    Recompute Cow.health_status / last_health_check_date for the given cows
+    in a single UPDATE. Cows are grouped by their new values, which become
+    CASE branches; cows already holding them are left alone
+    """
+    cow_ids = set(cow_ids)
+    if not cow_ids:
+        return
+
+    latest = latest_health_checks(cow_ids)
+    groups = defaultdict(list)
+    for cow_id in sorted(cow_ids):
+        groups[latest.get(cow_id, (None, None))].append(cow_id)
+
+    changed = Q()
+    status_cases, date_cases = [], []
+    for (health_status, checked_on), group in groups.items():
+        changed |= Q(pk__in=group) & ~Q(health_status=health_status, last_health_check_date=checked_on)
+        status_cases.append(When(pk__in=group, then=Value(health_status)))
+        date_cases.append(When(pk__in=group, then=Value(checked_on)))
+
+    Cow.objects.filter(changed).update(
+        health_status=Case(*status_cases, output_field=Cow._meta.get_field('health_status')),
+        last_health_check_date=Case(*date_cases, output_field=Cow._meta.get_field('last_health_check_date')),
+        # update() skips auto_now, but report caches and ETags watch updated_at
+        updated_at=timezone.now()
+    )
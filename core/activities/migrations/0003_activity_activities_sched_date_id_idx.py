@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-17 01:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activities', '0002_initial'),
+        ('cows', '0003_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='activity',
+            index=models.Index(fields=['scheduled_date', 'id'], name='activities_sched_date_id_idx'),
+        ),
+    ]
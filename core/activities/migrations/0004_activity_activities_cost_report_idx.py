@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-17 01:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activities', '0003_activity_activities_sched_date_id_idx'),
+        ('cows', '0003_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='activity',
+            index=models.Index(fields=['scheduled_date', 'status', 'activity_type', 'cow', 'cost'], name='activities_cost_report_idx'),
+        ),
+    ]
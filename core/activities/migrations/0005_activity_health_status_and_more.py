@@ -0,0 +1,27 @@
+# Generated by Django 5.2.5 on 2026-10-17 01:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activities', '0004_activity_activities_cost_report_idx'),
+        ('cows', '0003_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='activity',
+            name='health_status',
+            field=models.CharField(blank=True, choices=[('HEALTHY', 'Healthy'), ('SICK', 'Sick'), ('RECOVERING', 'Recovering')], help_text='Health status recorded by a health check', max_length=20, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='activity',
+            index=models.Index(fields=['activity_type', 'status', 'scheduled_date'], name='activities_type_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='activity',
+            index=models.Index(fields=['cow', 'activity_type', 'scheduled_date'], name='activities_cow_type_date_idx'),
+        ),
+    ]
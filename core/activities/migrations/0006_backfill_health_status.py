@@ -0,0 +1,58 @@
+import re
+
+from django.db import migrations
+
+STATUS_PATTERN = re.compile(r'Status:\s*(HEALTHY|SICK|RECOVERING)\b')
+BATCH_SIZE = 2000
+
+def backfill_health_status(apps, schema_editor):
+    """
+    Parse the health status HealthCheckLogSerializer embedded in descriptions
+    ("Status: SICK | Vet: ...") into Activity.health_status, then set each
+    cow's status from its latest health check
+    """
+    Activity = apps.get_model('activities', 'Activity')
+    Cow = apps.get_model('cows', 'Cow')
+
+    checks = Activity.objects.filter(
+        activity_type='HEALTH_CHECK', health_status__isnull=True
+    ).only('id', 'description', 'title')
+    batch = []
+    for activity in checks.iterator(chunk_size=BATCH_SIZE):
+        match = STATUS_PATTERN.search(activity.description or '') or STATUS_PATTERN.search(
+            (activity.title or '').replace('Health Check:', 'Status:')
+        )
+        if match:
+            activity.health_status = match.group(1)
+            batch.append(activity)
+        if len(batch) >= BATCH_SIZE:
+            Activity.objects.bulk_update(batch, ['health_status'])
+            batch = []
+    if batch:
+        Activity.objects.bulk_update(batch, ['health_status'])
+
+    latest = {}
+    rows = Activity.objects.filter(
+        activity_type='HEALTH_CHECK', health_status__isnull=False
+    ).exclude(status='CANCELLED').order_by('cow_id', 'scheduled_date', 'id').values_list(
+        'cow_id', 'health_status', 'scheduled_date'
+    )
+    for cow_id, health_status, scheduled_date in rows.iterator(chunk_size=BATCH_SIZE):
+        latest[cow_id] = (health_status, scheduled_date)
+
+    cows = []
+    for cow in Cow.objects.filter(pk__in=list(latest)).only('id'):
+        cow.health_status, cow.last_health_check_date = latest[cow.pk]
+        cows.append(cow)
+    Cow.objects.bulk_update(cows, ['health_status', 'last_health_check_date'], batch_size=BATCH_SIZE)
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('activities', '0005_activity_health_status_and_more'),
+        ('cows', '0004_cow_health_status_cow_last_health_check_date_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_health_status, migrations.RunPython.noop),
+    ]
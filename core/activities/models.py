@@ -1,6 +1,21 @@
 from django.db import models
 from cows.models import Cow
 
+def duration_in_minutes(start_time, end_time):
+    """Minutes between start and end, or None until both are set"""
+    if start_time and end_time:
+        duration = end_time - start_time
+        return duration.total_seconds() / 60
+    return None
+
+def activity_is_overdue(status, scheduled_date, scheduled_time):
+    """Whether a planned activity's scheduled time has passed"""
+    from datetime import datetime
+    if status == Activity.Status.PLANNED:
+        scheduled_datetime = datetime.combine(scheduled_date, scheduled_time or datetime.min.time())
+        return scheduled_datetime < datetime.now()
+    return False
+
 class Activity(models.Model):
     """
     Activity model for tracking various farm activities related to cows
@@ -87,6 +102,14 @@ class Activity(models.Model):
         help_text="Additional notes about the activity"
     )
     
+    health_status = models.CharField(
+        max_length=20,
+        choices=Cow.HealthStatus.choices,
+        blank=True,
+        null=True,
+        help_text="Health status recorded by a health check"
+    )
+    
     # Cost and resources
     cost = models.DecimalField(
         max_digits=10,
@@ -105,23 +128,56 @@ class Activity(models.Model):
         verbose_name = 'Activity'
         verbose_name_plural = 'Activities'
         ordering = ['-scheduled_date', '-scheduled_time']
+        indexes = [
+            # Keyset pagination seeks on (scheduled_date, id)
+            models.Index(fields=['scheduled_date', 'id'], name='activities_sched_date_id_idx'),
+            # Cost reports range-scan scheduled_date and read the rest from the index
+            models.Index(
+                fields=['scheduled_date', 'status', 'activity_type', 'cow', 'cost'],
+                name='activities_cost_report_idx'
+            ),
+            # Health reports count pending / recent activities of one type
+            models.Index(fields=['activity_type', 'status', 'scheduled_date'], name='activities_type_status_idx'),
+            # Latest health check per cow
+            models.Index(fields=['cow', 'activity_type', 'scheduled_date'], name='activities_cow_type_date_idx'),
+        ]
     
     def __str__(self):
         return f"{self.title} - {self.cow.tag_number} ({self.get_activity_type_display()})"
     
+    def save(self, *args, **kwargs):
+        """Override save to keep the cow's denormalized health status in step"""
+        previous = None
+        if self.pk:
+            previous = Activity.objects.filter(pk=self.pk).values('cow_id', 'activity_type').first()
+        
+        super().save(*args, **kwargs)
+        
+        cow_ids = set()
+        if self.activity_type == Activity.ActivityType.HEALTH_CHECK:
+            cow_ids.add(self.cow_id)
+        if previous and previous['activity_type'] == Activity.ActivityType.HEALTH_CHECK:
+            cow_ids.add(previous['cow_id'])
+        if cow_ids:
+            from .health import refresh_cow_health
+            refresh_cow_health(cow_ids)
+    
+    def delete(self, *args, **kwargs):
+        """Override delete to keep the cow's denormalized health status in step"""
+        cow_id = self.cow_id
+        is_health_check = self.activity_type == Activity.ActivityType.HEALTH_CHECK
+        result = super().delete(*args, **kwargs)
+        if is_health_check:
+            from .health import refresh_cow_health
+            refresh_cow_health([cow_id])
+        return result
+    
     @property
     def duration_minutes(self):
         """Calculate activity duration in minutes"""
-        if self.start_time and self.end_time:
-            duration = self.end_time - self.start_time
-            return duration.total_seconds() / 60
-        return None
+        return duration_in_minutes(self.start_time, self.end_time)
     
     @property
     def is_overdue(self):
         """Check if the activity is overdue"""
-        from datetime import datetime
-        if self.status == Activity.Status.PLANNED:
-            scheduled_datetime = datetime.combine(self.scheduled_date, self.scheduled_time or datetime.min.time())
-            return scheduled_datetime < datetime.now()
-        return False
+        return activity_is_overdue(self.status, self.scheduled_date, self.scheduled_time)
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Activity
+from .models import Activity, duration_in_minutes, activity_is_overdue
 from cows.serializers import CowSerializer
 from cows.models import Cow
 from datetime import datetime, date
@@ -14,13 +14,17 @@ class ActivitySerializer(serializers.ModelSerializer):
     )
     duration_minutes = serializers.ReadOnlyField()
     is_overdue = serializers.ReadOnlyField()
+    flat_fields = {
+        'duration_minutes': (['start_time', 'end_time'], duration_in_minutes),
+        'is_overdue': (['status', 'scheduled_date', 'scheduled_time'], activity_is_overdue),
+    }
     
     class Meta:
         model = Activity
         fields = [
             'id', 'title', 'activity_type', 'cow', 'cow_id', 'scheduled_date',
             'scheduled_time', 'start_time', 'end_time', 'status', 'description',
-            'notes', 'cost', 'duration_minutes', 'is_overdue', 'created_at', 'updated_at'
+            'notes', 'health_status', 'cost', 'duration_minutes', 'is_overdue', 'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'duration_minutes', 'is_overdue', 'created_at', 'updated_at']
 
@@ -31,6 +35,10 @@ class ActivityListSerializer(serializers.ModelSerializer):
     farm_name = serializers.CharField(source='cow.farm.name', read_only=True)
     duration_minutes = serializers.ReadOnlyField()
     is_overdue = serializers.ReadOnlyField()
+    flat_fields = {
+        'duration_minutes': (['start_time', 'end_time'], duration_in_minutes),
+        'is_overdue': (['status', 'scheduled_date', 'scheduled_time'], activity_is_overdue),
+    }
     
     class Meta:
         model = Activity
@@ -256,12 +264,11 @@ class HealthCheckLogSerializer(serializers.ModelSerializer):
         """Create activity with health check data"""
         # Extract custom fields that don't exist in Activity model
         cow_tag = validated_data.pop('cow_tag', None)
-        health_status = validated_data.pop('health_status', None)
         symptoms = validated_data.pop('symptoms', None)
         treatment = validated_data.pop('treatment', None)
         veterinarian = validated_data.pop('veterinarian', None)
         
-        # Create the activity
+        # health_status is stored on the activity (and rolled up onto the cow)
         activity = Activity.objects.create(**validated_data)
         
         return activity
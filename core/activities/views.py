@@ -4,25 +4,39 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from .models import Activity
+from cows.models import Cow
+from farms.models import Farm
+from users.models import User
 from .serializers import (
     ActivitySerializer, ActivityListSerializer, ActivityLogSerializer,
     VaccinationLogSerializer, HealthCheckLogSerializer, CalvingLogSerializer
 )
 from core_service.permissions import ActivityPermission
+from core_service.conditional import ConditionalGetMixin
+from core_service.queries import ActionQuerysetMixin
+from core_service.flat import FlatViewMixin
 from django.db import models
 from datetime import date, timedelta
 
 # Create your views here.
 
-class ActivityViewSet(viewsets.ModelViewSet):
+class ActivityViewSet(ConditionalGetMixin, FlatViewMixin, ActionQuerysetMixin, viewsets.ModelViewSet):
     """ViewSet for Activity model with role-based access"""
     queryset = Activity.objects.all()
+    etag_models = [Cow, Farm, User]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['activity_type', 'status', 'scheduled_date', 'cow__breed', 'cow__farm']
     search_fields = ['title', 'cow__tag_number', 'cow__name', 'description', 'notes']
     ordering_fields = ['scheduled_date', 'scheduled_time', 'created_at']
     ordering = ['-scheduled_date', '-scheduled_time']
     permission_classes = [ActivityPermission]
+    select_related_by_action = {
+        'list': ['cow__farm'],
+        'cow_activities': ['cow__farm'],
+        'overdue_activities': ['cow__farm'],
+        'upcoming_activities': ['cow__farm'],
+        'default': ['cow__farmer', 'cow__farm__agent'],
+    }
     
     def get_queryset(self):
         """Filter queryset based on user role"""
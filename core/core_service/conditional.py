@@ -0,0 +1,100 @@
+import hashlib
+from datetime import date
+
+from django.db.models import Count, Max, Subquery
+from django.utils.http import http_date, parse_http_date_safe
+from rest_framework import status
+from rest_framework.response import Response
+
+from .metrics import CONDITIONAL_REQUESTS, route_name
+
+class ConditionalGetMixin:
+    """
+    Strong ETag / Last-Modified support for list and retrieve
+
+    Validators come from MAX(updated_at) and COUNT(*) over the same scoped,
+    filtered queryset the action serializes, so a matching If-None-Match is
+    answered with 304 before any rows are loaded or serialized.
+
+    etag_models lists the other models the serializers render (nested objects,
+    names); each adds its table's newest updated_at, read from an updated_at
+    index, so the validators never join the scoped rows to related tables.
+    Counts of related rows are not aggregated either: writes that change a
+    farm's cows or a cow's milk records bump the parent's updated_at
+    (touch_farms, touch_cows).
+    """
+    etag_models = []
+
+    def get_conditional_validators(self, queryset):
+        """Return (etag, last_modified) for the given scoped queryset"""
+        aggregates = {
+            'count': Count('pk'),
+            'updated_at': Max('updated_at'),
+        }
+        for model in self.etag_models:
+            # Uncorrelated, so it is evaluated once rather than per scoped row
+            latest = model._base_manager.order_by('-updated_at').values('updated_at')[:1]
+            aggregates[f'{model._meta.db_table}_updated_at'] = Max(Subquery(latest))
+        values = queryset.order_by().aggregate(**aggregates)
+
+        timestamps = [
+            value for name, value in values.items()
+            if name.endswith('updated_at') and value is not None
+        ]
+        last_modified = max(timestamps) if timestamps else None
+
+        parts = [
+            self.request.get_full_path(),
+            self.action,
+            self.request.accepted_renderer.format,
+            self.request.user.pk,
+            date.today().isoformat(),
+        ] + [f'{name}={value}' for name, value in sorted(values.items())]
+        digest = hashlib.sha256('|'.join(str(part) for part in parts).encode()).hexdigest()
+        return f'"{digest[:32]}"', last_modified
+
+    def _is_not_modified(self, request, etag, last_modified, honor_modified_since):
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match:
+            candidates = [candidate.strip() for candidate in if_none_match.split(',')]
+            return any(candidate.removeprefix('W/') == etag for candidate in candidates)
+
+        # If-Modified-Since cannot see deletions, so lists rely on the ETag only
+        if_modified_since = request.headers.get('If-Modified-Since')
+        if honor_modified_since and if_modified_since and last_modified:
+            since = parse_http_date_safe(if_modified_since)
+            return since is not None and int(last_modified.timestamp()) <= since
+        return False
+
+    def _conditional_response(self, request, queryset, render, honor_modified_since=False):
+        etag, last_modified = self.get_conditional_validators(queryset)
+        not_modified = self._is_not_modified(request, etag, last_modified, honor_modified_since)
+        if 'If-None-Match' in request.headers or 'If-Modified-Since' in request.headers:
+            CONDITIONAL_REQUESTS.labels(
+                route=route_name(request), result='not_modified' if not_modified else 'modified'
+            ).inc()
+        if not_modified:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = render()
+        if response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            response['ETag'] = etag
+            if last_modified:
+                response['Last-Modified'] = http_date(last_modified.timestamp())
+        return response
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return self._conditional_response(
+            request, queryset, lambda: super(ConditionalGetMixin, self).list(request, *args, **kwargs)
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.filter_queryset(self.get_queryset()).filter(
+            **{self.lookup_field: kwargs[lookup_url_kwarg]}
+        )
+        return self._conditional_response(
+            request, queryset, lambda: super(ConditionalGetMixin, self).retrieve(request, *args, **kwargs),
+            honor_modified_since=True
+        )
@@ -0,0 +1,191 @@
+"""
+Serializer-free read path (?view=flat)
+A FlatPlan is built once per serializer class from its declared fields: every
+readable field becomes a column lookup plus a converter reproducing DRF's
+representation (Decimal quantized to a string, ISO dates, UTC as "Z"), and
+nested serializers become nested dicts read from joined columns. Lists then
+render straight from a values_list() projection and details from the already
+loaded instance, without building any DRF field objects per row.
+
+Fields that are not columns (properties, method fields, annotations) are
+declared on the serializer as
+
+    flat_fields = {'name': ([lookups...], function)}
+
+where the function receives the looked-up values; a None function returns
+the single lookup unchanged (for annotations).
+"""
+
+import decimal
+from functools import lru_cache
+from operator import attrgetter
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.response import Response
+from rest_framework.settings import ISO_8601, api_settings
+
+VALUE, DATETIME, COMPUTED, NESTED = range(4)
+
+def full_name(first_name, last_name):
+    """User.get_full_name from the two name columns"""
+    return f'{first_name} {last_name}'.strip()
+
+def _decimal_converter(field):
+    if field.normalize_output or field.localize:
+        return field.to_representation
+    if not getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING):
+        return field.quantize
+    quantum = decimal.Decimal('.1') ** field.decimal_places if field.decimal_places is not None else None
+    context = decimal.getcontext().copy()
+    if field.max_digits is not None:
+        context.prec = field.max_digits
+
+    def convert(value):
+        if quantum is not None:
+            value = value.quantize(quantum, rounding=field.rounding, context=context)
+        return f'{value:f}'
+    return convert
+
+def _datetime(value, tz):
+    # DateTimeField.enforce_timezone, with the current timezone looked up once per render
+    if tz is not None and value.utcoffset() is not None:
+        value = value.astimezone(tz)
+    value = value.isoformat()
+    return value[:-6] + 'Z' if value.endswith('+00:00') else value
+
+def _current_timezone():
+    return timezone.get_current_timezone() if settings.USE_TZ else None
+
+def _isoformat(value):
+    return value.isoformat()
+
+def _converter(field):
+    """Per-value conversion matching field.to_representation; None when values pass through"""
+    if isinstance(field, serializers.DecimalField):
+        return _decimal_converter(field)
+    if isinstance(field, serializers.DateTimeField):
+        if getattr(field, 'format', api_settings.DATETIME_FORMAT) != ISO_8601 or getattr(field, 'timezone', None):
+            return field.to_representation
+        return _datetime
+    if isinstance(field, serializers.DateField):
+        if getattr(field, 'format', api_settings.DATE_FORMAT) != ISO_8601:
+            return field.to_representation
+        return _isoformat
+    if isinstance(field, serializers.TimeField):
+        if getattr(field, 'format', api_settings.TIME_FORMAT) != ISO_8601:
+            return field.to_representation
+        return _isoformat
+    return None
+
+def _is_column(model, lookup):
+    for name in lookup.split('__'):
+        try:
+            field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return False
+        model = field.related_model
+    return not field.is_relation
+
+class FlatPlan:
+    """Column lookups and a render plan for one serializer class"""
+
+    def __init__(self, serializer_class):
+        self.serializer_class = serializer_class
+        self.lookups = []
+        self._positions = {}
+        self._fields = self._plan(serializer_class(), '')
+        self._getters = [attrgetter(lookup.replace('__', '.')) for lookup in self.lookups]
+
+    def _position(self, lookup):
+        if lookup not in self._positions:
+            self._positions[lookup] = len(self.lookups)
+            self.lookups.append(lookup)
+        return self._positions[lookup]
+
+    def _plan(self, serializer, prefix):
+        model = serializer.Meta.model
+        declared = getattr(type(serializer), 'flat_fields', {})
+        plan = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if name in declared:
+                lookups, function = declared[name]
+                plan.append((name, COMPUTED, [self._position(prefix + lookup) for lookup in lookups], function))
+            elif isinstance(field, serializers.BaseSerializer):
+                relation = field.source.replace('.', '__')
+                null_check = None
+                if model._meta.get_field(relation).null:
+                    null_check = self._position(f'{prefix}{relation}__pk')
+                plan.append((name, NESTED, self._plan(field, f'{prefix}{relation}__'), null_check))
+            else:
+                lookup = field.source.replace('.', '__')
+                if not _is_column(model, lookup):
+                    raise ImproperlyConfigured(
+                        f'{type(serializer).__name__}.{name} is not a column; declare it in flat_fields'
+                    )
+                converter = _converter(field)
+                kind = DATETIME if converter is _datetime else VALUE
+                plan.append((name, kind, self._position(prefix + lookup), converter))
+        return plan
+
+    def _render(self, plan, row, tz):
+        item = {}
+        for name, kind, source, extra in plan:
+            if kind == VALUE:
+                value = row[source]
+                item[name] = value if extra is None or value is None else extra(value)
+            elif kind == DATETIME:
+                value = row[source]
+                item[name] = None if value is None else _datetime(value, tz)
+            elif kind == COMPUTED:
+                values = [row[position] for position in source]
+                item[name] = values[0] if extra is None else extra(*values)
+            else:
+                item[name] = None if extra is not None and row[extra] is None else self._render(source, row, tz)
+        return item
+
+    def render_rows(self, rows):
+        """Representations of values_list(*plan.lookups) rows"""
+        plan, tz = self._fields, _current_timezone()
+        return [self._render(plan, row, tz) for row in rows]
+
+    def render_instance(self, instance):
+        """Representation of one model instance, read through its loaded relations"""
+        return self._render(self._fields, [getter(instance) for getter in self._getters], _current_timezone())
+
+@lru_cache(maxsize=None)
+def flat_plan(serializer_class):
+    """The cached FlatPlan of a serializer class"""
+    return FlatPlan(serializer_class)
+
+class FlatViewMixin:
+    """
+    Opt-in flat representation for list and retrieve (?view=flat)
+
+    The response has the same shape as the action's serializer. Lists select
+    only the plan's columns; retrieve still goes through get_object(), so
+    object permissions are checked as before.
+    """
+    flat_actions = ('list', 'retrieve')
+
+    def use_flat_view(self):
+        return self.action in self.flat_actions and self.request.query_params.get('view') == 'flat'
+
+    def list(self, request, *args, **kwargs):
+        if not self.use_flat_view():
+            return super().list(request, *args, **kwargs)
+        plan = flat_plan(self.get_serializer_class())
+        rows = self.filter_queryset(self.get_queryset()).values_list(*plan.lookups)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(plan.render_rows(page))
+        return Response(plan.render_rows(rows))
+
+    def retrieve(self, request, *args, **kwargs):
+        if not self.use_flat_view():
+            return super().retrieve(request, *args, **kwargs)
+        return Response(flat_plan(self.get_serializer_class()).render_instance(self.get_object()))
@@ -0,0 +1,109 @@
+"""
+Prometheus metrics for the core API
+prometheus_client instruments in a registry of the service's own, rendered
+at /metrics/. Values are per worker process; scrape each worker or run a
+single one under load.
+"""
+
+import time
+from contextlib import ExitStack
+
+from django.db import connections
+from django.http import HttpResponse
+from django.urls import Resolver404, resolve
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+
+CONTENT_TYPE = CONTENT_TYPE_LATEST
+UNMATCHED_ROUTE = "unmatched"
+
+REGISTRY = CollectorRegistry()
+
+REQUESTS = Counter(
+    "farmhub_core_http_requests_total", "HTTP requests by method, route and status",
+    ("method", "route", "status"), registry=REGISTRY
+)
+REQUEST_LATENCY = Histogram(
+    "farmhub_core_http_request_duration_seconds", "HTTP request latency by method and route",
+    ("method", "route"), registry=REGISTRY
+)
+IN_FLIGHT = Gauge(
+    "farmhub_core_http_requests_in_flight", "HTTP requests currently being served", ("route",),
+    registry=REGISTRY
+)
+DB_QUERIES = Counter(
+    "farmhub_core_db_queries_total", "Database statements run, by route and connection alias",
+    ("route", "database"), registry=REGISTRY
+)
+DB_QUERY_LATENCY = Histogram(
+    "farmhub_core_db_query_duration_seconds", "Database statement latency by route and connection alias",
+    ("route", "database"), registry=REGISTRY
+)
+DB_QUERY_ERRORS = Counter(
+    "farmhub_core_db_query_errors_total", "Database statements that raised, by route", ("route", "database"),
+    registry=REGISTRY
+)
+CONDITIONAL_REQUESTS = Counter(
+    "farmhub_core_conditional_requests_total",
+    "Requests carrying If-None-Match/If-Modified-Since, by route and whether a 304 was served",
+    ("route", "result"), registry=REGISTRY
+)
+
+def route_name(request):
+    """The URL name (or pattern) a request resolves to, to keep label cardinality bounded"""
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        try:
+            match = resolve(request.path_info)
+        except Resolver404:
+            return UNMATCHED_ROUTE
+    return match.view_name or match.route
+
+class QueryTimer:
+    """execute_wrapper hook timing every statement run on one connection"""
+
+    def __init__(self, route, database):
+        self.route = route
+        self.database = database
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        except Exception:
+            DB_QUERY_ERRORS.labels(route=self.route, database=self.database).inc()
+            raise
+        finally:
+            DB_QUERIES.labels(route=self.route, database=self.database).inc()
+            DB_QUERY_LATENCY.labels(route=self.route, database=self.database).observe(time.perf_counter() - start)
+
+class MetricsMiddleware:
+    """Records request counts, latency, in-flight requests and DB statements per route"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        route = route_name(request)
+        in_flight = IN_FLIGHT.labels(route=route)
+        in_flight.inc()
+        start = time.perf_counter()
+        status = 500
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(QueryTimer(route, connection.alias)))
+                response = self.get_response(request)
+            status = response.status_code
+            return response
+        finally:
+            REQUEST_LATENCY.labels(method=request.method, route=route).observe(time.perf_counter() - start)
+            REQUESTS.labels(method=request.method, route=route, status=status).inc()
+            in_flight.dec()
+
+def render():
+    """All metrics in the Prometheus text exposition format"""
+    return generate_latest(REGISTRY)
+
+def metrics_view(request):
+    """Serve the metrics for Prometheus to scrape"""
+    return HttpResponse(render(), content_type=CONTENT_TYPE)
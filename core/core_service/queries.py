@@ -0,0 +1,38 @@
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+def related_count(queryset, field):
+    """
+    Correlated COUNT of queryset rows whose `field` points at the outer row
+    Evaluated per returned row, so a paginated list never groups the whole table
+    """
+    counts = queryset.filter(**{field: OuterRef('pk')}).order_by().values(field).annotate(
+        count=Count('pk')
+    ).values('count')
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+class ActionQuerysetMixin:
+    """
+    Per-action joins and annotations, declared on the viewset
+
+    select_related_by_action and annotations_by_action map action names to
+    the relations and annotated values that action's serializer reads, so
+    every page costs a fixed number of queries whatever its size. The
+    'default' entry covers actions not listed (retrieve, update, ...).
+    Annotation values are callables returning fresh expressions.
+    """
+    select_related_by_action = {}
+    annotations_by_action = {}
+
+    def _for_action(self, declarations):
+        return declarations.get(self.action, declarations.get('default'))
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        related = self._for_action(self.select_related_by_action)
+        if related:
+            queryset = queryset.select_related(*related)
+        annotations = self._for_action(self.annotations_by_action)
+        if annotations:
+            queryset = queryset.annotate(**{name: build() for name, build in annotations.items()})
+        return queryset
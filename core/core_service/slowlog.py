@@ -0,0 +1,127 @@
+"""
+Slow-query log for the core API
+Statements slower than SLOW_QUERY_THRESHOLD_MS are logged with their bound
+parameters, calling route and duration, and kept in a ring buffer served to
+super admins at /api/admin/slow-queries/. With SLOW_QUERY_EXPLAIN enabled the
+plan is captured too: EXPLAIN (ANALYZE, BUFFERS) on PostgreSQL, EXPLAIN QUERY
+PLAN on SQLite.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+
+from .metrics import route_name
+from .permissions import IsSuperAdmin
+
+# Longest parameter repr kept per entry, so bulk IN lists do not flood the log
+MAX_PARAMETERS_LENGTH = 2000
+
+logger = logging.getLogger('core_service.slow_queries')
+
+_entries = deque(maxlen=settings.SLOW_QUERY_LOG_SIZE)
+_lock = threading.Lock()
+# Set while an EXPLAIN runs, so it is not itself timed and explained
+_local = threading.local()
+
+def _explainable(sql):
+    # ANALYZE executes the statement again, so only ever explain reads
+    words = sql.lstrip().split(None, 1)
+    return bool(words) and words[0].upper() in ('SELECT', 'WITH')
+
+def _explain(connection, sql, params):
+    """Run EXPLAIN for a statement on the connection that executed it"""
+    if connection.vendor == 'postgresql':
+        prefix = 'EXPLAIN (ANALYZE, BUFFERS) '
+    elif connection.vendor == 'sqlite':
+        prefix = 'EXPLAIN QUERY PLAN '
+    else:
+        return None
+
+    _local.explaining = True
+    try:
+        # The savepoint keeps a failed EXPLAIN from aborting the caller's transaction
+        with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            cursor.execute(prefix + sql, params)
+            rows = cursor.fetchall()
+    finally:
+        _local.explaining = False
+    # SQLite rows are (id, parent, notused, detail), PostgreSQL rows are one plan line each
+    return '\n'.join(str(row[-1]) for row in rows)
+
+def record(sql, params, duration_ms, route, plan=None):
+    """Log a slow statement and keep it in the ring buffer"""
+    params = repr(params)
+    if len(params) > MAX_PARAMETERS_LENGTH:
+        params = params[:MAX_PARAMETERS_LENGTH] + '...'
+    entry = {
+        'at': timezone.now().isoformat(),
+        'route': route,
+        'duration_ms': round(duration_ms, 2),
+        'statement': sql,
+        'parameters': params,
+        'plan': plan,
+    }
+    with _lock:
+        _entries.append(entry)
+    logger.warning('Slow query (%.1f ms) on %s: %s params=%s', duration_ms, route, sql, params)
+    return entry
+
+def entries():
+    """Buffered slow queries, newest first"""
+    with _lock:
+        return list(reversed(_entries))
+
+class SlowQueryLogger:
+    """execute_wrapper hook recording statements over the threshold"""
+
+    def __init__(self, route):
+        self.route = route
+
+    def __call__(self, execute, sql, params, many, context):
+        if getattr(_local, 'explaining', False):
+            return execute(sql, params, many, context)
+
+        start = time.perf_counter()
+        result = execute(sql, params, many, context)
+        duration_ms = (time.perf_counter() - start) * 1000
+        if duration_ms >= settings.SLOW_QUERY_THRESHOLD_MS:
+            plan = None
+            if settings.SLOW_QUERY_EXPLAIN and not many and _explainable(sql):
+                try:
+                    plan = _explain(context['connection'], sql, params)
+                except Exception as exc:
+                    plan = f'EXPLAIN failed: {exc}'
+            record(sql, params, duration_ms, self.route, plan)
+        return result
+
+class SlowQueryMiddleware:
+    """Watches every statement run while a request is served"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        slow_query_logger = SlowQueryLogger(route_name(request))
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(slow_query_logger))
+            return self.get_response(request)
+
+@api_view(['GET'])
+@permission_classes([IsSuperAdmin])
+def slow_queries_view(request):
+    """Statements over the slow-query threshold, newest first, with their plans when captured"""
+    return Response({
+        'threshold_ms': settings.SLOW_QUERY_THRESHOLD_MS,
+        'explain': settings.SLOW_QUERY_EXPLAIN,
+        'queries': entries(),
+    })
@@ -0,0 +1,308 @@
+"""
+Query and latency budgets for every core API endpoint
+Seeds a dataset shaped by [dataset] in query_budgets.toml, calls each [[core]]
+entry as a super admin, an agent and a farmer, and fails when a response has
+the wrong status, runs more SQL statements than its budget or takes longer
+than its wall-clock budget. Also covers the conditional GET validators and
+the /metrics exposition.
+
+Run with a local database, e.g.
+    DATABASE_URL=sqlite:///db.sqlite3 python manage.py test core_service
+"""
+
+import json
+import os
+import time
+import tomllib
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve
+
+from activities.models import Activity
+from cows.models import Cow
+from farms.models import Farm
+from milk.models import MilkRecord
+from users.models import User
+
+BUDGETS_PATH = Path(settings.BASE_DIR).parent / 'query_budgets.toml'
+ROLES = ('super_admin', 'agent', 'farmer')
+PASSWORD = 'budget-password'
+
+# Slow CI runners can stretch the wall-clock budgets without touching the table
+TIME_SCALE = float(os.environ.get('QUERY_BUDGET_TIME_SCALE', '1'))
+
+ACTIVITY_TYPES = (
+    Activity.ActivityType.FEEDING,
+    Activity.ActivityType.HEALTH_CHECK,
+    Activity.ActivityType.VACCINATION,
+    Activity.ActivityType.MILKING,
+    Activity.ActivityType.MEDICATION,
+    Activity.ActivityType.WEIGHING,
+)
+
+def load_budgets():
+    with open(BUDGETS_PATH, 'rb') as budgets_file:
+        return tomllib.load(budgets_file)
+
+def for_role(value, role):
+    """Budget values are either one value for every role or a table keyed by role"""
+    return value[role] if isinstance(value, dict) else value
+
+def fill(value, context):
+    """Substitute {placeholders} in a path or a (nested) request body"""
+    if isinstance(value, str):
+        return value.format(**context)
+    if isinstance(value, dict):
+        return {key: fill(item, context) for key, item in value.items()}
+    if isinstance(value, list):
+        return [fill(item, context) for item in value]
+    return value
+
+def seed_dataset(sizes):
+    """
+    Bulk-insert users, farms, cows, milk records and activities
+    Returns the users per role and the placeholder values for the budget
+    table's paths, which point at the first agent's first farm, that farm's
+    first farmer and that farmer's cows.
+    """
+    today = date.today()
+    password = make_password(PASSWORD)
+
+    def user(username, role, **extra):
+        return User(username=username, email=f'{username}@farmhub.test', password=password, role=role, **extra)
+
+    admin = User.objects.bulk_create([
+        user('budget_admin', User.Role.SUPER_ADMIN, is_staff=True, is_superuser=True)
+    ])[0]
+    agents = User.objects.bulk_create([
+        user(f'budget_agent_{a}', User.Role.AGENT) for a in range(sizes['agents'])
+    ])
+    farms = Farm.objects.bulk_create([
+        Farm(name=f'Budget Farm {a}-{f}', agent=agent, location='Budget Valley', size_acres=Decimal('120.00'))
+        for a, agent in enumerate(agents)
+        for f in range(sizes['farms_per_agent'])
+    ])
+    farmers = User.objects.bulk_create([
+        user(f'budget_farmer_{farm.pk}_{n}', User.Role.FARMER)
+        for farm in farms
+        for n in range(sizes['farmers_per_farm'])
+    ])
+    farmer_farms = [farm for farm in farms for _ in range(sizes['farmers_per_farm'])]
+    cows = Cow.objects.bulk_create([
+        Cow(
+            tag_number=f'BUD-{farmer.pk}-{c}',
+            name=f'Cow {c}',
+            farmer=farmer,
+            farm=farm,
+            date_of_birth=today - timedelta(days=900 + c * 30),
+        )
+        for farmer, farm in zip(farmers, farmer_farms)
+        for c in range(sizes['cows_per_farmer'])
+    ])
+
+    milk_records = []
+    for index, cow in enumerate(cows):
+        for day in range(1, sizes['milk_days'] + 1):
+            morning = Decimal(10 + (index + day) % 5) + Decimal('0.50')
+            evening = Decimal(8 + (index * day) % 4)
+            milk_records.append(MilkRecord(
+                cow=cow,
+                farmer_id=cow.farmer_id,
+                farm_id=cow.farm_id,
+                date=today - timedelta(days=day),
+                morning_quantity_liters=morning,
+                evening_quantity_liters=evening,
+                total_quantity_liters=morning + evening,
+            ))
+    MilkRecord.objects.bulk_create(milk_records)
+
+    # Spread activities around today so the overdue and upcoming lists are not empty
+    statuses = (Activity.Status.COMPLETED, Activity.Status.PLANNED)
+    activities = []
+    for cow in cows:
+        for n in range(sizes['activities_per_cow']):
+            activity_type = ACTIVITY_TYPES[n % len(ACTIVITY_TYPES)]
+            activities.append(Activity(
+                title=f'{activity_type.label} {n}',
+                activity_type=activity_type,
+                cow=cow,
+                scheduled_date=today + timedelta(days=n * 3 - 12),
+                status=statuses[n % 2],
+                health_status=Cow.HealthStatus.HEALTHY if activity_type == Activity.ActivityType.HEALTH_CHECK else None,
+                cost=Decimal('15.00'),
+            ))
+    Activity.objects.bulk_create(activities)
+
+    farm = farms[0]
+    farmer = farmers[0]
+    farmer_cows = [cow for cow in cows if cow.farmer_id == farmer.pk]
+    cow = farmer_cows[0]
+    users = {'super_admin': admin, 'agent': agents[0], 'farmer': farmer}
+    context = {
+        'password': PASSWORD,
+        'today': today.isoformat(),
+        'farm_id': farm.pk,
+        'farm_name': farm.name,
+        'farmer_id': farmer.pk,
+        'cow_id': cow.pk,
+        'cow_tag': cow.tag_number,
+        'milk_record_id': MilkRecord.objects.filter(cow=cow).order_by('-date').values_list('pk', flat=True)[0],
+        'activity_id': Activity.objects.filter(cow=cow).order_by('pk').values_list('pk', flat=True)[0],
+    }
+    context.update({f'cow_tag_{n}': farmer_cow.tag_number for n, farmer_cow in enumerate(farmer_cows)})
+    return users, context
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class EndpointBudgetTests(TestCase):
+    """Every core endpoint stays within its query and wall-clock budget for every role"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.budgets = load_budgets()
+        cls.users, cls.context = seed_dataset(cls.budgets['dataset'])
+
+    def request(self, entry, role):
+        """Make one request inside a rolled-back transaction, returning (response, queries, ms)"""
+        user = self.users[role]
+        self.client.force_login(user)
+        context = dict(self.context, username=user.username)
+        path = fill(entry['path'], context)
+        call = getattr(self.client, entry.get('method', 'GET').lower())
+        kwargs = {}
+        if 'body' in entry:
+            kwargs = {'data': json.dumps(fill(entry['body'], context)), 'content_type': 'application/json'}
+
+        with transaction.atomic():
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                response = call(path, **kwargs)
+                elapsed_ms = (time.perf_counter() - start) * 1000
+            # Writes are undone so every role sees the same seeded data
+            transaction.set_rollback(True)
+        return response, queries, elapsed_ms
+
+    def test_every_router_endpoint_has_a_budget(self):
+        from core_service.urls import router
+
+        router_names = {pattern.name for pattern in router.urls}
+        budgeted = {entry['name'] for entry in self.budgets['core']}
+        self.assertEqual(sorted(router_names - budgeted), [], 'Add these URLs to query_budgets.toml')
+
+    def test_endpoint_budgets(self):
+        default_ms = self.budgets['defaults']['max_ms']
+        for entry in self.budgets['core']:
+            path = fill(entry['path'], self.context)
+            self.assertEqual(resolve(path.split('?')[0]).url_name, entry['name'], f'{path} is not {entry["name"]}')
+            # Warm-up call, so import and URL-resolver costs are not charged to the first role
+            self.request(entry, ROLES[0])
+
+            for role in ROLES:
+                with self.subTest(endpoint=entry['name'], role=role):
+                    response, queries, elapsed_ms = self.request(entry, role)
+                    label = f'{entry.get("method", "GET")} {path} as {role}'
+                    self.assertEqual(
+                        response.status_code, for_role(entry.get('status', 200), role),
+                        f'{label}: {response.content[:300]!r}',
+                    )
+                    query_budget = for_role(entry['queries'], role)
+                    self.assertLessEqual(
+                        len(queries), query_budget,
+                        f'{label} ran {len(queries)} queries (budget {query_budget}):\n'
+                        + '\n'.join(query['sql'] for query in queries.captured_queries),
+                    )
+                    ms_budget = for_role(entry.get('max_ms', default_ms), role) * TIME_SCALE
+                    self.assertLessEqual(
+                        elapsed_ms, ms_budget, f'{label} took {elapsed_ms:.0f} ms (budget {ms_budget:.0f} ms)'
+                    )
+
+class ConditionalGetTests(TestCase):
+    """List ETags answer 304 until the listed rows or the rows they render change"""
+
+    def setUp(self):
+        self.agent = User.objects.create(username='etag_agent', role=User.Role.AGENT)
+        self.farmer = User.objects.create(username='etag_farmer', role=User.Role.FARMER)
+        self.farm = Farm.objects.create(
+            name='ETag Farm', agent=self.agent, location='Test Valley', size_acres=Decimal('50.00')
+        )
+        self.cow = Cow.objects.create(
+            tag_number='ETAG-1', farmer=self.farmer, farm=self.farm, date_of_birth=date(2020, 1, 1)
+        )
+        MilkRecord.objects.create(
+            cow=self.cow, farmer=self.farmer, farm=self.farm, date=date(2024, 5, 1),
+            morning_quantity_liters=Decimal('9.00')
+        )
+        self.client.force_login(User.objects.create(username='etag_admin', role=User.Role.SUPER_ADMIN))
+
+    def etag(self, path):
+        response = self.client.get(path)
+        self.assertEqual(response.status_code, 200)
+        return response['ETag']
+
+    def assert_changes(self, path, write):
+        etag = self.etag(path)
+        write()
+        self.assertEqual(self.client.get(path, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        self.assertNotEqual(self.etag(path), etag)
+
+    def test_matching_etag_is_not_modified(self):
+        for path in ('/api/milk-records/', '/api/activities/', '/api/cows/', '/api/farms/'):
+            with self.subTest(path=path):
+                etag = self.etag(path)
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.get(path, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response['ETag'], etag)
+                validators = [query['sql'] for query in queries.captured_queries if 'MAX(' in query['sql']]
+                self.assertEqual(len(validators), 1)
+                self.assertNotIn('JOIN', validators[0])
+
+    def test_related_edits_change_the_etag(self):
+        def rename_cow():
+            self.cow.name = 'Daisy'
+            self.cow.save()
+
+        def rename_agent():
+            self.agent.first_name = 'Renamed'
+            self.agent.save()
+
+        self.assert_changes('/api/milk-records/', rename_cow)
+        self.assert_changes('/api/cows/', rename_agent)
+        self.assert_changes('/api/farms/', rename_agent)
+
+    def test_cow_writes_change_the_farm_list_etag(self):
+        other_farm = Farm.objects.create(
+            name='Other ETag Farm', agent=self.agent, location='Test Valley', size_acres=Decimal('20.00')
+        )
+        added = Cow(tag_number='ETAG-2', farmer=self.farmer, farm=self.farm, date_of_birth=date(2021, 1, 1))
+
+        def move():
+            added.farm = other_farm
+            added.save()
+
+        self.assert_changes('/api/farms/', added.save)
+        self.assert_changes('/api/farms/', move)
+        self.assert_changes('/api/farms/', added.delete)
+
+class MetricsTests(TestCase):
+    """The /metrics exposition carries per-route request and statement series"""
+
+    def test_per_route_query_count(self):
+        user = User.objects.create(username='metrics_admin', role=User.Role.SUPER_ADMIN)
+        self.client.force_login(user)
+        self.client.get('/api/farms/')
+
+        body = self.client.get('/metrics').content.decode()
+        counts = [
+            line for line in body.splitlines()
+            if line.startswith('farmhub_core_db_queries_total{') and 'route="farm-list"' in line
+        ]
+        self.assertTrue(counts, body[:500])
+        self.assertGreaterEqual(float(counts[0].split()[-1]), 1)
+        self.assertIn('# TYPE farmhub_core_http_request_duration_seconds histogram', body)
@@ -23,6 +23,9 @@ from rest_framework_simplejwt.views import (
     TokenVerifyView,
 )
 
+from core_service.metrics import metrics_view
+from core_service.slowlog import slow_queries_view
+
 # Import viewsets
 from users.views import UserViewSet
 from farms.views import FarmViewSet
@@ -42,6 +45,8 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include(router.urls)),
     path('api-auth/', include('rest_framework.urls')),
+    path('api/admin/slow-queries/', slow_queries_view, name='slow-queries'),
+    path('metrics', metrics_view, name='metrics'),
     
     # JWT Authentication endpoints
     path('api/auth/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
@@ -1,4 +1,7 @@
 from django.contrib import admin
+from django.db import transaction
+from farms.models import touch_farms
+from milk.rollups import apply_milk_rollup_deltas, cascaded_milk_rows
 from .models import Cow
 
 @admin.register(Cow)
@@ -6,7 +9,7 @@ class CowAdmin(admin.ModelAdmin):
     """Admin for Cow model"""
     
     list_display = ('tag_number', 'name', 'breed', 'farmer', 'farm', 'status', 'age_years', 'is_pregnant', 'created_at')
-    list_filter = ('breed', 'status', 'is_pregnant', 'created_at', 'farmer__role', 'farm')
+    list_filter = ('breed', 'status', 'health_status', 'is_pregnant', 'created_at', 'farmer__role', 'farm')
     search_fields = ('tag_number', 'name', 'farmer__username', 'farmer__first_name', 'farmer__last_name', 'farm__name')
     ordering = ('tag_number',)
     
@@ -18,7 +21,7 @@ class CowAdmin(admin.ModelAdmin):
             'fields': ('date_of_birth', 'weight_kg', 'height_cm')
         }),
         ('Status & Health', {
-            'fields': ('status', 'is_pregnant', 'last_breeding_date')
+            'fields': ('status', 'is_pregnant', 'last_breeding_date', 'health_status', 'last_health_check_date')
         }),
         ('Timestamps', {
             'fields': ('created_at', 'updated_at'),
@@ -26,7 +29,7 @@ class CowAdmin(admin.ModelAdmin):
         }),
     )
     
-    readonly_fields = ('created_at', 'updated_at', 'age_years')
+    readonly_fields = ('created_at', 'updated_at', 'age_years', 'health_status', 'last_health_check_date')
     
     def get_queryset(self, request):
         """Filter cows based on user role"""
@@ -38,3 +41,13 @@ class CowAdmin(admin.ModelAdmin):
         elif request.user.role == 'AGENT':
             return qs.filter(farm__agent=request.user)
         return qs.none()
+    
+    def delete_queryset(self, request, queryset):
+        """Bulk delete bypasses Cow.delete, so apply the rollup deltas and bump the cows' farms here"""
+        with transaction.atomic():
+            cow_ids = list(queryset.values_list('pk', flat=True))
+            farm_ids = list(queryset.values_list('farm_id', flat=True).distinct())
+            removed = cascaded_milk_rows(cow_ids=cow_ids)
+            super().delete_queryset(request, queryset)
+            apply_milk_rollup_deltas(removed=removed)
+            touch_farms(farm_ids)
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.5 on 2026-10-17 01:52
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cows', '0003_initial'),
+        ('farms', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cow',
+            name='health_status',
+            field=models.CharField(blank=True, choices=[('HEALTHY', 'Healthy'), ('SICK', 'Sick'), ('RECOVERING', 'Recovering')], help_text='Health status recorded by the latest health check', max_length=20, null=True),
+        ),
+        migrations.AddField(
+            model_name='cow',
+            name='last_health_check_date',
+            field=models.DateField(blank=True, help_text='Date of the latest health check', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='cow',
+            index=models.Index(fields=['farm', 'health_status'], name='cows_farm_health_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cow',
+            index=models.Index(fields=['health_status'], name='cows_health_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cow',
+            index=models.Index(fields=['is_pregnant', 'last_breeding_date'], name='cows_breeding_idx'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.5 on 2026-10-17 03:03
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cows', '0004_cow_health_status_cow_last_health_check_date_and_more'),
+        ('farms', '0003_farm_farms_updated_at_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cow',
+            index=models.Index(fields=['updated_at'], name='cows_updated_at_idx'),
+        ),
+    ]
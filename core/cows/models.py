@@ -1,6 +1,12 @@
-from django.db import models
+from django.db import models, transaction
 from users.models import User
-from farms.models import Farm
+from farms.models import Farm, touch_farms
+
+def age_in_years(date_of_birth):
+    """Whole years from date_of_birth to today"""
+    from datetime import date
+    today = date.today()
+    return today.year - date_of_birth.year - ((today.month, today.day) < (date_of_birth.month, date_of_birth.day))
 
 class Cow(models.Model):
     """
@@ -20,6 +26,11 @@ class Cow(models.Model):
         SOLD = 'SOLD', 'Sold'
         DECEASED = 'DECEASED', 'Deceased'
     
+    class HealthStatus(models.TextChoices):
+        HEALTHY = 'HEALTHY', 'Healthy'
+        SICK = 'SICK', 'Sick'
+        RECOVERING = 'RECOVERING', 'Recovering'
+    
     # Basic information
     tag_number = models.CharField(
         max_length=50,
@@ -97,6 +108,21 @@ class Cow(models.Model):
         help_text="Date of last breeding"
     )
     
+    # Denormalized from the latest health check activity
+    health_status = models.CharField(
+        max_length=20,
+        choices=HealthStatus.choices,
+        blank=True,
+        null=True,
+        help_text="Health status recorded by the latest health check"
+    )
+    
+    last_health_check_date = models.DateField(
+        blank=True,
+        null=True,
+        help_text="Date of the latest health check"
+    )
+    
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -106,13 +132,53 @@ class Cow(models.Model):
         verbose_name = 'Cow'
         verbose_name_plural = 'Cows'
         ordering = ['tag_number']
+        indexes = [
+            # Health reports count cows per status, optionally per farm
+            models.Index(fields=['farm', 'health_status'], name='cows_farm_health_idx'),
+            models.Index(fields=['health_status'], name='cows_health_status_idx'),
+            # Breeding schedule looks up pregnant cows by breeding date
+            models.Index(fields=['is_pregnant', 'last_breeding_date'], name='cows_breeding_idx'),
+            # Conditional GET validators read the table's newest updated_at
+            models.Index(fields=['updated_at'], name='cows_updated_at_idx'),
+        ]
     
     def __str__(self):
         return f"{self.tag_number} - {self.name or 'Unnamed'} ({self.get_breed_display()})"
     
+    def save(self, *args, **kwargs):
+        """Override save to bump the farms whose cow count changes"""
+        with transaction.atomic():
+            previous = Cow.objects.filter(pk=self.pk).values_list('farm_id', flat=True).first() if self.pk else None
+            super().save(*args, **kwargs)
+            if previous != self.farm_id:
+                touch_farms([self.farm_id] + ([previous] if previous else []))
+    
+    def delete(self, *args, **kwargs):
+        """
+        Override delete to keep the production rollups in step, as the cow's
+        milk records cascade without MilkRecord.delete(), and to bump the farm
+        whose cow count changes
+        """
+        from milk.rollups import apply_milk_rollup_deltas, cascaded_milk_rows
+        with transaction.atomic():
+            removed = cascaded_milk_rows(cow_ids=[self.pk])
+            result = super().delete(*args, **kwargs)
+            apply_milk_rollup_deltas(removed=removed)
+            touch_farms([self.farm_id])
+        return result
+    
     @property
     def age_years(self):
         """Calculate cow's age in years"""
-        from datetime import date
-        today = date.today()
-        return today.year - self.date_of_birth.year - ((today.month, today.day) < (self.date_of_birth.month, self.date_of_birth.day))
+        return age_in_years(self.date_of_birth)
+
+def touch_cows(cow_ids):
+    """
+    Bump updated_at of the given cows. Cow responses render their milk record
+    count, and the conditional GET validators only read the cows' own
+    updated_at, so record inserts, deletes and moves call this
+    """
+    from django.utils import timezone
+    cow_ids = sorted(set(cow_ids))
+    if cow_ids:
+        Cow.objects.filter(pk__in=cow_ids).update(updated_at=timezone.now())
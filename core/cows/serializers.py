@@ -1,5 +1,6 @@
 from rest_framework import serializers
-from .models import Cow
+from .models import Cow, age_in_years
+from core_service.flat import full_name
 from users.serializers import UserSerializer
 from farms.serializers import FarmSerializer
 from users.models import User
@@ -20,16 +21,19 @@ class CowSerializer(serializers.ModelSerializer):
         write_only=True
     )
     age_years = serializers.ReadOnlyField()
+    flat_fields = {'age_years': (['date_of_birth'], age_in_years)}
     
     class Meta:
         model = Cow
         fields = [
             'id', 'tag_number', 'name', 'breed', 'farmer', 'farmer_id',
             'farm', 'farm_id', 'date_of_birth', 'weight_kg', 'height_cm',
-            'status', 'is_pregnant', 'last_breeding_date', 'age_years',
-            'created_at', 'updated_at'
+            'status', 'is_pregnant', 'last_breeding_date', 'health_status',
+            'last_health_check_date', 'age_years', 'created_at', 'updated_at'
+        ]
+        read_only_fields = [
+            'id', 'health_status', 'last_health_check_date', 'age_years', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'age_years', 'created_at', 'updated_at']
 
 class CowListSerializer(serializers.ModelSerializer):
     """Simplified serializer for cow lists"""
@@ -37,6 +41,11 @@ class CowListSerializer(serializers.ModelSerializer):
     farm_name = serializers.CharField(source='farm.name', read_only=True)
     age_years = serializers.ReadOnlyField()
     milk_records_count = serializers.SerializerMethodField()
+    flat_fields = {
+        'farmer_name': (['farmer__first_name', 'farmer__last_name'], full_name),
+        'age_years': (['date_of_birth'], age_in_years),
+        'milk_records_count': (['milk_records_count'], None),
+    }
     
     class Meta:
         model = Cow
@@ -47,4 +56,6 @@ class CowListSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'age_years', 'created_at']
     
     def get_milk_records_count(self, obj):
-        return obj.milk_records.count()
+        # Annotated by CowViewSet for lists; count directly anywhere else
+        count = getattr(obj, 'milk_records_count', None)
+        return obj.milk_records.count() if count is None else count
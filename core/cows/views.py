@@ -2,20 +2,35 @@ from django.shortcuts import render
 from rest_framework import viewsets, filters
 from django_filters.rest_framework import DjangoFilterBackend
 from .models import Cow
+from farms.models import Farm
+from users.models import User
 from .serializers import CowSerializer, CowListSerializer
 from core_service.permissions import CowPermission
+from core_service.conditional import ConditionalGetMixin
+from core_service.queries import ActionQuerysetMixin, related_count
+from core_service.flat import FlatViewMixin
+from milk.models import MilkRecord
 
 # Create your views here.
 
-class CowViewSet(viewsets.ModelViewSet):
+class CowViewSet(ConditionalGetMixin, FlatViewMixin, ActionQuerysetMixin, viewsets.ModelViewSet):
     """ViewSet for Cow model with role-based access"""
     queryset = Cow.objects.all()
+    # Milk record writes bump the cow's updated_at (touch_cows), which covers milk_records_count
+    etag_models = [Farm, User]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['breed', 'status', 'is_pregnant', 'farmer__role', 'farm']
     search_fields = ['tag_number', 'name', 'farmer__username', 'farmer__first_name', 'farmer__last_name', 'farm__name']
     ordering_fields = ['tag_number', 'name', 'date_of_birth', 'created_at']
     ordering = ['tag_number']
     permission_classes = [CowPermission]
+    select_related_by_action = {
+        'list': ['farmer', 'farm'],
+        'default': ['farmer', 'farm__agent'],
+    }
+    annotations_by_action = {
+        'list': {'milk_records_count': lambda: related_count(MilkRecord.objects.all(), 'cow')},
+    }
     
     def get_queryset(self):
         """Filter queryset based on user role"""
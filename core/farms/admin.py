@@ -1,4 +1,6 @@
 from django.contrib import admin
+from django.db import transaction
+from milk.rollups import apply_milk_rollup_deltas, cascaded_milk_rows
 from .models import Farm
 
 @admin.register(Farm)
@@ -33,3 +35,10 @@ class FarmAdmin(admin.ModelAdmin):
         elif request.user.role == 'AGENT':
             return qs.filter(agent=request.user)
         return qs.none()
+    
+    def delete_queryset(self, request, queryset):
+        """Bulk delete bypasses Farm.delete, so apply the rollup deltas here"""
+        with transaction.atomic():
+            removed = cascaded_milk_rows(farm_ids=list(queryset.values_list('pk', flat=True)))
+            super().delete_queryset(request, queryset)
+            apply_milk_rollup_deltas(removed=removed)
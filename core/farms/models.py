@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from users.models import User
 
 class Farm(models.Model):
@@ -48,6 +48,33 @@ class Farm(models.Model):
         verbose_name = 'Farm'
         verbose_name_plural = 'Farms'
         ordering = ['-created_at']
+        indexes = [
+            # Conditional GET validators read the table's newest updated_at
+            models.Index(fields=['updated_at'], name='farms_updated_at_idx'),
+        ]
     
     def __str__(self):
         return f"{self.name} (Managed by {self.agent.username})"
+    
+    def delete(self, *args, **kwargs):
+        """
+        Override delete to keep the production rollups in step: the farm's cows
+        cascade, and with them their milk records counted under other farms
+        """
+        from milk.rollups import apply_milk_rollup_deltas, cascaded_milk_rows
+        with transaction.atomic():
+            removed = cascaded_milk_rows(farm_ids=[self.pk])
+            result = super().delete(*args, **kwargs)
+            apply_milk_rollup_deltas(removed=removed)
+        return result
+
+def touch_farms(farm_ids):
+    """
+    Bump updated_at of the given farms. Farm lists render their cow count,
+    and the conditional GET validators only read the farms' own updated_at,
+    so cow inserts, deletes and moves call this
+    """
+    from django.utils import timezone
+    farm_ids = sorted(set(farm_ids))
+    if farm_ids:
+        Farm.objects.filter(pk__in=farm_ids).update(updated_at=timezone.now())
@@ -34,4 +34,6 @@ class FarmListSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
     
     def get_cow_count(self, obj):
-        return obj.cows.count()
+        # Annotated by FarmViewSet for lists; count directly anywhere else
+        count = getattr(obj, 'cow_count', None)
+        return obj.cows.count() if count is None else count
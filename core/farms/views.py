@@ -4,18 +4,30 @@ from django_filters.rest_framework import DjangoFilterBackend
 from .models import Farm
 from .serializers import FarmSerializer, FarmListSerializer
 from core_service.permissions import FarmPermission
+from core_service.conditional import ConditionalGetMixin
+from core_service.queries import ActionQuerysetMixin, related_count
+from cows.models import Cow
+from users.models import User
 
 # Create your views here.
 
-class FarmViewSet(viewsets.ModelViewSet):
+class FarmViewSet(ConditionalGetMixin, ActionQuerysetMixin, viewsets.ModelViewSet):
     """ViewSet for Farm model with role-based access"""
     queryset = Farm.objects.all()
+    # Cow writes bump the farm's updated_at (touch_farms), which covers cow_count
+    etag_models = [User]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['is_active', 'agent__role']
     search_fields = ['name', 'location', 'agent__username', 'agent__first_name', 'agent__last_name']
     ordering_fields = ['name', 'size_acres', 'created_at']
     ordering = ['-created_at']
     permission_classes = [FarmPermission]
+    select_related_by_action = {
+        'default': ['agent'],
+    }
+    annotations_by_action = {
+        'list': {'cow_count': lambda: related_count(Cow.objects.all(), 'farm')},
+    }
     
     def get_queryset(self):
         """Filter queryset based on user role"""
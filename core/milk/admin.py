@@ -1,5 +1,10 @@
 from django.contrib import admin
-from .models import MilkRecord
+from django.db import transaction
+
+from cows.models import touch_cows
+
+from .models import MilkRecord, ROLLUP_COLUMNS
+from .rollups import apply_milk_rollup_deltas
 
 @admin.register(MilkRecord)
 class MilkRecordAdmin(admin.ModelAdmin):
@@ -42,3 +47,13 @@ class MilkRecordAdmin(admin.ModelAdmin):
         elif request.user.role == 'AGENT':
             return qs.filter(farm__agent=request.user)
         return qs.none()
+    
+    def delete_queryset(self, request, queryset):
+        """Bulk delete bypasses MilkRecord.delete, so apply the rollup deltas here"""
+        with transaction.atomic():
+            removed = list(
+                MilkRecord.objects.select_for_update().filter(pk__in=queryset.values('pk')).values_list(*ROLLUP_COLUMNS)
+            )
+            super().delete_queryset(request, queryset)
+            apply_milk_rollup_deltas(removed=removed)
+            touch_cows(row[1] for row in removed)
@@ -0,0 +1,303 @@
+"""
+Vectorized milk yield analytics over cow x day matrices
+Daily yields are loaded per farm into a (cows, days) float matrix with NaN for
+days without a record, so statistics are computed for the whole herd at once
+with NumPy instead of looping over cows in Python. Farms are independent units
+of work and can be fanned out over a process pool.
+"""
+
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from decimal import Decimal
+from functools import partial
+
+import numpy as np
+from django.db import connections, models, transaction
+
+from .models import MilkRecord, MilkYieldAnomaly, MilkYieldForecast, FarmMilkYieldForecast
+
+ANOMALY_WINDOW = 14
+ANOMALY_MIN_PERIODS = 7
+ANOMALY_Z_THRESHOLD = 3.0
+ANOMALY_MIN_DROP = 0.15
+FORECAST_ALPHA = 0.3
+FORECAST_BETA = 0.05
+FORECAST_HISTORY_DAYS = 90
+FORECAST_HORIZONS = (7, 30)
+# Cows without a record this many days before the farm's newest one are left
+# out of the farm forecast
+FORECAST_ACTIVE_DAYS = 30
+WRITE_BATCH_SIZE = 5000
+
+YieldMatrix = namedtuple('YieldMatrix', ['cow_ids', 'start_date', 'values'])
+
+# One fetched milk record; NumPy parses dates and decimals from the driver's values
+YIELD_ROW = np.dtype([('cow_id', np.int64), ('date', 'datetime64[D]'), ('quantity', np.float64)])
+
+def load_yield_matrix(farm_id, start_date, end_date, cow_ids=None):
+    """
+    Load a farm's daily yields for [start_date, end_date] as a YieldMatrix:
+    values[i, d] is cow_ids[i]'s yield on start_date + d days, NaN if unrecorded
+    """
+    rows = MilkRecord.objects.filter(
+        farm_id=farm_id, date__gte=start_date, date__lte=end_date
+    )
+    if cow_ids is not None:
+        rows = rows.filter(cow_id__in=cow_ids)
+    rows = rows.values_list('cow_id', 'date', 'total_quantity_liters').order_by()
+    # Read from the cursor straight into one structured array, without the
+    # ORM's per-row converters or an intermediate list of tuples
+    sql, params = rows.query.sql_with_params()
+    with connections[rows.db].cursor() as cursor:
+        cursor.execute(sql, params)
+        records = np.fromiter(cursor, dtype=YIELD_ROW)
+
+    n_days = (end_date - start_date).days + 1
+    if not len(records):
+        return YieldMatrix(np.empty(0, dtype=np.int64), start_date, np.empty((0, n_days)))
+
+    cow_ids, cow_index = np.unique(records['cow_id'], return_inverse=True)
+    day_index = (records['date'] - np.datetime64(start_date, 'D')).astype(np.int64)
+
+    values = np.full((len(cow_ids), n_days), np.nan)
+    # (cow, date) is unique, so plain fancy assignment cannot lose records
+    values[cow_index, day_index] = records['quantity']
+    return YieldMatrix(cow_ids, start_date, values)
+
+def trailing_window_sums(values, window):
+    """
+    Sum of the previous `window` columns for every column (the column itself
+    excluded), via one cumulative sum per row
+    """
+    n_days = values.shape[1]
+    cumulative = np.zeros((values.shape[0], n_days + 1))
+    np.cumsum(values, axis=1, out=cumulative[:, 1:])
+    # cumulative[:, t] is the sum of the first t columns
+    sums = cumulative[:, :n_days].copy()
+    if n_days > window:
+        sums[:, window:] -= cumulative[:, :n_days - window]
+    return sums
+
+def rolling_z_scores(values, window=ANOMALY_WINDOW, min_periods=ANOMALY_MIN_PERIODS):
+    """
+    Z-score of each day's yield against the mean and standard deviation of
+    the cow's previous `window` days; NaN where there is too little history
+    Returns (z_scores, trailing_means)
+    """
+    present = ~np.isnan(values)
+    filled = np.where(present, values, 0.0)
+    count = trailing_window_sums(present.astype(float), window)
+    total = trailing_window_sums(filled, window)
+    squares = trailing_window_sums(filled * filled, window)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = total / count
+        variance = (squares - count * mean * mean) / (count - 1)
+        std = np.sqrt(np.maximum(variance, 0.0))
+        z_scores = (values - mean) / std
+    z_scores[(count < min_periods) | ~present | (std == 0)] = np.nan
+    return z_scores, mean
+
+def detect_yield_drops(matrix, window=ANOMALY_WINDOW, threshold=ANOMALY_Z_THRESHOLD,
+                       min_drop=ANOMALY_MIN_DROP, min_periods=ANOMALY_MIN_PERIODS):
+    """
+    Flag days whose yield is at least `threshold` standard deviations and
+    `min_drop` (fraction) below the trailing mean
+    Returns (cow_index, day_index, z_scores, means) arrays for flagged cells
+    """
+    z_scores, mean = rolling_z_scores(matrix.values, window, min_periods)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        drop = 1.0 - matrix.values / mean
+        flagged = (z_scores <= -threshold) & (drop >= min_drop)
+    cow_index, day_index = np.nonzero(flagged)
+    return cow_index, day_index, z_scores[cow_index, day_index], mean[cow_index, day_index]
+
+def _liters(value):
+    return Decimal(f'{value:.2f}')
+
+def detect_farm_anomalies(farm_id, start_date, end_date, window=ANOMALY_WINDOW,
+                          threshold=ANOMALY_Z_THRESHOLD, min_drop=ANOMALY_MIN_DROP):
+    """
+    Detect yield drops on one farm between start_date and end_date and
+    replace that farm's stored flags for the range. Returns the flag count.
+    """
+    matrix = load_yield_matrix(farm_id, start_date - timedelta(days=window), end_date)
+    cow_index, day_index, z_scores, means = detect_yield_drops(matrix, window, threshold, min_drop)
+    offset = window
+
+    anomalies = []
+    for cow, day, z_score, mean in zip(cow_index, day_index, z_scores, means):
+        if day < offset:
+            continue
+        quantity = matrix.values[cow, day]
+        anomalies.append(MilkYieldAnomaly(
+            farm_id=farm_id,
+            cow_id=int(matrix.cow_ids[cow]),
+            date=matrix.start_date + timedelta(days=int(day)),
+            quantity_liters=_liters(quantity),
+            expected_liters=_liters(mean),
+            z_score=round(float(z_score), 3),
+            drop_percentage=_liters(100 * (1 - quantity / mean))
+        ))
+
+    with transaction.atomic():
+        MilkYieldAnomaly.objects.filter(
+            farm_id=farm_id, date__gte=start_date, date__lte=end_date
+        ).delete()
+        MilkYieldAnomaly.objects.bulk_create(anomalies, batch_size=WRITE_BATCH_SIZE)
+    return len(anomalies)
+
+def holt_smoothing(values, alpha=FORECAST_ALPHA, beta=FORECAST_BETA):
+    """
+    Holt's linear exponential smoothing for every row of a (cows, days)
+    matrix at once. Missing days leave a cow's state untouched, so each
+    cow's final state sits at its own newest observation.
+    Returns (level, trend, last_day_index) arrays, NaN level for empty rows
+    """
+    n_cows, n_days = values.shape
+    level = np.full(n_cows, np.nan)
+    trend = np.zeros(n_cows)
+    last_day = np.full(n_cows, -1)
+    for day in range(n_days):
+        observed = values[:, day]
+        present = ~np.isnan(observed)
+        first = present & np.isnan(level)
+        update = present & ~first
+
+        level[first] = observed[first]
+        previous = level[update]
+        level[update] = alpha * observed[update] + (1 - alpha) * (previous + trend[update])
+        trend[update] = beta * (level[update] - previous) + (1 - beta) * trend[update]
+        last_day[present] = day
+    return level, trend, last_day
+
+def horizon_totals(level, trend, horizon):
+    """Total forecast yield over the next `horizon` days, never negative per day"""
+    steps = np.arange(1, horizon + 1)
+    daily = np.maximum(level[:, None] + trend[:, None] * steps[None, :], 0.0)
+    return daily.sum(axis=1)
+
+def _record_signatures(farm_id):
+    """{cow_id: (newest date, newest updated_at, record count)} for a farm's milk records"""
+    rows = MilkRecord.objects.filter(farm_id=farm_id).values('cow_id').annotate(
+        last_date=models.Max('date'),
+        last_updated=models.Max('updated_at'),
+        records=models.Count('id')
+    ).order_by()
+    return {
+        row['cow_id']: (row['last_date'], row['last_updated'], row['records'])
+        for row in rows
+    }
+
+def forecast_farm_yield(farm_id, full=False, alpha=FORECAST_ALPHA, beta=FORECAST_BETA,
+                        history_days=FORECAST_HISTORY_DAYS):
+    """
+    Refresh the cached forecasts of one farm's cows whose milk records changed
+    since the last run (every cow when full=True), then the farm total.
+    The history window ends at the farm's newest record; cows without a record
+    inside it have nothing to smooth, so their forecasts are dropped.
+    Returns the number of cow forecasts recomputed.
+    """
+    signatures = _record_signatures(farm_id)
+    if signatures:
+        end_date = max(last_date for last_date, _, _ in signatures.values())
+        start_date = end_date - timedelta(days=history_days - 1)
+        signatures = {
+            cow_id: signature for cow_id, signature in signatures.items() if signature[0] >= start_date
+        }
+    cached = {
+        cow_id: (as_of, updated, count)
+        for cow_id, as_of, updated, count in MilkYieldForecast.objects.filter(farm_id=farm_id).values_list(
+            'cow_id', 'as_of_date', 'source_updated_at', 'source_record_count'
+        )
+    }
+    stale = sorted(
+        cow_id for cow_id, signature in signatures.items()
+        if full or cached.get(cow_id) != signature
+    )
+
+    forecasts = []
+    if stale:
+        # Every stale cow has its newest record in the window, so no level is NaN
+        matrix = load_yield_matrix(farm_id, start_date, end_date, stale)
+        level, trend, last_day = holt_smoothing(matrix.values, alpha, beta)
+        totals = {horizon: horizon_totals(level, trend, horizon) for horizon in FORECAST_HORIZONS}
+        next_day = np.maximum(level + trend, 0.0)
+
+        for index, cow_id in enumerate(matrix.cow_ids.tolist()):
+            _, last_updated, record_count = signatures[cow_id]
+            forecasts.append(MilkYieldForecast(
+                farm_id=farm_id,
+                cow_id=cow_id,
+                as_of_date=matrix.start_date + timedelta(days=int(last_day[index])),
+                level_liters=float(level[index]),
+                trend_liters=float(trend[index]),
+                next_day_liters=_liters(next_day[index]),
+                forecast_7_day_liters=_liters(totals[7][index]),
+                forecast_30_day_liters=_liters(totals[30][index]),
+                source_record_count=record_count,
+                source_updated_at=last_updated
+            ))
+
+    with transaction.atomic():
+        # Cows whose records are gone (deleted or moved to another farm) or
+        # all older than the window
+        MilkYieldForecast.objects.filter(farm_id=farm_id).exclude(cow_id__in=list(signatures)).delete()
+        MilkYieldForecast.objects.bulk_create(
+            forecasts,
+            batch_size=WRITE_BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=['cow'],
+            update_fields=[
+                'farm', 'as_of_date', 'level_liters', 'trend_liters', 'next_day_liters',
+                'forecast_7_day_liters', 'forecast_30_day_liters',
+                'source_record_count', 'source_updated_at', 'updated_at'
+            ]
+        )
+        refresh_farm_forecast(farm_id)
+    return len(forecasts)
+
+def refresh_farm_forecast(farm_id):
+    """Recompute a farm's forecast as the sum of its active cows' forecasts"""
+    cows = MilkYieldForecast.objects.filter(farm_id=farm_id)
+    as_of = cows.aggregate(latest=models.Max('as_of_date'))['latest']
+    if as_of is None:
+        FarmMilkYieldForecast.objects.filter(farm_id=farm_id).delete()
+        return
+    totals = cows.filter(as_of_date__gt=as_of - timedelta(days=FORECAST_ACTIVE_DAYS)).aggregate(
+        cow_count=models.Count('id'),
+        next_day=models.Sum('next_day_liters'),
+        week=models.Sum('forecast_7_day_liters'),
+        month=models.Sum('forecast_30_day_liters')
+    )
+    FarmMilkYieldForecast.objects.update_or_create(
+        farm_id=farm_id,
+        defaults={
+            'as_of_date': as_of,
+            'cow_count': totals['cow_count'],
+            'next_day_liters': totals['next_day'] or 0,
+            'forecast_7_day_liters': totals['week'] or 0,
+            'forecast_30_day_liters': totals['month'] or 0,
+        }
+    )
+
+def _init_worker():
+    """Set up Django in a pool worker and drop connections inherited on fork"""
+    import django
+    django.setup()
+    connections.close_all()
+
+def run_per_farm(function, farm_ids, processes=1, **kwargs):
+    """
+    Call function(farm_id, **kwargs) for every farm, inline or over a process
+    pool, and return {farm_id: result}
+    """
+    job = partial(function, **kwargs)
+    if processes <= 1 or len(farm_ids) <= 1:
+        return {farm_id: job(farm_id) for farm_id in farm_ids}
+
+    # Workers must not share the parent's database connections
+    connections.close_all()
+    with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker) as pool:
+        return dict(zip(farm_ids, pool.map(job, farm_ids)))
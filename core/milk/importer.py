@@ -0,0 +1,628 @@
+"""
+Bulk import of milk records, activities and cows from CSV, NDJSON or Parquet
+The input is streamed in fixed-size chunks with every column read as text.
+Each chunk is validated column-wise with pyarrow compute and NumPy: cow tags,
+usernames and farm names are resolved against maps loaded once per run, and
+every check produces a row mask instead of raising, so bad rows are rejected
+without stopping the chunk. Valid rows are written with COPY FROM STDIN on
+PostgreSQL and executemany elsewhere, in one transaction per chunk together
+with the run's ImportCheckpoint.
+"""
+
+import csv
+import json
+import os
+from collections import namedtuple
+from datetime import date
+
+import numpy as np
+from django.db import connection, transaction
+from django.utils import timezone
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = pc = pa_csv = pq = None
+
+from activities.health import refresh_cow_health
+from activities.models import Activity
+from cows.models import Cow, touch_cows
+from farms.models import Farm, touch_farms
+from users.models import User
+
+from .models import MilkRecord, ImportCheckpoint
+from .rollups import drop_coverage, month_span, rebuild_milk_rollups
+
+DEFAULT_CHUNK_SIZE = 50000
+# Rows per batch handed from the file readers to the chunker
+READ_BATCH_SIZE = 65536
+FORMATS = {'.csv': 'csv', '.ndjson': 'ndjson', '.jsonl': 'ndjson', '.parquet': 'parquet'}
+NUMBER_PATTERN = r'^[+-]?(\d+(\.\d*)?|\.\d+)$'
+TRUE_VALUES = ['true', 't', 'yes', 'y', '1']
+FALSE_VALUES = ['false', 'f', 'no', 'n', '0']
+EPOCH = date(1970, 1, 1)
+# (cow, date) pairs are packed into one integer: cow_id * DAY_SPAN + days since the epoch
+DAY_SPAN = 1 << 20
+
+ChunkResult = namedtuple('ChunkResult', ['first_row', 'rows', 'imported', 'errors'])
+
+class FarmDataImportError(Exception):
+    """The input cannot be imported as a whole"""
+
+def detect_format(path):
+    """The input format implied by a file extension"""
+    fmt = FORMATS.get(os.path.splitext(path)[1].lower())
+    if fmt is None:
+        raise FarmDataImportError(
+            f'Cannot tell the format of {path}; use one of {", ".join(sorted(FORMATS))} or pass a format'
+        )
+    return fmt
+
+# Readers: each returns the expected columns present in the input and an
+# iterator of record batches
+
+def _csv_batches(path, columns):
+    with open(path, newline='', encoding='utf-8-sig') as handle:
+        header = next(csv.reader(handle), [])
+    present = [name for name in columns if name in header]
+    if not present:
+        return present, iter(())
+    reader = pa_csv.open_csv(
+        path,
+        convert_options=pa_csv.ConvertOptions(
+            column_types={name: pa.string() for name in header},
+            include_columns=present,
+            null_values=[''],
+            strings_can_be_null=True
+        )
+    )
+    return present, iter(reader)
+
+def _json_text(value):
+    if isinstance(value, str):
+        return value
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    return str(value)
+
+def _ndjson_batches(path, columns):
+    def batches():
+        values = {name: [] for name in columns}
+        size = 0
+        with open(path, encoding='utf-8') as handle:
+            for line_number, line in enumerate(handle, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError as error:
+                    raise FarmDataImportError(f'Line {line_number} of {path} is not valid JSON: {error}')
+                if not isinstance(record, dict):
+                    raise FarmDataImportError(f'Line {line_number} of {path} is not a JSON object')
+                for name, column in values.items():
+                    value = record.get(name)
+                    column.append(None if value is None else _json_text(value))
+                size += 1
+                if size == READ_BATCH_SIZE:
+                    yield pa.RecordBatch.from_pydict(values, schema=schema)
+                    values = {name: [] for name in columns}
+                    size = 0
+        if size:
+            yield pa.RecordBatch.from_pydict(values, schema=schema)
+
+    # Keys are only known per line, so every expected column counts as present
+    schema = pa.schema([(name, pa.string()) for name in columns])
+    return list(columns), batches()
+
+def _parquet_batches(path, columns):
+    parquet_file = pq.ParquetFile(path)
+    present = [name for name in columns if name in parquet_file.schema_arrow.names]
+    if not present:
+        return present, iter(())
+    return present, parquet_file.iter_batches(batch_size=READ_BATCH_SIZE, columns=present)
+
+READERS = {'csv': _csv_batches, 'ndjson': _ndjson_batches, 'parquet': _parquet_batches}
+
+def _as_text(batch, columns):
+    """The batch with every expected column as strings, absent ones all null"""
+    arrays = []
+    for name in columns:
+        index = batch.schema.get_field_index(name)
+        if index < 0:
+            arrays.append(pa.nulls(batch.num_rows, pa.string()))
+            continue
+        column = batch.column(index)
+        if pa.types.is_timestamp(column.type):
+            # Parquet writers often store dates as midnight timestamps
+            column = pc.cast(column, pa.date32(), safe=False)
+        if not pa.types.is_string(column.type):
+            column = pc.cast(column, pa.string())
+        arrays.append(column)
+    return pa.Table.from_arrays(arrays, names=list(columns))
+
+def read_chunks(batches, columns, chunk_size, skip_rows=0):
+    """Regroup record batches into tables of chunk_size rows, after skipping skip_rows"""
+    pending, pending_rows = [], 0
+    for batch in batches:
+        if skip_rows:
+            if batch.num_rows <= skip_rows:
+                skip_rows -= batch.num_rows
+                continue
+            batch = batch.slice(skip_rows)
+            skip_rows = 0
+        pending.append(_as_text(batch, columns))
+        pending_rows += batch.num_rows
+        while pending_rows >= chunk_size:
+            table = pa.concat_tables(pending)
+            yield table.slice(0, chunk_size).combine_chunks()
+            pending, pending_rows = [table.slice(chunk_size)], pending_rows - chunk_size
+    if pending_rows:
+        yield pa.concat_tables(pending).combine_chunks()
+
+# Column-wise checks
+
+class RowChecks:
+    """The failed checks of one chunk as row masks, with their messages"""
+
+    def __init__(self, size):
+        self.invalid = np.zeros(size, dtype=bool)
+        self._failures = []
+
+    def fail(self, mask, message):
+        mask = np.asarray(mask, dtype=bool)
+        if mask.any():
+            self._failures.append((mask, message))
+            self.invalid |= mask
+
+    def errors(self, first_row):
+        """[(row_number, message)] for every rejected row, numbered from first_row"""
+        by_row = {}
+        for mask, message in self._failures:
+            for index in np.flatnonzero(mask):
+                by_row.setdefault(int(index), []).append(message)
+        return [(first_row + index, '; '.join(messages)) for index, messages in sorted(by_row.items())]
+
+def _mask(array):
+    """A boolean pyarrow array as a NumPy mask, nulls counting as False"""
+    return pc.fill_null(array, False).to_numpy(zero_copy_only=False)
+
+def _text(table, name, checks=None, max_length=None, required=False):
+    """A column with surrounding whitespace stripped and empty values as nulls"""
+    column = pc.utf8_trim_whitespace(table.column(name).combine_chunks())
+    column = pc.if_else(pc.equal(column, ''), pa.scalar(None, pa.string()), column)
+    if required:
+        checks.fail(_mask(pc.is_null(column)), f'{name} is required')
+    if max_length is not None:
+        checks.fail(_mask(pc.greater(pc.utf8_length(column), max_length)), f'{name} is longer than {max_length} characters')
+    return column
+
+def _decimal(checks, column, name, low, high, places=2):
+    """float64 values rounded to places, NaN where empty"""
+    numeric = pc.match_substring_regex(column, NUMBER_PATTERN)
+    checks.fail(_mask(pc.invert(numeric)), f'{name} is not a number')
+    values = pc.cast(pc.if_else(numeric, column, pa.scalar(None, pa.string())), pa.float64())
+    values = np.round(values.to_numpy(zero_copy_only=False), places)
+    with np.errstate(invalid='ignore'):
+        checks.fail((values < low) | (values > high), f'{name} must be between {low} and {high}')
+    return values
+
+def _date(checks, column, name):
+    """A date32 array, null where empty or invalid"""
+    parsed = pc.cast(pc.strptime(column, format='%Y-%m-%d', unit='s', error_is_null=True), pa.date32())
+    # strptime rolls impossible days over (2024-02-30 becomes March 1), so the date must format back to the input
+    parsed = pc.if_else(pc.equal(pc.cast(parsed, pa.string()), column), parsed, pa.scalar(None, pa.date32()))
+    checks.fail(_mask(pc.and_(pc.is_valid(column), pc.is_null(parsed))), f'{name} must be a YYYY-MM-DD date')
+    return parsed
+
+def _time(checks, column, name):
+    """A time32 array, null where empty or invalid"""
+    seconds = pc.if_else(pc.equal(pc.utf8_length(column), 5), pc.binary_join_element_wise(column, ':00', ''), column)
+    parsed = pc.cast(pc.strptime(seconds, format='%H:%M:%S', unit='s', error_is_null=True), pa.time32('s'))
+    parsed = pc.if_else(pc.equal(pc.cast(parsed, pa.string()), seconds), parsed, pa.scalar(None, pa.time32('s')))
+    checks.fail(_mask(pc.and_(pc.is_valid(column), pc.is_null(parsed))), f'{name} must be a HH:MM[:SS] time')
+    return parsed
+
+def _choice(checks, column, name, choices, default=None):
+    """Upper-cased values, checked against the model field's choices"""
+    column = pc.utf8_upper(column)
+    unknown = pc.and_(pc.is_valid(column), pc.invert(pc.is_in(column, value_set=pa.array(list(choices)))))
+    checks.fail(_mask(unknown), f'{name} must be one of {", ".join(choices)}')
+    return pc.fill_null(column, default) if default is not None else column
+
+def _boolean(checks, column, name):
+    """A NumPy bool array, False where empty"""
+    column = pc.utf8_lower(column)
+    true = pc.is_in(column, value_set=pa.array(TRUE_VALUES))
+    false = pc.is_in(column, value_set=pa.array(FALSE_VALUES))
+    checks.fail(_mask(pc.and_(pc.is_valid(column), pc.invert(pc.or_(true, false)))), f'{name} must be true or false')
+    return _mask(true)
+
+def _lookup(column, keys):
+    """Positions of the column's values in keys, -1 where absent"""
+    return pc.fill_null(pc.index_in(column, value_set=keys), -1).to_numpy(zero_copy_only=False)
+
+def _take(ids, positions):
+    """ids at the looked-up positions; rows that were not found get an arbitrary id and are rejected"""
+    if not len(ids):
+        return np.zeros(len(positions), dtype=np.int64)
+    return ids[np.maximum(positions, 0)]
+
+def _epoch_days(dates):
+    return pc.fill_null(pc.cast(dates, pa.int32()), 0).to_numpy(zero_copy_only=False).astype(np.int64)
+
+def _repeated(keys, candidates):
+    """Mask of candidate rows whose key already appeared in an earlier candidate row"""
+    repeated = np.zeros(len(keys), dtype=bool)
+    positions = np.flatnonzero(candidates)
+    _, first = np.unique(keys[positions], return_index=True)
+    later = np.ones(len(positions), dtype=bool)
+    later[first] = False
+    repeated[positions[later]] = True
+    return repeated
+
+def _python_values(values, keep):
+    """Column values of the kept rows as a list of Python objects, None for nulls"""
+    if isinstance(values, np.ndarray):
+        values = values[keep]
+        if values.dtype.kind == 'f':
+            return pa.array(values, from_pandas=True).to_pylist()
+        return values.tolist()
+    values = values.filter(pa.array(keep))
+    if pa.types.is_date(values.type) or pa.types.is_time(values.type):
+        values = pc.cast(values, pa.string())
+    return values.to_numpy(zero_copy_only=False).tolist() if values.null_count == 0 else values.to_pylist()
+
+class TableImport:
+    """
+    Column layout and validation of one kind of import
+    validate() returns one array per entry of fields, covering every row of
+    the chunk; rows flagged in checks are dropped before the insert
+    """
+    model = None
+    columns = ()
+    required = ()
+    fields = ()
+
+    # Set when the run continues from a checkpoint, so rows of an earlier
+    # process are already in the database
+    resumed = False
+
+    def __init__(self, dry_run=False):
+        self.dry_run = dry_run
+
+    def prepare(self):
+        """Load the lookup maps once per run"""
+
+    def validate(self, table, checks):
+        raise NotImplementedError
+
+    def written(self, checkpoint):
+        """Per-chunk bookkeeping, inside the chunk's transaction"""
+
+    def finish(self, checkpoint, refresh=True):
+        """
+        Derived data refreshed once the whole file is in; refresh=False skips
+        what has a command of its own to rebuild it later
+        """
+
+def _cow_maps():
+    """Cow tags as a pyarrow array, with the cow, farmer and farm ids at the same positions"""
+    rows = list(Cow.objects.order_by().values_list('tag_number', 'id', 'farmer_id', 'farm_id'))
+    tags = pa.array([row[0] for row in rows], pa.string())
+    ids = np.array([row[1:] for row in rows], dtype=np.int64).reshape(-1, 3)
+    return tags, ids[:, 0], ids[:, 1], ids[:, 2]
+
+class MilkRecordImport(TableImport):
+    model = MilkRecord
+    columns = (
+        'cow_tag', 'date', 'morning_quantity_liters', 'evening_quantity_liters',
+        'fat_percentage', 'protein_percentage', 'quality_rating', 'notes'
+    )
+    required = ('cow_tag', 'date')
+    fields = (
+        'cow', 'farmer', 'farm', 'date', 'morning_quantity_liters', 'evening_quantity_liters',
+        'total_quantity_liters', 'fat_percentage', 'protein_percentage', 'quality_rating', 'notes',
+        'created_at', 'updated_at'
+    )
+
+    def prepare(self):
+        self.tags, self.cow_ids, self.farmer_ids, self.farm_ids = _cow_maps()
+        self.seen = np.empty(0, dtype=np.int64)
+        self.first_day = self.last_day = None
+
+    def validate(self, table, checks):
+        tags = _text(table, 'cow_tag', checks, required=True)
+        positions = _lookup(tags, self.tags)
+        checks.fail(_mask(pc.is_valid(tags)) & (positions < 0), 'unknown cow_tag')
+        cow_ids = _take(self.cow_ids, positions)
+
+        dates = _date(checks, _text(table, 'date', checks, required=True), 'date')
+        morning = np.nan_to_num(_decimal(checks, _text(table, 'morning_quantity_liters'), 'morning_quantity_liters', 0, 50))
+        evening = np.nan_to_num(_decimal(checks, _text(table, 'evening_quantity_liters'), 'evening_quantity_liters', 0, 50))
+        fat = _decimal(checks, _text(table, 'fat_percentage'), 'fat_percentage', 0, 10)
+        protein = _decimal(checks, _text(table, 'protein_percentage'), 'protein_percentage', 0, 10)
+        quality = _choice(checks, _text(table, 'quality_rating'), 'quality_rating', MilkRecord.Quality.values)
+        notes = _text(table, 'notes')
+
+        # One record per cow and day: within the file, then against the database.
+        # Earlier chunks of a real run are in the database by now; a dry run
+        # remembers their keys instead
+        days = _epoch_days(dates)
+        keys = cow_ids * DAY_SPAN + days
+        candidates = ~checks.invalid
+        repeated = _repeated(keys, candidates)
+        if self.dry_run:
+            repeated |= candidates & np.isin(keys, self.seen)
+        checks.fail(repeated, 'duplicate cow_tag and date in the file')
+        candidates = ~checks.invalid
+        if candidates.any():
+            first_day, last_day = int(days[candidates].min()), int(days[candidates].max())
+            existing = MilkRecord.objects.filter(
+                cow_id__in=np.unique(cow_ids[candidates]).tolist(),
+                date__range=(date.fromordinal(EPOCH.toordinal() + first_day),
+                             date.fromordinal(EPOCH.toordinal() + last_day))
+            ).values_list('cow_id', 'date')
+            existing_keys = np.array(
+                [cow_id * DAY_SPAN + (day - EPOCH).days for cow_id, day in existing], dtype=np.int64
+            )
+            checks.fail(candidates & np.isin(keys, existing_keys), 'a milk record for this cow and date already exists')
+
+        valid = ~checks.invalid
+        if self.dry_run:
+            self.seen = np.union1d(self.seen, keys[valid])
+        self.chunk_days = (int(days[valid].min()), int(days[valid].max())) if valid.any() else None
+        self.chunk_cows = np.unique(cow_ids[valid]).tolist()
+
+        now = connection.ops.adapt_datetimefield_value(timezone.now())
+        return [
+            cow_ids, _take(self.farmer_ids, positions), _take(self.farm_ids, positions), dates, morning, evening,
+            np.round(morning + evening, 2), fat, protein, quality, notes, now, now
+        ]
+
+    def written(self, checkpoint):
+        # The raw insert bypasses MilkRecord.save(), which bumps the cows' updated_at
+        touch_cows(self.chunk_cows)
+        if self.chunk_days is None:
+            return
+        first, last = (date.fromordinal(EPOCH.toordinal() + day) for day in self.chunk_days)
+        # The rollups of these months miss the inserted rows until finish()
+        # rebuilds them (or never, with --skip-rollups), so they stop counting
+        # as covered in the same transaction
+        drop_coverage(first, last)
+        checkpoint.first_date = min(first, checkpoint.first_date or first)
+        checkpoint.last_date = max(last, checkpoint.last_date or last)
+
+    def finish(self, checkpoint, refresh=True):
+        if refresh and checkpoint.first_date:
+            rebuild_milk_rollups(*month_span(checkpoint.first_date, checkpoint.last_date))
+
+class ActivityImport(TableImport):
+    model = Activity
+    columns = (
+        'cow_tag', 'title', 'activity_type', 'scheduled_date', 'scheduled_time', 'status',
+        'description', 'notes', 'health_status', 'cost'
+    )
+    required = ('cow_tag', 'title', 'activity_type', 'scheduled_date')
+    fields = (
+        'title', 'activity_type', 'cow', 'scheduled_date', 'scheduled_time', 'status',
+        'description', 'notes', 'health_status', 'cost', 'created_at', 'updated_at'
+    )
+
+    def prepare(self):
+        self.tags, self.cow_ids, _, _ = _cow_maps()
+        self.checked_cows = set()
+
+    def validate(self, table, checks):
+        tags = _text(table, 'cow_tag', checks, required=True)
+        positions = _lookup(tags, self.tags)
+        checks.fail(_mask(pc.is_valid(tags)) & (positions < 0), 'unknown cow_tag')
+        cow_ids = _take(self.cow_ids, positions)
+
+        title = _text(table, 'title', checks, max_length=255, required=True)
+        activity_type = _choice(
+            checks, _text(table, 'activity_type', checks, required=True), 'activity_type', Activity.ActivityType.values
+        )
+        scheduled_date = _date(checks, _text(table, 'scheduled_date', checks, required=True), 'scheduled_date')
+        scheduled_time = _time(checks, _text(table, 'scheduled_time'), 'scheduled_time')
+        status = _choice(checks, _text(table, 'status'), 'status', Activity.Status.values, Activity.Status.PLANNED)
+        health_status = _choice(checks, _text(table, 'health_status'), 'health_status', Cow.HealthStatus.values)
+        cost = _decimal(checks, _text(table, 'cost'), 'cost', 0, 99999999.99)
+
+        health_checks = ~checks.invalid & _mask(pc.equal(activity_type, Activity.ActivityType.HEALTH_CHECK))
+        self.chunk_checked_cows = np.unique(cow_ids[health_checks]).tolist()
+
+        now = connection.ops.adapt_datetimefield_value(timezone.now())
+        return [
+            title, activity_type, cow_ids, scheduled_date, scheduled_time, status,
+            _text(table, 'description'), _text(table, 'notes'), health_status, cost, now, now
+        ]
+
+    def written(self, checkpoint):
+        self.checked_cows.update(self.chunk_checked_cows)
+
+    def finish(self, checkpoint, refresh=True):
+        # Activity.save() keeps the cow's health status current; the raw insert
+        # does not. A resumed run cannot tell which cows the earlier process
+        # checked, so it refreshes every cow with a health check
+        cow_ids = self.checked_cows
+        if self.resumed:
+            cow_ids = Activity.objects.filter(
+                activity_type=Activity.ActivityType.HEALTH_CHECK
+            ).values_list('cow_id', flat=True).distinct()
+        refresh_cow_health(cow_ids)
+
+class CowImport(TableImport):
+    model = Cow
+    columns = (
+        'tag_number', 'name', 'breed', 'farmer', 'farm', 'date_of_birth', 'weight_kg', 'height_cm',
+        'status', 'is_pregnant', 'last_breeding_date'
+    )
+    required = ('tag_number', 'farmer', 'farm', 'date_of_birth')
+    fields = (
+        'tag_number', 'name', 'breed', 'farmer', 'farm', 'date_of_birth', 'weight_kg', 'height_cm',
+        'status', 'is_pregnant', 'last_breeding_date', 'created_at', 'updated_at'
+    )
+
+    def prepare(self):
+        self.known_tags = pa.array(Cow.objects.values_list('tag_number', flat=True), pa.string())
+        farmers = list(User.objects.filter(role=User.Role.FARMER).values_list('username', 'id'))
+        self.usernames = pa.array([username for username, _ in farmers], pa.string())
+        self.farmer_ids = np.array([user_id for _, user_id in farmers], dtype=np.int64)
+
+        farms = {}
+        for name, farm_id in Farm.objects.values_list('name', 'id'):
+            farms.setdefault(name, []).append(farm_id)
+        # Farm names are not unique; a name shared by several farms is refused
+        self.farm_names = pa.array([name for name, ids in farms.items() if len(ids) == 1], pa.string())
+        self.farm_ids = np.array([ids[0] for ids in farms.values() if len(ids) == 1], dtype=np.int64)
+        self.ambiguous_farm_names = pa.array([name for name, ids in farms.items() if len(ids) > 1], pa.string())
+
+    def validate(self, table, checks):
+        tags = _text(table, 'tag_number', checks, max_length=50, required=True)
+        checks.fail(_mask(pc.is_in(tags, value_set=self.known_tags)), 'tag_number is already in use')
+        candidates = ~checks.invalid
+        checks.fail(
+            _repeated(tags.to_numpy(zero_copy_only=False), candidates & _mask(pc.is_valid(tags))),
+            'duplicate tag_number in the file'
+        )
+
+        farmers = _text(table, 'farmer', checks, required=True)
+        farmer_positions = _lookup(farmers, self.usernames)
+        checks.fail(_mask(pc.is_valid(farmers)) & (farmer_positions < 0), 'farmer is not a farmer username')
+        farms = _text(table, 'farm', checks, required=True)
+        farm_positions = _lookup(farms, self.farm_names)
+        ambiguous = _mask(pc.is_in(farms, value_set=self.ambiguous_farm_names))
+        checks.fail(ambiguous, 'farm name matches several farms')
+        checks.fail(_mask(pc.is_valid(farms)) & (farm_positions < 0) & ~ambiguous, 'unknown farm')
+
+        date_of_birth = _date(checks, _text(table, 'date_of_birth', checks, required=True), 'date_of_birth')
+        weight = _decimal(checks, _text(table, 'weight_kg'), 'weight_kg', 0, 9999.99)
+        height = _decimal(checks, _text(table, 'height_cm'), 'height_cm', 0, 999.99)
+        breed = _choice(checks, _text(table, 'breed'), 'breed', Cow.Breed.values, Cow.Breed.HOLSTEIN)
+        status = _choice(checks, _text(table, 'status'), 'status', Cow.Status.values, Cow.Status.ACTIVE)
+        is_pregnant = _boolean(checks, _text(table, 'is_pregnant'), 'is_pregnant')
+        last_breeding_date = _date(checks, _text(table, 'last_breeding_date'), 'last_breeding_date')
+
+        self.known_tags = pa.concat_arrays([self.known_tags, tags.filter(pa.array(~checks.invalid))])
+        farm_ids = _take(self.farm_ids, farm_positions)
+        self.chunk_farms = np.unique(farm_ids[~checks.invalid]).tolist()
+        now = connection.ops.adapt_datetimefield_value(timezone.now())
+        return [
+            tags, _text(table, 'name', checks, max_length=100), breed, _take(self.farmer_ids, farmer_positions),
+            farm_ids, date_of_birth, weight, height, status, is_pregnant, last_breeding_date, now, now
+        ]
+
+    def written(self, checkpoint):
+        # The raw insert bypasses Cow.save(), which bumps the farms' updated_at
+        touch_farms(self.chunk_farms)
+
+IMPORTS = {
+    'milk-records': MilkRecordImport,
+    'activities': ActivityImport,
+    'cows': CowImport,
+}
+
+def insert_rows(model, fields, rows):
+    """Insert row tuples for the given model fields with COPY or executemany"""
+    quote = connection.ops.quote_name
+    table = quote(model._meta.db_table)
+    columns = ', '.join(quote(model._meta.get_field(name).column) for name in fields)
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            # psycopg 3 cursors stream rows to COPY without building the whole payload
+            with cursor.copy(f'COPY {table} ({columns}) FROM STDIN') as copy:
+                for row in rows:
+                    copy.write_row(row)
+        else:
+            placeholders = ', '.join(['%s'] * len(fields))
+            cursor.executemany(f'INSERT INTO {table} ({columns}) VALUES ({placeholders})', rows)
+
+class FarmDataImport:
+    """
+    One import run over a file
+    chunks() validates and writes the file chunk by chunk, yielding a
+    ChunkResult for each; finish() refreshes derived data and marks the
+    checkpoint complete. A dry run validates without writing anything.
+    """
+
+    def __init__(self, path, kind, fmt=None, chunk_size=DEFAULT_CHUNK_SIZE, dry_run=False, restart=False):
+        if pa is None:
+            raise FarmDataImportError('Importing farm data needs pyarrow')
+        if kind not in IMPORTS:
+            raise FarmDataImportError(f'Unknown import kind {kind!r}; use one of {", ".join(IMPORTS)}')
+        if not os.path.isfile(path):
+            raise FarmDataImportError(f'{path} does not exist')
+
+        self.path = path
+        self.fmt = fmt or detect_format(path)
+        self.chunk_size = chunk_size
+        self.dry_run = dry_run
+        self.spec = IMPORTS[kind](dry_run)
+        self.checkpoint = None if dry_run else self._checkpoint(kind, restart)
+        self.start_row = self.checkpoint.rows_read if self.checkpoint else 0
+        self.spec.resumed = self.start_row > 0
+
+    def _checkpoint(self, kind, restart):
+        stat = os.stat(self.path)
+        source = f'{kind}:{os.path.abspath(self.path)}'
+        fingerprint = f'{stat.st_size}:{stat.st_mtime_ns}'
+        if restart:
+            ImportCheckpoint.objects.filter(source=source).delete()
+
+        checkpoint, created = ImportCheckpoint.objects.get_or_create(
+            source=source, defaults={'fingerprint': fingerprint}
+        )
+        if not created and checkpoint.fingerprint != fingerprint:
+            raise FarmDataImportError(
+                f'{self.path} changed since its import started; use --restart to import it from the beginning'
+            )
+        if checkpoint.completed_at:
+            raise FarmDataImportError(
+                f'{self.path} was already imported at {checkpoint.completed_at:%Y-%m-%d %H:%M}; '
+                'use --restart to import it again'
+            )
+        return checkpoint
+
+    def chunks(self):
+        present, batches = READERS[self.fmt](self.path, self.spec.columns)
+        missing = [name for name in self.spec.required if name not in present]
+        if missing:
+            raise FarmDataImportError(f'{self.path} is missing the column(s) {", ".join(missing)}')
+
+        self.spec.prepare()
+        first_row = self.start_row + 1
+        for table in read_chunks(batches, self.spec.columns, self.chunk_size, self.start_row):
+            checks = RowChecks(table.num_rows)
+            values = self.spec.validate(table, checks)
+            keep = ~checks.invalid
+            rows = list(zip(*[
+                _python_values(column, keep) if isinstance(column, (np.ndarray, pa.Array))
+                else [column] * int(keep.sum())
+                for column in values
+            ]))
+            errors = checks.errors(first_row)
+
+            if not self.dry_run:
+                with transaction.atomic():
+                    if rows:
+                        insert_rows(self.spec.model, self.spec.fields, rows)
+                    self.spec.written(self.checkpoint)
+                    self.checkpoint.rows_read += table.num_rows
+                    self.checkpoint.imported_count += len(rows)
+                    self.checkpoint.rejected_count += len(errors)
+                    self.checkpoint.save()
+
+            yield ChunkResult(first_row, table.num_rows, len(rows), errors)
+            first_row += table.num_rows
+
+    def finish(self, refresh=True):
+        """Refresh the data derived from the imported rows and close the checkpoint"""
+        if self.dry_run:
+            return None
+        self.spec.finish(self.checkpoint, refresh)
+        self.checkpoint.completed_at = timezone.now()
+        self.checkpoint.save()
+        return self.checkpoint
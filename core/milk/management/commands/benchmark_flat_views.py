@@ -0,0 +1,83 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from activities.views import ActivityViewSet
+from core_service.flat import flat_plan
+from core_service.queries import ActionQuerysetMixin
+from cows.views import CowViewSet
+from milk.views import MilkRecordViewSet
+
+CASES = [
+    ('milk-records list', MilkRecordViewSet, 'list'),
+    ('milk-records detail', MilkRecordViewSet, 'retrieve'),
+    ('activities list', ActivityViewSet, 'list'),
+    ('activities detail', ActivityViewSet, 'retrieve'),
+    ('cows list', CowViewSet, 'list'),
+    ('cows detail', CowViewSet, 'retrieve'),
+]
+
+class Command(BaseCommand):
+    help = 'Benchmarks the ?view=flat representation against the DRF serializers at several page sizes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--page-sizes',
+            default='20,200,2000',
+            help='Comma-separated numbers of rows per page (default: 20,200,2000)',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Runs per path and page size; the best is reported (default: 5)',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            page_sizes = [int(size) for size in options['page_sizes'].split(',')]
+        except ValueError:
+            raise CommandError('--page-sizes must be comma-separated integers')
+        if options['repeat'] < 1 or min(page_sizes) < 1:
+            raise CommandError('--repeat and every page size must be positive')
+
+        differs = []
+        self.stdout.write(f'{"case":<22}{"rows":>6}{"serializer rows/s":>20}{"flat rows/s":>14}{"speedup":>9}')
+        for label, viewset_class, action in CASES:
+            view = viewset_class()
+            view.action = action
+            serializer_class = view.get_serializer_class()
+            plan = flat_plan(serializer_class)
+            # The viewset's per-action joins and annotations, without the role filter
+            queryset = ActionQuerysetMixin.get_queryset(view).order_by(*viewset_class.ordering)
+
+            for size in page_sizes:
+                def serialized():
+                    return serializer_class(list(queryset[:size]), many=True).data
+
+                def flat():
+                    return plan.render_rows(queryset.values_list(*plan.lookups)[:size])
+
+                before, expected = self.measure(serialized, options['repeat'])
+                after, rows = self.measure(flat, options['repeat'])
+                if json.loads(JSONRenderer().render(rows)) != json.loads(JSONRenderer().render(expected)):
+                    differs.append(f'{label} ({size})')
+                count = len(rows)
+                self.stdout.write(
+                    f'{label:<22}{count:>6}{count / before:>20,.0f}{count / after:>14,.0f}{before / after:>8.1f}x'
+                )
+
+        if differs:
+            raise CommandError(f'Flat output differs from the serializers for: {", ".join(differs)}')
+        self.stdout.write(self.style.SUCCESS('✅ Flat output matches the serializers'))
+
+    def measure(self, render, repeat):
+        """Best-of-repeat seconds, plus the last result"""
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = render()
+            best = min(best, time.perf_counter() - start)
+        return max(best, 1e-9), result
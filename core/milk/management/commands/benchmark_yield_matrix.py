@@ -0,0 +1,84 @@
+import time
+from datetime import timedelta
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from django.db import models
+
+from milk.analytics import YieldMatrix, load_yield_matrix
+from milk.models import MilkRecord
+
+def load_from_tuples(farm_id, start_date, end_date):
+    """The row-at-a-time load: ORM tuples, then one Python conversion per value"""
+    rows = list(MilkRecord.objects.filter(
+        farm_id=farm_id, date__gte=start_date, date__lte=end_date
+    ).values_list('cow_id', 'date', 'total_quantity_liters').order_by())
+    n_days = (end_date - start_date).days + 1
+    if not rows:
+        return YieldMatrix(np.empty(0, dtype=np.int64), start_date, np.empty((0, n_days)))
+
+    cow_column, date_column, quantity_column = zip(*rows)
+    cow_ids, cow_index = np.unique(np.array(cow_column, dtype=np.int64), return_inverse=True)
+    start_ordinal = start_date.toordinal()
+    day_index = np.fromiter((day.toordinal() - start_ordinal for day in date_column), dtype=np.int64, count=len(rows))
+    values = np.full((len(cow_ids), n_days), np.nan)
+    values[cow_index, day_index] = [float(quantity or 0) for quantity in quantity_column]
+    return YieldMatrix(cow_ids, start_date, values)
+
+class Command(BaseCommand):
+    help = 'Benchmarks the columnar yield matrix load against row-at-a-time ORM tuples'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--farm', type=int, help='Farm ID (default: the farm with the most milk records)')
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=365,
+            help='Days up to the farm\'s newest record (default: 365)',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Runs per loader; the best is reported (default: 5)',
+        )
+
+    def handle(self, *args, **options):
+        if options['days'] < 1 or options['repeat'] < 1:
+            raise CommandError('--days and --repeat must be positive')
+
+        records = MilkRecord.objects.order_by()
+        farm_id = options['farm']
+        if farm_id is None:
+            farm_id = records.values('farm_id').annotate(
+                records=models.Count('id')
+            ).order_by('-records').values_list('farm_id', flat=True).first()
+        end_date = records.filter(farm_id=farm_id).aggregate(latest=models.Max('date'))['latest']
+        if end_date is None:
+            raise CommandError('No milk records to load; seed some data first')
+        start_date = end_date - timedelta(days=options['days'] - 1)
+
+        before, expected = self.measure(lambda: load_from_tuples(farm_id, start_date, end_date), options['repeat'])
+        after, matrix = self.measure(lambda: load_yield_matrix(farm_id, start_date, end_date), options['repeat'])
+        if not (
+            np.array_equal(matrix.cow_ids, expected.cow_ids)
+            and np.array_equal(matrix.values, expected.values, equal_nan=True)
+        ):
+            raise CommandError('The columnar load differs from the row-at-a-time load')
+
+        count = int(np.count_nonzero(~np.isnan(matrix.values)))
+        self.stdout.write(f'{"loader":<16}{"records":>9}{"records/s":>14}{"ms":>9}')
+        self.stdout.write(f'{"tuples":<16}{count:>9}{count / before:>14,.0f}{before * 1000:>9.1f}')
+        self.stdout.write(f'{"columnar":<16}{count:>9}{count / after:>14,.0f}{after * 1000:>9.1f}')
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Farm {farm_id}, {matrix.values.shape[0]} cows x {options["days"]} days: {before / after:.1f}x faster'
+        ))
+
+    def measure(self, load, repeat):
+        """Best-of-repeat seconds, plus the last result"""
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = load()
+            best = min(best, time.perf_counter() - start)
+        return max(best, 1e-9), result
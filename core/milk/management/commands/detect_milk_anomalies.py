@@ -0,0 +1,80 @@
+from django.core.management.base import BaseCommand, CommandError
+from datetime import date, timedelta
+from farms.models import Farm
+from milk.analytics import (
+    detect_farm_anomalies, run_per_farm,
+    ANOMALY_WINDOW, ANOMALY_Z_THRESHOLD, ANOMALY_MIN_DROP
+)
+
+class Command(BaseCommand):
+    help = 'Flags sudden per-cow milk yield drops (rolling z-scores) for every farm'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--to-date',
+            type=date.fromisoformat,
+            help='Last date to check (YYYY-MM-DD), defaults to today',
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=30,
+            help='Number of days up to --to-date to check (default: 30)',
+        )
+        parser.add_argument(
+            '--window',
+            type=int,
+            default=ANOMALY_WINDOW,
+            help=f'Trailing window in days for the baseline (default: {ANOMALY_WINDOW})',
+        )
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=ANOMALY_Z_THRESHOLD,
+            help=f'Z-score below which a day is flagged (default: {ANOMALY_Z_THRESHOLD})',
+        )
+        parser.add_argument(
+            '--min-drop',
+            type=float,
+            default=ANOMALY_MIN_DROP,
+            help=f'Minimum drop below the baseline as a fraction (default: {ANOMALY_MIN_DROP})',
+        )
+        parser.add_argument(
+            '--farm',
+            type=int,
+            action='append',
+            dest='farms',
+            help='Only check this farm id (repeatable)',
+        )
+        parser.add_argument(
+            '--processes',
+            type=int,
+            default=1,
+            help='Number of worker processes; farms are distributed across them (default: 1)',
+        )
+
+    def handle(self, *args, **options):
+        to_date = options['to_date'] or date.today()
+        if options['days'] < 1 or options['window'] < 2:
+            raise CommandError('--days must be at least 1 and --window at least 2')
+        from_date = to_date - timedelta(days=options['days'] - 1)
+        
+        farm_ids = options['farms'] or list(Farm.objects.order_by('id').values_list('id', flat=True))
+        self.stdout.write(
+            f'Checking {len(farm_ids)} farm(s) from {from_date} to {to_date} '
+            f'with {options["processes"]} process(es)...'
+        )
+        
+        results = run_per_farm(
+            detect_farm_anomalies, farm_ids, options['processes'],
+            start_date=from_date,
+            end_date=to_date,
+            window=options['window'],
+            threshold=options['threshold'],
+            min_drop=options['min_drop']
+        )
+        
+        for farm_id, count in results.items():
+            if count:
+                self.stdout.write(f'  Farm {farm_id}: {count} yield drop(s) flagged')
+        self.stdout.write(self.style.SUCCESS(f'✅ {sum(results.values())} yield drop(s) flagged'))
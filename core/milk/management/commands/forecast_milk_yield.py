@@ -0,0 +1,71 @@
+from django.core.management.base import BaseCommand, CommandError
+from farms.models import Farm
+from milk.analytics import (
+    forecast_farm_yield, run_per_farm,
+    FORECAST_ALPHA, FORECAST_BETA, FORECAST_HISTORY_DAYS
+)
+
+class Command(BaseCommand):
+    help = 'Refreshes the cached 7/30-day milk yield forecasts for cows whose records changed'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Recompute every cow, not only those whose milk records changed',
+        )
+        parser.add_argument(
+            '--alpha',
+            type=float,
+            default=FORECAST_ALPHA,
+            help=f'Level smoothing factor (default: {FORECAST_ALPHA})',
+        )
+        parser.add_argument(
+            '--beta',
+            type=float,
+            default=FORECAST_BETA,
+            help=f'Trend smoothing factor (default: {FORECAST_BETA})',
+        )
+        parser.add_argument(
+            '--history-days',
+            type=int,
+            default=FORECAST_HISTORY_DAYS,
+            help=f'Days of history the smoothing runs over (default: {FORECAST_HISTORY_DAYS})',
+        )
+        parser.add_argument(
+            '--farm',
+            type=int,
+            action='append',
+            dest='farms',
+            help='Only refresh this farm id (repeatable)',
+        )
+        parser.add_argument(
+            '--processes',
+            type=int,
+            default=1,
+            help='Number of worker processes; farms are distributed across them (default: 1)',
+        )
+
+    def handle(self, *args, **options):
+        if not (0 < options['alpha'] <= 1 and 0 <= options['beta'] <= 1):
+            raise CommandError('--alpha must be in (0, 1] and --beta in [0, 1]')
+        if options['history_days'] < 2:
+            raise CommandError('--history-days must be at least 2')
+        
+        farm_ids = options['farms'] or list(Farm.objects.order_by('id').values_list('id', flat=True))
+        self.stdout.write(
+            f'Refreshing forecasts for {len(farm_ids)} farm(s) with {options["processes"]} process(es)...'
+        )
+        
+        results = run_per_farm(
+            forecast_farm_yield, farm_ids, options['processes'],
+            full=options['full'],
+            alpha=options['alpha'],
+            beta=options['beta'],
+            history_days=options['history_days']
+        )
+        
+        for farm_id, count in results.items():
+            if count:
+                self.stdout.write(f'  Farm {farm_id}: {count} cow forecast(s) refreshed')
+        self.stdout.write(self.style.SUCCESS(f'✅ {sum(results.values())} cow forecast(s) refreshed'))
@@ -0,0 +1,117 @@
+import csv
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from milk.importer import DEFAULT_CHUNK_SIZE, IMPORTS, READERS, FarmDataImport, FarmDataImportError
+from milk.rollups import month_span
+
+# Rejected rows echoed to the console; the rest only go to --rejects
+SHOWN_ERRORS = 10
+
+class Command(BaseCommand):
+    help = 'Imports milk records, activities or cows from a CSV, NDJSON or Parquet file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=list(IMPORTS), help='What the file contains')
+        parser.add_argument('path', help='Input file; the format follows the extension unless --format is given')
+        parser.add_argument(
+            '--format',
+            choices=list(READERS),
+            help='Input format (default: from the file extension)',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help=f'Rows validated and committed together (default: {DEFAULT_CHUNK_SIZE})',
+        )
+        parser.add_argument(
+            '--rejects',
+            help='CSV file receiving the number and errors of every rejected row',
+        )
+        parser.add_argument(
+            '--restart',
+            action='store_true',
+            help='Discard the checkpoint of an earlier run and import the file from the first row',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Validate the file without writing anything',
+        )
+        parser.add_argument(
+            '--skip-rollups',
+            action='store_true',
+            help='Do not rebuild the milk rollups for the imported months afterwards; reports read the raw '
+                 'records for those months until they are rebuilt',
+        )
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1:
+            raise CommandError('--chunk-size must be positive')
+
+        try:
+            run = FarmDataImport(
+                options['path'],
+                options['kind'],
+                fmt=options['format'],
+                chunk_size=options['chunk_size'],
+                dry_run=options['dry_run'],
+                restart=options['restart'],
+            )
+        except FarmDataImportError as error:
+            raise CommandError(str(error))
+
+        if run.start_row:
+            self.stdout.write(f'Resuming {options["path"]} after row {run.start_row:,}')
+
+        rejects_file = rejects = None
+        if options['rejects']:
+            # A resumed run appends to the rejects of the rows already read
+            append = run.start_row and os.path.exists(options['rejects'])
+            rejects_file = open(options['rejects'], 'a' if append else 'w', newline='')
+            rejects = csv.writer(rejects_file)
+            if not append:
+                rejects.writerow(['row', 'errors'])
+
+        start = time.perf_counter()
+        rows = imported = rejected = shown = 0
+        try:
+            for chunk in run.chunks():
+                rows += chunk.rows
+                imported += chunk.imported
+                rejected += len(chunk.errors)
+                if rejects:
+                    rejects.writerows(chunk.errors)
+                for row_number, message in chunk.errors[:SHOWN_ERRORS - shown]:
+                    self.stdout.write(self.style.WARNING(f'Row {row_number}: {message}'))
+                    shown += 1
+                elapsed = time.perf_counter() - start
+                self.stdout.write(
+                    f'{rows:,} rows read, {imported:,} valid, {rejected:,} rejected ({rows / max(elapsed, 1e-9):,.0f} rows/s)'
+                )
+        except FarmDataImportError as error:
+            raise CommandError(str(error))
+        finally:
+            if rejects_file:
+                rejects_file.close()
+
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(f'✅ Dry run: {imported:,} of {rows:,} rows would be imported'))
+            return
+
+        refresh = not options['skip_rollups']
+        if refresh and options['kind'] == 'milk-records':
+            self.stdout.write('Rebuilding milk rollups for the imported months...')
+        checkpoint = run.finish(refresh=refresh)
+        if not refresh and checkpoint.first_date:
+            first, last = month_span(checkpoint.first_date, checkpoint.last_date)
+            self.stdout.write(
+                f'Run rebuild_milk_rollups --from-date {first} --to-date {last} to bring the rollups up to date'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Imported {checkpoint.imported_count:,} {options["kind"]} '
+            f'({checkpoint.rejected_count:,} rejected) in {time.perf_counter() - start:.1f}s'
+        ))
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import models
+from datetime import date
+from milk.models import MilkRecord
+from milk.rollups import rebuild_milk_rollups
+
+class Command(BaseCommand):
+    help = 'Rebuilds the daily and monthly milk production rollups for a date range'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--from-date',
+            type=date.fromisoformat,
+            help='First date to rebuild (YYYY-MM-DD), defaults to the earliest milk record',
+        )
+        parser.add_argument(
+            '--to-date',
+            type=date.fromisoformat,
+            help='Last date to rebuild (YYYY-MM-DD), defaults to an open-ended rebuild up to today',
+        )
+
+    def handle(self, *args, **options):
+        from_date = options['from_date']
+        to_date = options['to_date']
+        
+        if from_date is None:
+            from_date = MilkRecord.objects.aggregate(earliest=models.Min('date'))['earliest'] or date.today()
+        
+        if to_date and to_date < from_date:
+            raise CommandError('--to-date must not be before --from-date')
+        
+        self.stdout.write(f'Rebuilding milk rollups from {from_date} to {to_date or "present"}...')
+        rebuild_milk_rollups(from_date, to_date)
+        self.stdout.write(self.style.SUCCESS('✅ Milk rollups rebuilt'))
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.5 on 2026-10-17 01:42
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cows', '0003_initial'),
+        ('farms', '0002_initial'),
+        ('milk', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='milkrecord',
+            index=models.Index(fields=['date', 'id'], name='milk_records_date_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='milkrecord',
+            index=models.Index(fields=['farm', 'date', 'id'], name='milk_records_farm_date_id_idx'),
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.2.5 on 2026-10-17 01:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cows', '0003_initial'),
+        ('farms', '0002_initial'),
+        ('milk', '0003_milkrecord_milk_records_date_id_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MilkRollupCoverage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField(blank=True, null=True)),
+                ('rebuilt_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Milk Rollup Coverage',
+                'verbose_name_plural': 'Milk Rollup Coverage',
+                'db_table': 'milk_rollup_coverage',
+                'ordering': ['start_date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyMilkRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('record_count', models.PositiveIntegerField(default=0)),
+                ('total_quantity_liters', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('cow', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_milk_rollups', to='cows.cow')),
+                ('farm', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_milk_rollups', to='farms.farm')),
+            ],
+            options={
+                'verbose_name': 'Daily Milk Rollup',
+                'verbose_name_plural': 'Daily Milk Rollups',
+                'db_table': 'milk_daily_rollups',
+                'indexes': [models.Index(fields=['date', 'farm'], name='milk_daily_rollups_date_idx')],
+                'unique_together': {('farm', 'cow', 'date')},
+            },
+        ),
+        migrations.CreateModel(
+            name='MonthlyFarmMilkRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='First day of the month')),
+                ('record_count', models.PositiveIntegerField(default=0)),
+                ('total_quantity_liters', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('farm', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_milk_rollups', to='farms.farm')),
+            ],
+            options={
+                'verbose_name': 'Monthly Farm Milk Rollup',
+                'verbose_name_plural': 'Monthly Farm Milk Rollups',
+                'db_table': 'milk_monthly_farm_rollups',
+                'unique_together': {('farm', 'month')},
+            },
+        ),
+    ]
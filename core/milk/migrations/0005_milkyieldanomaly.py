@@ -0,0 +1,38 @@
+# Generated by Django 5.2.5 on 2026-10-17 01:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cows', '0004_cow_health_status_cow_last_health_check_date_and_more'),
+        ('farms', '0002_initial'),
+        ('milk', '0004_milkrollupcoverage_dailymilkrollup_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MilkYieldAnomaly',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('quantity_liters', models.DecimalField(decimal_places=2, help_text='Recorded daily yield', max_digits=6)),
+                ('expected_liters', models.DecimalField(decimal_places=2, help_text='Mean daily yield over the trailing window', max_digits=6)),
+                ('z_score', models.FloatField(help_text='Deviation from the trailing mean in standard deviations')),
+                ('drop_percentage', models.DecimalField(decimal_places=2, help_text='Drop below the trailing mean, in percent', max_digits=5)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('cow', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='milk_yield_anomalies', to='cows.cow')),
+                ('farm', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='milk_yield_anomalies', to='farms.farm')),
+            ],
+            options={
+                'verbose_name': 'Milk Yield Anomaly',
+                'verbose_name_plural': 'Milk Yield Anomalies',
+                'db_table': 'milk_yield_anomalies',
+                'ordering': ['-date', 'z_score'],
+                'indexes': [models.Index(fields=['farm', 'date'], name='milk_anomalies_farm_date_idx'), models.Index(fields=['date'], name='milk_anomalies_date_idx')],
+                'unique_together': {('cow', 'date')},
+            },
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.5 on 2026-10-17 01:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cows', '0004_cow_health_status_cow_last_health_check_date_and_more'),
+        ('farms', '0002_initial'),
+        ('milk', '0005_milkyieldanomaly'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FarmMilkYieldForecast',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('as_of_date', models.DateField(help_text="Date of the farm's newest record")),
+                ('cow_count', models.PositiveIntegerField(default=0)),
+                ('next_day_liters', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('forecast_7_day_liters', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('forecast_30_day_liters', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('farm', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='milk_yield_forecast', to='farms.farm')),
+            ],
+            options={
+                'verbose_name': 'Farm Milk Yield Forecast',
+                'verbose_name_plural': 'Farm Milk Yield Forecasts',
+                'db_table': 'milk_farm_yield_forecasts',
+            },
+        ),
+        migrations.CreateModel(
+            name='MilkYieldForecast',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('as_of_date', models.DateField(help_text='Date of the newest record the forecast is based on')),
+                ('level_liters', models.FloatField(help_text='Smoothed daily yield at as_of_date')),
+                ('trend_liters', models.FloatField(help_text='Smoothed daily change in yield at as_of_date')),
+                ('next_day_liters', models.DecimalField(decimal_places=2, max_digits=8)),
+                ('forecast_7_day_liters', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('forecast_30_day_liters', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('source_record_count', models.PositiveIntegerField(default=0)),
+                ('source_updated_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('cow', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='milk_yield_forecast', to='cows.cow')),
+                ('farm', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='milk_yield_forecasts', to='farms.farm')),
+            ],
+            options={
+                'verbose_name': 'Milk Yield Forecast',
+                'verbose_name_plural': 'Milk Yield Forecasts',
+                'db_table': 'milk_yield_forecasts',
+                'indexes': [models.Index(fields=['farm', 'as_of_date'], name='milk_forecasts_farm_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.5 on 2026-10-17 02:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('milk', '0006_farmmilkyieldforecast_milkyieldforecast'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(help_text='Import kind and absolute path of the input file', max_length=500, unique=True)),
+                ('fingerprint', models.CharField(help_text='Size and modification time of the input file when the import started', max_length=100)),
+                ('rows_read', models.BigIntegerField(default=0)),
+                ('imported_count', models.BigIntegerField(default=0)),
+                ('rejected_count', models.BigIntegerField(default=0)),
+                ('first_date', models.DateField(blank=True, null=True)),
+                ('last_date', models.DateField(blank=True, null=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Import Checkpoint',
+                'verbose_name_plural': 'Import Checkpoints',
+                'db_table': 'farm_data_import_checkpoints',
+            },
+        ),
+    ]
@@ -1,7 +1,10 @@
-from django.db import models
+from django.db import models, transaction
 from users.models import User
 from farms.models import Farm
-from cows.models import Cow
+from cows.models import Cow, touch_cows
+
+# What a record contributes to the rollups
+ROLLUP_COLUMNS = ('farm_id', 'cow_id', 'date', 'total_quantity_liters')
 
 class MilkRecord(models.Model):
     """
@@ -103,12 +106,320 @@ class MilkRecord(models.Model):
         verbose_name_plural = 'Milk Records'
         ordering = ['-date', '-created_at']
         unique_together = ['cow', 'date']  # One record per cow per day
+        indexes = [
+            # Keyset pagination seeks on (date, id), optionally scoped to a farm
+            models.Index(fields=['date', 'id'], name='milk_records_date_id_idx'),
+            models.Index(fields=['farm', 'date', 'id'], name='milk_records_farm_date_id_idx'),
+        ]
     
     def __str__(self):
         return f"{self.cow.tag_number} - {self.date} ({self.total_quantity_liters}L)"
     
-    def save(self, *args, **kwargs):
-        """Override save to automatically calculate total quantity"""
+    def save(self, *args, refresh_rollups=True, **kwargs):
+        """
+        Override save to automatically calculate total quantity and keep the
+        production rollups in step. Batch writers pass refresh_rollups=False and
+        apply the rollup deltas once for the whole batch.
+        """
         if not self.total_quantity_liters:
             self.total_quantity_liters = (self.morning_quantity_liters or 0) + (self.evening_quantity_liters or 0)
-        super().save(*args, **kwargs)
+        
+        if not refresh_rollups:
+            return super().save(*args, **kwargs)
+        
+        from .rollups import apply_milk_rollup_deltas
+        with transaction.atomic():
+            # Locked, so concurrent edits of this record take their deltas in turn
+            previous = MilkRecord.objects.select_for_update().filter(pk=self.pk).values_list(
+                *ROLLUP_COLUMNS
+            ).first() if self.pk else None
+            super().save(*args, **kwargs)
+            apply_milk_rollup_deltas(added=[self.rollup_row], removed=[previous] if previous else [])
+            # The cows' milk record counts change only when the record is new or moves
+            if not previous or previous[1] != self.cow_id:
+                touch_cows([self.cow_id] + ([previous[1]] if previous else []))
+    
+    @property
+    def rollup_key(self):
+        """(farm_id, cow_id, date) key of the daily rollup row this record feeds"""
+        return (self.farm_id, self.cow_id, self.date)
+    
+    @property
+    def rollup_row(self):
+        """The record's ROLLUP_COLUMNS values, as apply_milk_rollup_deltas takes them"""
+        return (*self.rollup_key, self.total_quantity_liters)
+    
+    def delete(self, *args, **kwargs):
+        """Override delete to keep the production rollups in step"""
+        from .rollups import apply_milk_rollup_deltas
+        with transaction.atomic():
+            current = MilkRecord.objects.select_for_update().filter(pk=self.pk).values_list(*ROLLUP_COLUMNS).first()
+            result = super().delete(*args, **kwargs)
+            if current:
+                apply_milk_rollup_deltas(removed=[current])
+                touch_cows([current[1]])
+        return result
+
+class DailyMilkRollup(models.Model):
+    """
+    Farm x cow x day production rollup, maintained from MilkRecord writes
+    """
+    farm = models.ForeignKey(
+        Farm,
+        on_delete=models.CASCADE,
+        related_name='daily_milk_rollups'
+    )
+    
+    cow = models.ForeignKey(
+        Cow,
+        on_delete=models.CASCADE,
+        related_name='daily_milk_rollups'
+    )
+    
+    date = models.DateField()
+    
+    record_count = models.PositiveIntegerField(default=0)
+    
+    total_quantity_liters = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=0
+    )
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'milk_daily_rollups'
+        verbose_name = 'Daily Milk Rollup'
+        verbose_name_plural = 'Daily Milk Rollups'
+        unique_together = ['farm', 'cow', 'date']
+        indexes = [
+            models.Index(fields=['date', 'farm'], name='milk_daily_rollups_date_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.cow_id} @ {self.farm_id} - {self.date} ({self.total_quantity_liters}L)"
+
+class MonthlyFarmMilkRollup(models.Model):
+    """
+    Farm x month production rollup, maintained from MilkRecord writes
+    """
+    farm = models.ForeignKey(
+        Farm,
+        on_delete=models.CASCADE,
+        related_name='monthly_milk_rollups'
+    )
+    
+    month = models.DateField(help_text="First day of the month")
+    
+    record_count = models.PositiveIntegerField(default=0)
+    
+    total_quantity_liters = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0
+    )
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'milk_monthly_farm_rollups'
+        verbose_name = 'Monthly Farm Milk Rollup'
+        verbose_name_plural = 'Monthly Farm Milk Rollups'
+        unique_together = ['farm', 'month']
+    
+    def __str__(self):
+        return f"{self.farm_id} - {self.month:%Y-%m} ({self.total_quantity_liters}L)"
+
+class MilkRollupCoverage(models.Model):
+    """
+    Date range for which the rollups have been rebuilt from raw milk records
+    An open end_date means the range runs up to the present, with incremental
+    maintenance keeping every later write covered
+    """
+    start_date = models.DateField()
+    
+    end_date = models.DateField(blank=True, null=True)
+    
+    rebuilt_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'milk_rollup_coverage'
+        verbose_name = 'Milk Rollup Coverage'
+        verbose_name_plural = 'Milk Rollup Coverage'
+        ordering = ['start_date']
+    
+    def __str__(self):
+        return f"{self.start_date} - {self.end_date or 'open'}"
+
+class MilkYieldAnomaly(models.Model):
+    """
+    Sudden per-cow yield drop flagged by the detect_milk_anomalies job
+    A possible early sign of mastitis or other illness
+    """
+    farm = models.ForeignKey(
+        Farm,
+        on_delete=models.CASCADE,
+        related_name='milk_yield_anomalies'
+    )
+    
+    cow = models.ForeignKey(
+        Cow,
+        on_delete=models.CASCADE,
+        related_name='milk_yield_anomalies'
+    )
+    
+    date = models.DateField()
+    
+    quantity_liters = models.DecimalField(
+        max_digits=6,
+        decimal_places=2,
+        help_text="Recorded daily yield"
+    )
+    
+    expected_liters = models.DecimalField(
+        max_digits=6,
+        decimal_places=2,
+        help_text="Mean daily yield over the trailing window"
+    )
+    
+    z_score = models.FloatField(help_text="Deviation from the trailing mean in standard deviations")
+    
+    drop_percentage = models.DecimalField(
+        max_digits=5,
+        decimal_places=2,
+        help_text="Drop below the trailing mean, in percent"
+    )
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'milk_yield_anomalies'
+        verbose_name = 'Milk Yield Anomaly'
+        verbose_name_plural = 'Milk Yield Anomalies'
+        unique_together = ['cow', 'date']
+        ordering = ['-date', 'z_score']
+        indexes = [
+            models.Index(fields=['farm', 'date'], name='milk_anomalies_farm_date_idx'),
+            models.Index(fields=['date'], name='milk_anomalies_date_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.cow_id} - {self.date} (z={self.z_score:.1f})"
+
+class MilkYieldForecast(models.Model):
+    """
+    Cached per-cow yield forecast from the forecast_milk_yield job
+    The source_* fields record the milk records the forecast was built from,
+    so the job only recomputes cows whose records changed
+    """
+    farm = models.ForeignKey(
+        Farm,
+        on_delete=models.CASCADE,
+        related_name='milk_yield_forecasts'
+    )
+    
+    cow = models.OneToOneField(
+        Cow,
+        on_delete=models.CASCADE,
+        related_name='milk_yield_forecast'
+    )
+    
+    as_of_date = models.DateField(help_text="Date of the newest record the forecast is based on")
+    
+    level_liters = models.FloatField(help_text="Smoothed daily yield at as_of_date")
+    
+    trend_liters = models.FloatField(help_text="Smoothed daily change in yield at as_of_date")
+    
+    next_day_liters = models.DecimalField(max_digits=8, decimal_places=2)
+    
+    forecast_7_day_liters = models.DecimalField(max_digits=10, decimal_places=2)
+    
+    forecast_30_day_liters = models.DecimalField(max_digits=10, decimal_places=2)
+    
+    source_record_count = models.PositiveIntegerField(default=0)
+    
+    source_updated_at = models.DateTimeField(blank=True, null=True)
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'milk_yield_forecasts'
+        verbose_name = 'Milk Yield Forecast'
+        verbose_name_plural = 'Milk Yield Forecasts'
+        indexes = [
+            models.Index(fields=['farm', 'as_of_date'], name='milk_forecasts_farm_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.cow_id} @ {self.as_of_date} (7d {self.forecast_7_day_liters}L)"
+
+class FarmMilkYieldForecast(models.Model):
+    """
+    Cached per-farm yield forecast, the sum of the farm's active cow forecasts
+    """
+    farm = models.OneToOneField(
+        Farm,
+        on_delete=models.CASCADE,
+        related_name='milk_yield_forecast'
+    )
+    
+    as_of_date = models.DateField(help_text="Date of the farm's newest record")
+    
+    cow_count = models.PositiveIntegerField(default=0)
+    
+    next_day_liters = models.DecimalField(max_digits=12, decimal_places=2)
+    
+    forecast_7_day_liters = models.DecimalField(max_digits=14, decimal_places=2)
+    
+    forecast_30_day_liters = models.DecimalField(max_digits=14, decimal_places=2)
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'milk_farm_yield_forecasts'
+        verbose_name = 'Farm Milk Yield Forecast'
+        verbose_name_plural = 'Farm Milk Yield Forecasts'
+    
+    def __str__(self):
+        return f"{self.farm_id} @ {self.as_of_date} (7d {self.forecast_7_day_liters}L)"
+
+class ImportCheckpoint(models.Model):
+    """
+    Progress of an import_farm_data run over one input file
+    rows_read is advanced in the same transaction as each chunk's inserts, so
+    a resumed run neither skips nor repeats rows
+    """
+    source = models.CharField(
+        max_length=500,
+        unique=True,
+        help_text="Import kind and absolute path of the input file"
+    )
+    
+    fingerprint = models.CharField(
+        max_length=100,
+        help_text="Size and modification time of the input file when the import started"
+    )
+    
+    rows_read = models.BigIntegerField(default=0)
+    
+    imported_count = models.BigIntegerField(default=0)
+    
+    rejected_count = models.BigIntegerField(default=0)
+    
+    # Date span of the imported milk records, for the rollup refresh at the end
+    first_date = models.DateField(blank=True, null=True)
+    
+    last_date = models.DateField(blank=True, null=True)
+    
+    completed_at = models.DateTimeField(blank=True, null=True)
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'farm_data_import_checkpoints'
+        verbose_name = 'Import Checkpoint'
+        verbose_name_plural = 'Import Checkpoints'
+    
+    def __str__(self):
+        return f"{self.source} ({self.rows_read} rows read)"
@@ -0,0 +1,274 @@
+"""
+Maintenance of the milk production rollup tables
+Record writes are applied as count and total deltas, so a single write costs
+two upserts whatever the size of the farm-month; rebuild_milk_rollups
+recomputes a date range from the raw milk records
+"""
+
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from django.db import connection, models, transaction
+from django.db.models.functions import Round
+from django.utils import timezone
+
+from cows.models import Cow
+
+from .models import ROLLUP_COLUMNS, MilkRecord, DailyMilkRollup, MonthlyFarmMilkRollup, MilkRollupCoverage
+
+REBUILD_BATCH_SIZE = 5000
+
+def _as_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str):
+        return date.fromisoformat(value)
+    return value
+
+def _month_start(value):
+    return value.replace(day=1)
+
+def _next_month(value):
+    return (value.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+def _insert_daily(records):
+    """
+    Aggregate a record queryset into daily rollup rows with one INSERT ... SELECT
+    The target rows must have been deleted first, as no conflicts are handled
+    """
+    rows = records.values('farm_id', 'cow_id', 'date').annotate(
+        record_count=models.Count('id'),
+        # Rounded like the DecimalField conversion on the ORM path; SQLite sums floats
+        total_quantity_liters=Round(models.Sum('total_quantity_liters'), 2),
+        updated_at=models.Value(timezone.now(), output_field=models.DateTimeField())
+    ).order_by()
+    select, params = rows.query.sql_with_params()
+    quote = connection.ops.quote_name
+    columns = ', '.join(
+        quote(DailyMilkRollup._meta.get_field(name).column)
+        for name in ['farm', 'cow', 'date', 'record_count', 'total_quantity_liters', 'updated_at']
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(f'INSERT INTO {quote(DailyMilkRollup._meta.db_table)} ({columns}) {select}', params)
+
+def _upsert_monthly(rows):
+    MonthlyFarmMilkRollup.objects.bulk_create(
+        [
+            MonthlyFarmMilkRollup(
+                farm_id=farm_id,
+                month=month,
+                record_count=values['record_count'],
+                total_quantity_liters=values['total_quantity_liters']
+            )
+            for (farm_id, month), values in rows.items()
+        ],
+        batch_size=REBUILD_BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=['farm', 'month'],
+        update_fields=['record_count', 'total_quantity_liters', 'updated_at']
+    )
+
+def _monthly_totals(farm_ids, first_month, last_month):
+    """Aggregate raw records into {(farm_id, month): totals} for whole months"""
+    totals = {}
+    rows = MilkRecord.objects.filter(
+        farm_id__in=farm_ids,
+        date__gte=first_month,
+        date__lt=_next_month(last_month)
+    ).values('farm_id', 'date').annotate(
+        record_count=models.Count('id'),
+        total_quantity_liters=models.Sum('total_quantity_liters')
+    ).order_by()
+    for row in rows:
+        key = (row['farm_id'], _month_start(row['date']))
+        entry = totals.setdefault(key, {'record_count': 0, 'total_quantity_liters': 0})
+        entry['record_count'] += row['record_count']
+        entry['total_quantity_liters'] += row['total_quantity_liters'] or 0
+    return totals
+
+def _covered(ranges, first, last):
+    """Whether [first, last] overlaps any of the (start_date, end_date) coverage ranges"""
+    return any(start <= last and (end is None or end >= first) for start, end in ranges)
+
+def _add_to_rollups(model, key_fields, deltas):
+    """
+    Add {key: [record_count, total_quantity_liters]} deltas to rollup rows
+    The statements add to the stored values in the database, so concurrent
+    writers to one row queue on its row lock instead of overwriting each other.
+    Only added records can create a row; removals and edits update the row
+    their record was counted in.
+    """
+    opts = model._meta
+    quote = connection.ops.quote_name
+    table = quote(opts.db_table)
+    keys = [quote(opts.get_field(name).column) for name in key_fields]
+    count, total, updated_at = (
+        quote(opts.get_field(name).column) for name in ['record_count', 'total_quantity_liters', 'updated_at']
+    )
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+    inserts, updates = [], []
+    # Sorted, so writers touching several rows lock them in the same order
+    for key, (record_count, liters) in sorted(deltas.items()):
+        key = [connection.ops.adapt_datefield_value(value) if isinstance(value, date) else value for value in key]
+        liters = connection.ops.adapt_decimalfield_value(liters)
+        if record_count > 0:
+            inserts.append(key + [record_count, liters, now])
+        else:
+            updates.append([record_count, liters, now] + key)
+
+    with connection.cursor() as cursor:
+        if inserts:
+            cursor.executemany(
+                f'INSERT INTO {table} ({", ".join(keys)}, {count}, {total}, {updated_at}) '
+                f'VALUES ({", ".join(["%s"] * (len(keys) + 3))}) '
+                f'ON CONFLICT ({", ".join(keys)}) DO UPDATE SET '
+                f'{count} = {table}.{count} + EXCLUDED.{count}, '
+                f'{total} = {table}.{total} + EXCLUDED.{total}, '
+                f'{updated_at} = EXCLUDED.{updated_at}',
+                inserts
+            )
+        if updates:
+            cursor.executemany(
+                f'UPDATE {table} SET {count} = {count} + %s, {total} = {total} + %s, {updated_at} = %s '
+                f'WHERE {" AND ".join(f"{key} = %s" for key in keys)}',
+                updates
+            )
+
+def apply_milk_rollup_deltas(added=(), removed=()):
+    """
+    Apply inserted and removed milk records to the rollups as deltas
+    Rows are (farm_id, cow_id, date, total_quantity_liters) tuples; an update
+    removes the record's old values and adds its new ones. Only rollup rows
+    inside the rebuilt coverage are maintained: elsewhere there is no complete
+    row to add to, and rebuild_milk_rollups creates them from the raw records.
+    """
+    daily, monthly = {}, {}
+    for sign, rows in ((1, added), (-1, removed)):
+        for farm_id, cow_id, day, liters in rows:
+            day = _as_date(day)
+            liters = sign * Decimal(str(liters or 0))
+            for totals, key in ((daily, (farm_id, cow_id, day)), (monthly, (farm_id, _month_start(day)))):
+                entry = totals.setdefault(key, [0, Decimal(0)])
+                entry[0] += sign
+                entry[1] += liters
+    if not daily:
+        return
+
+    ranges = list(MilkRollupCoverage.objects.values_list('start_date', 'end_date'))
+    # Monthly rows are rebuilt for whole months, so any overlap counts
+    daily = {key: entry for key, entry in daily.items() if entry != [0, 0] and _covered(ranges, key[2], key[2])}
+    monthly = {
+        key: entry for key, entry in monthly.items()
+        if entry != [0, 0] and _covered(ranges, key[1], _next_month(key[1]) - timedelta(days=1))
+    }
+
+    with transaction.atomic():
+        if daily:
+            _add_to_rollups(DailyMilkRollup, ['farm', 'cow', 'date'], daily)
+            DailyMilkRollup.objects.filter(
+                record_count__lte=0,
+                cow_id__in={cow_id for _, cow_id, _ in daily},
+                date__in={day for _, _, day in daily}
+            ).delete()
+        if monthly:
+            _add_to_rollups(MonthlyFarmMilkRollup, ['farm', 'month'], monthly)
+            MonthlyFarmMilkRollup.objects.filter(
+                record_count__lte=0,
+                farm_id__in={farm_id for farm_id, _ in monthly},
+                month__in={month for _, month in monthly}
+            ).delete()
+
+def cascaded_milk_rows(cow_ids=(), farm_ids=()):
+    """
+    ROLLUP_COLUMNS rows of the milk records a cow or farm delete cascades to,
+    for apply_milk_rollup_deltas(removed=...) once the delete is done. Rollup
+    rows of a deleted farm cascade with it, so only records counted under a
+    surviving farm (a deleted cow's records on another farm) are returned.
+    """
+    cows = Cow.objects.filter(models.Q(pk__in=cow_ids) | models.Q(farm_id__in=farm_ids)).values('pk')
+    return list(
+        MilkRecord.objects.select_for_update().filter(cow_id__in=cows).exclude(
+            farm_id__in=farm_ids
+        ).values_list(*ROLLUP_COLUMNS)
+    )
+
+def month_span(start_date, end_date):
+    """First and last day of the whole months overlapping [start_date, end_date]"""
+    return _month_start(start_date), _next_month(end_date) - timedelta(days=1)
+
+def rebuild_milk_rollups(start_date, end_date=None):
+    """
+    Rebuild the rollups for a date range from the raw milk records and record
+    the range as covered. end_date=None rebuilds up to the latest record and
+    marks the coverage as open-ended.
+    """
+    with transaction.atomic():
+        daily_records = MilkRecord.objects.filter(date__gte=start_date)
+        daily_rollups = DailyMilkRollup.objects.filter(date__gte=start_date)
+        if end_date:
+            daily_records = daily_records.filter(date__lte=end_date)
+            daily_rollups = daily_rollups.filter(date__lte=end_date)
+
+        daily_rollups.delete()
+        # Aggregated inside the database: a range can span millions of records
+        _insert_daily(daily_records)
+
+        # Monthly rows are always rebuilt for whole months overlapping the range
+        first_month = _month_start(start_date)
+        last_month = _month_start(end_date) if end_date else None
+        monthly_rollups = MonthlyFarmMilkRollup.objects.filter(month__gte=first_month)
+        if last_month:
+            monthly_rollups = monthly_rollups.filter(month__lte=last_month)
+        else:
+            latest = MilkRecord.objects.aggregate(latest=models.Max('date'))['latest']
+            last_month = _month_start(latest) if latest else first_month
+        monthly_rollups.delete()
+        farm_ids = MilkRecord.objects.filter(
+            date__gte=first_month, date__lt=_next_month(last_month)
+        ).values_list('farm_id', flat=True).distinct().order_by()
+        _upsert_monthly(_monthly_totals(list(farm_ids), first_month, last_month))
+
+        record_coverage(start_date, end_date)
+
+def record_coverage(start_date, end_date=None):
+    """Merge a rebuilt date range into the stored rollup coverage"""
+    ranges = [(start_date, end_date)] + list(
+        MilkRollupCoverage.objects.values_list('start_date', 'end_date')
+    )
+    ranges.sort(key=lambda item: item[0])
+
+    merged = []
+    for start, end in ranges:
+        if merged:
+            last_start, last_end = merged[-1]
+            if last_end is None or start <= last_end + timedelta(days=1):
+                if last_end is None or end is None:
+                    merged[-1] = (last_start, None)
+                else:
+                    merged[-1] = (last_start, max(last_end, end))
+                continue
+        merged.append((start, end))
+
+    MilkRollupCoverage.objects.all().delete()
+    MilkRollupCoverage.objects.bulk_create(
+        [MilkRollupCoverage(start_date=start, end_date=end) for start, end in merged]
+    )
+
+def drop_coverage(start_date, end_date):
+    """
+    Remove the whole months overlapping [start_date, end_date] from the rollup
+    coverage, for writes that bypass the deltas. Reports read the raw records
+    there until rebuild_milk_rollups covers the months again.
+    """
+    first, last = month_span(start_date, end_date)
+    ranges = []
+    for start, end in MilkRollupCoverage.objects.values_list('start_date', 'end_date'):
+        if start < first:
+            ranges.append((start, min(end, first - timedelta(days=1)) if end else first - timedelta(days=1)))
+        if end is None or end > last:
+            ranges.append((max(start, last + timedelta(days=1)), end))
+
+    MilkRollupCoverage.objects.all().delete()
+    MilkRollupCoverage.objects.bulk_create(
+        [MilkRollupCoverage(start_date=start, end_date=end) for start, end in ranges]
+    )
@@ -1,13 +1,42 @@
 from rest_framework import serializers
+from rest_framework.settings import api_settings
+from django.db import IntegrityError, transaction
 from .models import MilkRecord
+from .rollups import apply_milk_rollup_deltas
 from users.serializers import UserSerializer
 from farms.serializers import FarmSerializer
 from cows.serializers import CowSerializer
-from cows.models import Cow
+from cows.models import Cow, touch_cows
 from users.models import User
 from farms.models import Farm
+from core_service.flat import full_name
 from datetime import date
 
+# Rows accepted by one bulk-record request, e.g. a cooperative's whole morning collection
+MAX_BULK_MILK_RECORDS = 5000
+BULK_CREATE_BATCH_SIZE = 1000
+
+def validate_milk_quantities(data):
+    """Range checks shared by single and bulk milk recording"""
+    morning_qty = data.get('morning_quantity_liters', 0)
+    evening_qty = data.get('evening_quantity_liters', 0)
+    
+    if morning_qty < 0 or evening_qty < 0:
+        raise serializers.ValidationError("Milk quantities cannot be negative")
+    
+    if morning_qty > 50 or evening_qty > 50:
+        raise serializers.ValidationError("Milk quantities seem unusually high (>50L)")
+    
+    # Validate quality metrics
+    fat_percentage = data.get('fat_percentage')
+    protein_percentage = data.get('protein_percentage')
+    
+    if fat_percentage is not None and (fat_percentage < 0 or fat_percentage > 10):
+        raise serializers.ValidationError("Fat percentage must be between 0 and 10")
+    
+    if protein_percentage is not None and (protein_percentage < 0 or protein_percentage > 10):
+        raise serializers.ValidationError("Protein percentage must be between 0 and 10")
+
 class MilkRecordSerializer(serializers.ModelSerializer):
     """Serializer for MilkRecord model"""
     cow = CowSerializer(read_only=True)
@@ -45,6 +74,7 @@ class MilkRecordListSerializer(serializers.ModelSerializer):
     cow_tag = serializers.CharField(source='cow.tag_number', read_only=True)
     farmer_name = serializers.CharField(source='farmer.get_full_name', read_only=True)
     farm_name = serializers.CharField(source='farm.name', read_only=True)
+    flat_fields = {'farmer_name': (['farmer__first_name', 'farmer__last_name'], full_name)}
     
     class Meta:
         model = MilkRecord
@@ -97,25 +127,7 @@ class DailyMilkProductionSerializer(serializers.ModelSerializer):
         if MilkRecord.objects.filter(cow=cow, date=production_date).exists():
             raise serializers.ValidationError(f"Milk record already exists for cow {cow_tag} on {production_date}")
         
-        # Validate quantities
-        morning_qty = data.get('morning_quantity_liters', 0)
-        evening_qty = data.get('evening_quantity_liters', 0)
-        
-        if morning_qty < 0 or evening_qty < 0:
-            raise serializers.ValidationError("Milk quantities cannot be negative")
-        
-        if morning_qty > 50 or evening_qty > 50:
-            raise serializers.ValidationError("Milk quantities seem unusually high (>50L)")
-        
-        # Validate quality metrics
-        fat_percentage = data.get('fat_percentage')
-        protein_percentage = data.get('protein_percentage')
-        
-        if fat_percentage is not None and (fat_percentage < 0 or fat_percentage > 10):
-            raise serializers.ValidationError("Fat percentage must be between 0 and 10")
-        
-        if protein_percentage is not None and (protein_percentage < 0 or protein_percentage > 10):
-            raise serializers.ValidationError("Protein percentage must be between 0 and 10")
+        validate_milk_quantities(data)
         
         # Add validated data
         data['cow'] = cow
@@ -136,50 +148,133 @@ class DailyMilkProductionSerializer(serializers.ModelSerializer):
         
         return super().create(validated_data)
 
+class BulkMilkRecordSerializer(serializers.ModelSerializer):
+    """One row of a bulk recording; database checks are done for all rows at once"""
+    cow_tag = serializers.CharField(write_only=True, help_text="Cow tag number")
+    farm_name = serializers.CharField(write_only=True, help_text="Farm name")
+    
+    class Meta:
+        model = MilkRecord
+        fields = [
+            'cow_tag', 'farm_name', 'morning_quantity_liters',
+            'evening_quantity_liters', 'fat_percentage', 'protein_percentage',
+            'quality_rating', 'notes'
+        ]
+    
+    def validate(self, data):
+        validate_milk_quantities(data)
+        return data
+
 class BulkMilkProductionSerializer(serializers.Serializer):
-    """Serializer for bulk milk production recording"""
+    """
+    Serializer for bulk milk production recording
+    Rows are field-checked one by one, then resolved against the database with
+    one query each for the cows, the farms and the records already on file,
+    and inserted with bulk_create in a single transaction. Errors are reported
+    per row, keyed by the row's index in records like DRF's own ListField
+    errors; with skip_invalid the valid rows are recorded anyway.
+    """
     date = serializers.DateField(help_text="Production date")
     records = serializers.ListField(
         child=serializers.DictField(),
-        help_text="List of milk production records"
+        help_text=f"List of milk production records (at most {MAX_BULK_MILK_RECORDS})"
     )
+    skip_invalid = serializers.BooleanField(
+        default=False,
+        help_text="Record the valid rows and report the invalid ones instead of rejecting the request"
+    )
+    
+    def _accessible_cows(self, tags):
+        """Cows with the given tags that the user may record for, by tag"""
+        user = self.context['request'].user
+        cows = Cow.objects.filter(tag_number__in=tags)
+        if user.is_farmer:
+            cows = cows.filter(farmer=user)
+        elif user.is_agent:
+            cows = cows.filter(farm__agent=user)
+        return {cow['tag_number']: cow for cow in cows.values('id', 'tag_number', 'farm_id', 'farmer_id')}
     
     def validate(self, data):
         """Validate bulk milk production data"""
         production_date = data.get('date')
         records = data.get('records', [])
-        user = self.context['request'].user
         
         if not records:
             raise serializers.ValidationError("At least one milk record is required")
         
-        if len(records) > 50:
-            raise serializers.ValidationError("Cannot process more than 50 records at once")
+        if len(records) > MAX_BULK_MILK_RECORDS:
+            raise serializers.ValidationError(f"Cannot process more than {MAX_BULK_MILK_RECORDS} records at once")
         
-        # Validate each record
-        validated_records = []
-        for i, record in enumerate(records):
+        # Field checks, with one row serializer for the whole batch
+        row_serializer = BulkMilkRecordSerializer(context=self.context)
+        rows, errors = [], {}
+        for index, record in enumerate(records):
             try:
-                # Create a temporary serializer for validation
-                temp_data = {**record, 'date': production_date}
-                serializer = DailyMilkProductionSerializer(data=temp_data, context=self.context)
-                if serializer.is_valid():
-                    validated_records.append(serializer.validated_data)
-                else:
-                    raise serializers.ValidationError(f"Record {i+1}: {serializer.errors}")
-            except Exception as e:
-                raise serializers.ValidationError(f"Record {i+1}: {str(e)}")
-        
-        data['validated_records'] = validated_records
+                rows.append((index, row_serializer.run_validation(record)))
+            except serializers.ValidationError as exc:
+                errors[index] = exc.detail
+        
+        # One query each for the cows, the farms and the (cow, date) pairs already recorded
+        cows = self._accessible_cows({row['cow_tag'] for _, row in rows})
+        farm_ids = {}
+        for farm_id, name in Farm.objects.filter(name__in={row['farm_name'] for _, row in rows}).values_list('id', 'name'):
+            farm_ids.setdefault(name, set()).add(farm_id)
+        recorded = set(MilkRecord.objects.filter(
+            cow_id__in=[cow['id'] for cow in cows.values()], date=production_date
+        ).values_list('cow_id', flat=True))
+        
+        milk_records = []
+        batch_cow_ids = set()
+        for index, row in rows:
+            cow_tag, farm_name = row.pop('cow_tag'), row.pop('farm_name')
+            cow = cows.get(cow_tag)
+            if cow is None:
+                error = f"Cow with tag {cow_tag} not found or not accessible"
+            elif farm_name not in farm_ids:
+                error = f"Farm {farm_name} not found"
+            elif cow['farm_id'] not in farm_ids[farm_name]:
+                error = f"Cow {cow_tag} is not assigned to farm {farm_name}"
+            elif cow['id'] in recorded:
+                error = f"Milk record already exists for cow {cow_tag} on {production_date}"
+            elif cow['id'] in batch_cow_ids:
+                error = f"Cow {cow_tag} appears more than once in this request"
+            else:
+                error = None
+            if error:
+                errors[index] = {api_settings.NON_FIELD_ERRORS_KEY: [error]}
+                continue
+            
+            batch_cow_ids.add(cow['id'])
+            row['total_quantity_liters'] = row.get('morning_quantity_liters', 0) + row.get('evening_quantity_liters', 0)
+            milk_records.append(MilkRecord(
+                cow_id=cow['id'], farm_id=cow['farm_id'], farmer_id=cow['farmer_id'], date=production_date, **row
+            ))
+        
+        errors = dict(sorted(errors.items()))
+        if errors and (not data['skip_invalid'] or not milk_records):
+            raise serializers.ValidationError({'records': errors})
+        
+        data['milk_records'] = milk_records
+        data['record_errors'] = errors
         return data
     
     def create(self, validated_data):
-        """Create multiple milk records"""
-        records = validated_data['validated_records']
-        created_records = []
-        
-        for record_data in records:
-            record = MilkRecord.objects.create(**record_data)
-            created_records.append(record)
+        """Insert the validated records in one transaction"""
+        try:
+            with transaction.atomic():
+                created_records = MilkRecord.objects.bulk_create(
+                    validated_data['milk_records'], batch_size=BULK_CREATE_BATCH_SIZE
+                )
+                # Apply the production rollup deltas once for the whole batch
+                apply_milk_rollup_deltas(added=[record.rollup_row for record in created_records])
+                touch_cows(record.cow_id for record in created_records)
+        except IntegrityError:
+            raise serializers.ValidationError(
+                "Some of these records were saved by another request in the meantime; please retry"
+            )
         
-        return {'created_records': len(created_records), 'date': validated_data['date']}
+        return {
+            'created_records': len(created_records),
+            'date': validated_data['date'],
+            'errors': validated_data['record_errors'],
+        }
@@ -1,3 +1,586 @@
-from django.test import TestCase
+"""
+Tests for the milk rollup maintenance, the bulk recording, the yield
+anomalies and forecasts, and the farm data import
 
-# Create your tests here.
+Run with a local database, e.g.
+    DATABASE_URL=sqlite:///db.sqlite3 python manage.py test milk
+"""
+
+import csv
+import os
+import tempfile
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.contrib import admin
+from django.core.management import call_command
+from django.db import IntegrityError, models
+from django.test import SimpleTestCase, TestCase
+import numpy as np
+
+from cows.models import Cow
+from farms.models import Farm
+from users.models import User
+
+from cows.admin import CowAdmin
+from farms.admin import FarmAdmin
+
+from .admin import MilkRecordAdmin
+from .analytics import (
+    YieldMatrix, detect_yield_drops, forecast_farm_yield, holt_smoothing, horizon_totals, load_yield_matrix,
+    rolling_z_scores, run_per_farm
+)
+from .importer import FarmDataImport, FarmDataImportError
+from .models import (
+    MilkRecord, DailyMilkRollup, MonthlyFarmMilkRollup, MilkRollupCoverage, ImportCheckpoint, MilkYieldForecast,
+    FarmMilkYieldForecast
+)
+from .rollups import rebuild_milk_rollups
+from .serializers import MAX_BULK_MILK_RECORDS
+
+def create_herd():
+    """Two farms of one agent, with a farmer and two cows on each"""
+    agent = User.objects.create(username='rollup_agent', role=User.Role.AGENT)
+    cows = []
+    for n in range(2):
+        farm = Farm.objects.create(name=f'Rollup Farm {n}', agent=agent, location='Test Valley', size_acres=Decimal('50.00'))
+        farmer = User.objects.create(username=f'rollup_farmer_{n}', role=User.Role.FARMER)
+        cows += [
+            Cow.objects.create(tag_number=f'ROLL-{n}-{c}', farmer=farmer, farm=farm, date_of_birth=date(2020, 1, 1))
+            for c in range(2)
+        ]
+    return cows
+
+def rollup_snapshot():
+    return (
+        list(DailyMilkRollup.objects.order_by('farm_id', 'cow_id', 'date').values_list(
+            'farm_id', 'cow_id', 'date', 'record_count', 'total_quantity_liters'
+        )),
+        list(MonthlyFarmMilkRollup.objects.order_by('farm_id', 'month').values_list(
+            'farm_id', 'month', 'record_count', 'total_quantity_liters'
+        )),
+    )
+
+class RollupMaintenanceTests(TestCase):
+    """Rollups kept up to date by record writes must match a fresh rebuild"""
+
+    start = date(2024, 3, 20)
+
+    def setUp(self):
+        self.cows = create_herd()
+        MilkRecord.objects.bulk_create([
+            MilkRecord(
+                cow=cow, farmer_id=cow.farmer_id, farm_id=cow.farm_id, date=self.start + timedelta(days=day),
+                morning_quantity_liters=Decimal('10.25'), evening_quantity_liters=Decimal(day % 7),
+                total_quantity_liters=Decimal('10.25') + day % 7
+            )
+            for cow in self.cows
+            for day in range(20)
+        ])
+        rebuild_milk_rollups(self.start)
+
+    def record(self, cow, day, morning='12.50', evening='7.25'):
+        return MilkRecord.objects.create(
+            cow=cow, farmer_id=cow.farmer_id, farm_id=cow.farm_id, date=day,
+            morning_quantity_liters=Decimal(morning), evening_quantity_liters=Decimal(evening)
+        )
+
+    def assert_matches_rebuild(self):
+        maintained = rollup_snapshot()
+        rebuild_milk_rollups(self.start)
+        self.assertEqual(maintained, rollup_snapshot())
+
+    def test_create_edit_and_delete(self):
+        cow, other_cow, other_farm_cow = self.cows[0], self.cows[1], self.cows[2]
+        created = self.record(cow, self.start + timedelta(days=25))
+
+        edited = MilkRecord.objects.get(cow=cow, date=self.start)
+        edited.morning_quantity_liters = Decimal('3.10')
+        edited.total_quantity_liters = None
+        edited.save()
+
+        # Moves between cows, farms, days and months
+        moved = MilkRecord.objects.get(cow=cow, date=self.start + timedelta(days=3))
+        moved.cow, moved.farm_id, moved.farmer_id = other_farm_cow, other_farm_cow.farm_id, other_farm_cow.farmer_id
+        moved.date = self.start + timedelta(days=40)
+        moved.save()
+
+        unchanged = MilkRecord.objects.get(cow=other_cow, date=self.start + timedelta(days=5))
+        unchanged.notes = 'Checked'
+        unchanged.save()
+
+        MilkRecord.objects.get(cow=other_cow, date=self.start + timedelta(days=1)).delete()
+        created.delete()
+
+        self.assert_matches_rebuild()
+
+    def test_emptied_rows_are_removed(self):
+        cow = self.cows[0]
+        MilkRecord.objects.filter(cow=cow, date=self.start + timedelta(days=2)).get().delete()
+
+        self.assertFalse(DailyMilkRollup.objects.filter(cow=cow, date=self.start + timedelta(days=2)).exists())
+        self.assert_matches_rebuild()
+
+    def test_admin_bulk_delete(self):
+        queryset = MilkRecord.objects.filter(farm_id=self.cows[0].farm_id, date__lt=self.start + timedelta(days=15))
+        MilkRecordAdmin(MilkRecord, admin.site).delete_queryset(None, queryset)
+
+        self.assertFalse(MonthlyFarmMilkRollup.objects.filter(farm_id=self.cows[0].farm_id, month=date(2024, 3, 1)).exists())
+        self.assert_matches_rebuild()
+
+    def test_cow_and_farm_deletes_cascade(self):
+        cow, other_cow, other_farm_cow = self.cows[0], self.cows[1], self.cows[2]
+        # Counted under the other farm, so that farm's rollups outlive cow's farm
+        MilkRecord.objects.create(
+            cow=cow, farmer_id=cow.farmer_id, farm_id=other_farm_cow.farm_id, date=self.start + timedelta(days=30),
+            morning_quantity_liters=Decimal('4.00')
+        )
+
+        other_cow.delete()
+        self.assertFalse(DailyMilkRollup.objects.filter(cow_id=other_cow.pk).exists())
+        self.assert_matches_rebuild()
+
+        Farm.objects.get(pk=cow.farm_id).delete()
+        self.assertFalse(MonthlyFarmMilkRollup.objects.filter(farm_id=cow.farm_id).exists())
+        self.assert_matches_rebuild()
+
+    def test_admin_bulk_cow_and_farm_deletes(self):
+        cow, other_farm_cow = self.cows[0], self.cows[2]
+        MilkRecord.objects.create(
+            cow=other_farm_cow, farmer_id=other_farm_cow.farmer_id, farm_id=cow.farm_id,
+            date=self.start + timedelta(days=30), morning_quantity_liters=Decimal('4.00')
+        )
+
+        CowAdmin(Cow, admin.site).delete_queryset(None, Cow.objects.filter(pk=cow.pk))
+        self.assert_matches_rebuild()
+
+        FarmAdmin(Farm, admin.site).delete_queryset(None, Farm.objects.filter(pk=other_farm_cow.farm_id))
+        self.assert_matches_rebuild()
+
+    def test_uncovered_dates_are_left_to_the_rebuild(self):
+        self.record(self.cows[0], date(2023, 12, 5))
+
+        self.assertFalse(DailyMilkRollup.objects.filter(date__lt=self.start).exists())
+        self.assertFalse(MonthlyFarmMilkRollup.objects.filter(month__lt=date(2024, 3, 1)).exists())
+
+class CowTouchTests(TestCase):
+    """Record writes that change a cow's milk record count bump its updated_at"""
+
+    def setUp(self):
+        self.cows = create_herd()
+
+    def updated_at(self, cow):
+        return Cow.objects.values_list('updated_at', flat=True).get(pk=cow.pk)
+
+    def assert_touched(self, cows, write):
+        before = [self.updated_at(cow) for cow in cows]
+        write()
+        for cow, previous in zip(cows, before):
+            self.assertGreater(self.updated_at(cow), previous, cow.tag_number)
+
+    def test_create_move_and_delete(self):
+        cow, other_cow = self.cows[0], self.cows[1]
+        record = MilkRecord(
+            cow=cow, farmer_id=cow.farmer_id, farm_id=cow.farm_id, date=date(2024, 5, 1),
+            morning_quantity_liters=Decimal('9.00')
+        )
+        self.assert_touched([cow], record.save)
+
+        record.cow = other_cow
+        self.assert_touched([cow, other_cow], record.save)
+
+        self.assert_touched([other_cow], record.delete)
+
+    def test_edit_in_place_leaves_the_cow_alone(self):
+        cow = self.cows[0]
+        record = MilkRecord.objects.create(
+            cow=cow, farmer_id=cow.farmer_id, farm_id=cow.farm_id, date=date(2024, 5, 1),
+            morning_quantity_liters=Decimal('9.00')
+        )
+        before = self.updated_at(cow)
+        record.notes = 'Checked'
+        record.save()
+        self.assertEqual(self.updated_at(cow), before)
+
+class BulkMilkProductionTests(TestCase):
+    """POST /api/milk-records/bulk-record/ checks every row and records the batch at once"""
+
+    day = date(2024, 5, 1)
+
+    def setUp(self):
+        self.cows = create_herd()
+        rebuild_milk_rollups(date(2024, 1, 1))
+        self.client.force_login(User.objects.create(username='bulk_admin', role=User.Role.SUPER_ADMIN))
+
+    def post(self, records, **extra):
+        return self.client.post(
+            '/api/milk-records/bulk-record/', {'date': self.day.isoformat(), 'records': records, **extra},
+            content_type='application/json'
+        )
+
+    def row(self, tag, farm='Rollup Farm 0', morning='10.00', **extra):
+        return {'cow_tag': tag, 'farm_name': farm, 'morning_quantity_liters': morning, **extra}
+
+    def test_errors_are_keyed_by_row_index(self):
+        MilkRecord.objects.create(
+            cow=self.cows[1], farmer_id=self.cows[1].farmer_id, farm_id=self.cows[1].farm_id, date=self.day,
+            morning_quantity_liters=Decimal('5.00')
+        )
+        response = self.post([
+            self.row('ROLL-0-0'),
+            self.row('ROLL-0-0'),
+            self.row('ROLL-0-1'),
+            self.row('ROLL-1-0'),
+            self.row('NO-SUCH-COW'),
+            self.row('ROLL-1-1', farm='Rollup Farm 1', morning='-1'),
+        ])
+
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()['records']
+        self.assertEqual(sorted(errors), ['1', '2', '3', '4', '5'])
+        self.assertIn('more than once', errors['1']['non_field_errors'][0])
+        self.assertIn('already exists', errors['2']['non_field_errors'][0])
+        self.assertIn('not assigned to farm', errors['3']['non_field_errors'][0])
+        self.assertIn('not found', errors['4']['non_field_errors'][0])
+        self.assertIn('negative', errors['5']['non_field_errors'][0])
+        # Nothing is recorded without skip_invalid
+        self.assertFalse(MilkRecord.objects.filter(cow=self.cows[0]).exists())
+
+    def test_skip_invalid_records_the_valid_rows(self):
+        response = self.post([self.row('ROLL-0-0'), self.row('NO-SUCH-COW')], skip_invalid=True)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['records_created'], 1)
+        self.assertEqual(list(response.json()['errors']), ['1'])
+        self.assertTrue(MilkRecord.objects.filter(cow=self.cows[0], date=self.day).exists())
+
+        # With no valid row left the request is still rejected
+        self.assertEqual(self.post([self.row('ROLL-0-0')], skip_invalid=True).status_code, 400)
+
+    def test_batch_size_cap(self):
+        response = self.post([self.row('ROLL-0-0')] * (MAX_BULK_MILK_RECORDS + 1))
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(str(MAX_BULK_MILK_RECORDS), response.json()['non_field_errors'][0])
+
+    def test_concurrent_insert_is_a_validation_error(self):
+        with mock.patch.object(MilkRecord.objects, 'bulk_create', side_effect=IntegrityError):
+            response = self.post([self.row('ROLL-0-0')])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('another request', response.json()[0])
+
+    def test_rollups_and_cows_follow_the_batch(self):
+        before = dict(Cow.objects.values_list('pk', 'updated_at'))
+        response = self.post([
+            self.row('ROLL-0-0', evening_quantity_liters='2.50'),
+            self.row('ROLL-0-1', morning='7.25'),
+            self.row('ROLL-1-0', farm='Rollup Farm 1'),
+        ])
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            list(MilkRecord.objects.order_by('cow__tag_number').values_list('total_quantity_liters', flat=True)),
+            [Decimal('12.50'), Decimal('7.25'), Decimal('10.00')]
+        )
+        after = dict(Cow.objects.values_list('pk', 'updated_at'))
+        self.assertEqual([cow.pk for cow in self.cows if after[cow.pk] > before[cow.pk]], [cow.pk for cow in self.cows[:3]])
+        self.assertEqual(
+            list(MonthlyFarmMilkRollup.objects.order_by('farm_id').values_list('month', 'record_count')),
+            [(date(2024, 5, 1), 2), (date(2024, 5, 1), 1)]
+        )
+        maintained = rollup_snapshot()
+        rebuild_milk_rollups(date(2024, 1, 1))
+        self.assertEqual(maintained, rollup_snapshot())
+
+def naive_z_scores(values, window, min_periods):
+    """rolling_z_scores one cow and one day at a time"""
+    z_scores = np.full(values.shape, np.nan)
+    means = np.full(values.shape, np.nan)
+    for cow in range(values.shape[0]):
+        for day in range(values.shape[1]):
+            history = values[cow, max(day - window, 0):day]
+            history = history[~np.isnan(history)]
+            if len(history):
+                means[cow, day] = history.mean()
+            if len(history) < min_periods or np.isnan(values[cow, day]):
+                continue
+            std = history.std(ddof=1)
+            if std > 0:
+                z_scores[cow, day] = (values[cow, day] - history.mean()) / std
+    return z_scores, means
+
+class YieldAnomalyTests(SimpleTestCase):
+    """The vectorized z-scores and drop flags match a per-cow loop"""
+
+    def matrix(self):
+        values = np.random.default_rng(7).normal(20.0, 1.5, size=(4, 40)).round(2)
+        values[0, [3, 4, 5, 17, 30]] = np.nan           # gaps, one inside a window
+        values[0, 25] = 8.0                             # a drop
+        values[1, :] = np.nan                           # short history: 5 days only
+        values[1, [2, 9, 10, 20, 39]] = 15.0
+        values[2, :] = 18.0                             # flat: no spread to score against
+        values[2, 35] = 9.0
+        values[3, 12:] = np.nan                         # stops recording
+        return YieldMatrix(np.array([11, 12, 13, 14]), date(2024, 1, 1), values)
+
+    def test_rolling_z_scores_match_a_loop(self):
+        values = self.matrix().values
+        z_scores, means = rolling_z_scores(values, window=7, min_periods=4)
+        expected_z, expected_means = naive_z_scores(values, window=7, min_periods=4)
+
+        np.testing.assert_allclose(z_scores, expected_z, equal_nan=True)
+        np.testing.assert_allclose(means, expected_means, equal_nan=True)
+        self.assertTrue(np.isnan(z_scores[1]).all())
+        self.assertTrue(np.isnan(z_scores[2, :36]).all())
+
+    def test_detect_yield_drops_matches_a_loop(self):
+        matrix = self.matrix()
+        cows, days, z_scores, means = detect_yield_drops(matrix, window=7, threshold=3.0, min_drop=0.15, min_periods=4)
+
+        expected_z, expected_means = naive_z_scores(matrix.values, window=7, min_periods=4)
+        with np.errstate(invalid='ignore'):
+            flagged = (expected_z <= -3.0) & (1 - matrix.values / expected_means >= 0.15)
+        self.assertEqual(list(zip(cows.tolist(), days.tolist())), list(zip(*np.nonzero(flagged))))
+        self.assertIn((0, 25), list(zip(cows.tolist(), days.tolist())))
+        np.testing.assert_allclose(z_scores, expected_z[flagged])
+        np.testing.assert_allclose(means, expected_means[flagged])
+
+class YieldMatrixLoadTests(TestCase):
+    """load_yield_matrix places each record at its cow's row and day's column"""
+
+    def test_load(self):
+        cows = create_herd()
+        for cow, day, liters in [(cows[1], 0, '10.25'), (cows[0], 3, '7.50'), (cows[1], 4, '0'), (cows[2], 1, '9')]:
+            MilkRecord.objects.create(
+                cow=cow, farmer_id=cow.farmer_id, farm_id=cow.farm_id, date=date(2024, 3, 1) + timedelta(days=day),
+                morning_quantity_liters=Decimal(liters)
+            )
+
+        matrix = load_yield_matrix(cows[0].farm_id, date(2024, 3, 1), date(2024, 3, 5))
+        self.assertEqual(matrix.cow_ids.tolist(), [cows[0].pk, cows[1].pk])
+        np.testing.assert_array_equal(matrix.values, [
+            [np.nan, np.nan, np.nan, 7.5, np.nan],
+            [10.25, np.nan, np.nan, np.nan, 0.0],
+        ])
+
+        only = load_yield_matrix(cows[0].farm_id, date(2024, 3, 1), date(2024, 3, 5), [cows[0].pk])
+        self.assertEqual(only.cow_ids.tolist(), [cows[0].pk])
+        empty = load_yield_matrix(cows[0].farm_id, date(2025, 1, 1), date(2025, 1, 2))
+        self.assertEqual(empty.values.shape, (0, 2))
+
+def farm_and_process(farm_id, offset=0):
+    """A run_per_farm job that reports which process ran it"""
+    return farm_id + offset, os.getpid()
+
+class HoltSmoothingTests(SimpleTestCase):
+    """holt_smoothing follows the scalar recursion, per cow and across gaps"""
+
+    def test_linear_series(self):
+        values = np.array([10.0 + 2 * day for day in range(10)])[None, :]
+        level, trend, last_day = holt_smoothing(values, alpha=1.0, beta=1.0)
+        self.assertEqual((level[0], trend[0], last_day[0]), (28.0, 2.0, 9))
+        self.assertEqual(horizon_totals(level, trend, 3).tolist(), [30.0 + 32.0 + 34.0])
+
+        # Smoothed, the trend converges on the slope and the level on the line
+        level, trend, _ = holt_smoothing((10.0 + 2 * np.arange(600.0))[None, :], alpha=0.5, beta=0.3)
+        self.assertAlmostEqual(trend[0], 2.0, places=6)
+        self.assertAlmostEqual(level[0], 10.0 + 2 * 599, places=4)
+
+    def test_matches_the_scalar_recursion(self):
+        values = np.array([
+            [12.0, np.nan, 13.5, 14.0, np.nan, np.nan, 11.0, 12.5],
+            [np.nan, np.nan, np.nan, 20.0, 21.0, 19.5, np.nan, np.nan],
+            [np.nan] * 8,
+        ])
+        level, trend, last_day = holt_smoothing(values, alpha=0.3, beta=0.1)
+
+        for cow, row in enumerate(values[:2]):
+            expected_level, expected_trend = None, 0.0
+            for observed in row[~np.isnan(row)]:
+                if expected_level is None:
+                    expected_level = observed
+                    continue
+                previous = expected_level
+                expected_level = 0.3 * observed + 0.7 * (previous + expected_trend)
+                expected_trend = 0.1 * (expected_level - previous) + 0.9 * expected_trend
+            self.assertAlmostEqual(level[cow], expected_level)
+            self.assertAlmostEqual(trend[cow], expected_trend)
+        self.assertEqual(last_day.tolist(), [7, 5, -1])
+        self.assertTrue(np.isnan(level[2]))
+
+class ForecastRefreshTests(TestCase):
+    """forecast_farm_yield recomputes only the cows whose records changed"""
+
+    end = date(2024, 6, 30)
+
+    def setUp(self):
+        self.cows = create_herd()
+        MilkRecord.objects.bulk_create([
+            MilkRecord(
+                cow=cow, farmer_id=cow.farmer_id, farm_id=cow.farm_id, date=self.end - timedelta(days=day),
+                morning_quantity_liters=Decimal('12.00'), total_quantity_liters=Decimal(12 + day % 3)
+            )
+            for cow in self.cows
+            for day in range(20)
+        ])
+        self.farm_id = self.cows[0].farm_id
+
+    def test_incremental_refresh(self):
+        self.assertEqual(forecast_farm_yield(self.farm_id), 2)
+        self.assertEqual(forecast_farm_yield(self.farm_id), 0)
+
+        record = MilkRecord.objects.get(cow=self.cows[0], date=self.end)
+        record.total_quantity_liters = Decimal('4.00')
+        record.save()
+        before = MilkYieldForecast.objects.get(cow=self.cows[1]).updated_at
+        self.assertEqual(forecast_farm_yield(self.farm_id), 1)
+        self.assertEqual(MilkYieldForecast.objects.get(cow=self.cows[1]).updated_at, before)
+
+        MilkRecord.objects.filter(cow=self.cows[1], date=self.end - timedelta(days=19)).get().delete()
+        self.assertEqual(forecast_farm_yield(self.farm_id), 1)
+        self.assertEqual(forecast_farm_yield(self.farm_id, full=True), 2)
+        self.assertEqual(FarmMilkYieldForecast.objects.get(farm_id=self.farm_id).cow_count, 2)
+
+    def test_cow_outside_the_window_is_dropped(self):
+        self.assertEqual(forecast_farm_yield(self.farm_id), 2)
+        # cows[1] now last milked 100 days before the farm's newest record
+        MilkRecord.objects.filter(cow=self.cows[1]).update(date=models.F('date') - timedelta(days=100))
+
+        self.assertEqual(forecast_farm_yield(self.farm_id), 0)
+        self.assertEqual(list(MilkYieldForecast.objects.values_list('cow_id', flat=True)), [self.cows[0].pk])
+        # and is not picked up again by later runs
+        self.assertEqual(forecast_farm_yield(self.farm_id), 0)
+        self.assertEqual(FarmMilkYieldForecast.objects.get(farm_id=self.farm_id).cow_count, 1)
+
+    def test_per_farm_pool(self):
+        farm_ids = [self.cows[0].farm_id, self.cows[2].farm_id]
+        inline = run_per_farm(farm_and_process, farm_ids, processes=1, offset=100)
+        pooled = run_per_farm(farm_and_process, farm_ids, processes=2, offset=100)
+
+        self.assertEqual({farm_id: result for farm_id, (result, _) in pooled.items()}, {
+            farm_id: farm_id + 100 for farm_id in farm_ids
+        })
+        self.assertEqual({pid for _, pid in inline.values()}, {os.getpid()})
+        self.assertNotIn(os.getpid(), {pid for _, pid in pooled.values()})
+
+class FarmDataImportTests(TestCase):
+    """import_farm_data rejects bad rows, resumes from its checkpoint and refreshes derived data"""
+
+    def setUp(self):
+        self.cows = create_herd()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def write_csv(self, name, header, rows):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w', newline='') as output:
+            csv.writer(output).writerows([header, *rows])
+        return path
+
+    def interrupt_after_first_chunk(self, path, kind, chunk_size):
+        """Run the first chunk only, as if the process died right after its commit"""
+        chunks = FarmDataImport(path, kind, chunk_size=chunk_size).chunks()
+        first = next(chunks)
+        chunks.close()
+        return first
+
+    def test_milk_records_with_bad_rows_resume(self):
+        path = self.write_csv('milk.csv', ['cow_tag', 'date', 'morning_quantity_liters', 'evening_quantity_liters'], [
+            ['ROLL-0-0', '2024-04-01', '10', '5'],
+            ['ROLL-0-1', '2024-04-01', '11.5', '4'],
+            ['NO-SUCH-COW', '2024-04-01', '1', '1'],
+            ['ROLL-1-0', '2024-04-31', '8', '8'],
+            # Second chunk, read by the resumed run
+            ['ROLL-1-0', '2024-04-02', '9', '9'],
+            ['ROLL-0-0', '2024-04-01', '3', '3'],
+            ['ROLL-1-1', '2024-05-01', '60', '0'],
+            ['ROLL-1-1', '2024-05-01', '20', '2.5'],
+            ['ROLL-0-1', '2024-05-03', '7', 'plenty'],
+            ['ROLL-0-1', '2024-05-03', '7', '1'],
+        ])
+
+        first = self.interrupt_after_first_chunk(path, 'milk-records', chunk_size=4)
+        self.assertEqual((first.rows, first.imported), (4, 2))
+        self.assertEqual([row for row, _ in first.errors], [3, 4])
+        self.assertEqual(MilkRecord.objects.count(), 2)
+
+        rejects_path = os.path.join(self.directory, 'rejects.csv')
+        output = StringIO()
+        call_command('import_farm_data', 'milk-records', path, chunk_size=4, rejects=rejects_path, stdout=output)
+        self.assertIn('Resuming', output.getvalue())
+
+        self.assertEqual(sorted(MilkRecord.objects.values_list('cow__tag_number', 'date', 'total_quantity_liters')), [
+            ('ROLL-0-0', date(2024, 4, 1), Decimal('15.00')),
+            ('ROLL-0-1', date(2024, 4, 1), Decimal('15.50')),
+            ('ROLL-0-1', date(2024, 5, 3), Decimal('8.00')),
+            ('ROLL-1-0', date(2024, 4, 2), Decimal('18.00')),
+            ('ROLL-1-1', date(2024, 5, 1), Decimal('22.50')),
+        ])
+        with open(rejects_path, newline='') as rejects:
+            rejected = list(csv.reader(rejects))
+        self.assertEqual([row[0] for row in rejected], ['row', '6', '7', '9'])
+        self.assertIn('already exists', rejected[1][1])
+
+        checkpoint = ImportCheckpoint.objects.get()
+        self.assertEqual((checkpoint.rows_read, checkpoint.imported_count, checkpoint.rejected_count), (10, 5, 5))
+        self.assertIsNotNone(checkpoint.completed_at)
+
+        # The rollups cover the imported dates and match a fresh rebuild
+        self.assertEqual(
+            list(MonthlyFarmMilkRollup.objects.order_by('farm_id', 'month').values_list('month', 'record_count')),
+            [(date(2024, 4, 1), 2), (date(2024, 5, 1), 1), (date(2024, 4, 1), 1), (date(2024, 5, 1), 1)]
+        )
+        maintained = rollup_snapshot()
+        rebuild_milk_rollups(date(2024, 4, 1), date(2024, 5, 31))
+        self.assertEqual(maintained, rollup_snapshot())
+
+    def test_skip_rollups_uncovers_the_imported_months(self):
+        rebuild_milk_rollups(date(2024, 1, 1))
+        path = self.write_csv('milk.csv', ['cow_tag', 'date', 'morning_quantity_liters'], [
+            ['ROLL-0-0', '2024-04-10', '10'],
+            ['ROLL-0-1', '2024-04-12', '11'],
+        ])
+
+        output = StringIO()
+        call_command('import_farm_data', 'milk-records', path, skip_rollups=True, stdout=output)
+        self.assertIn('--from-date 2024-04-01 --to-date 2024-04-30', output.getvalue())
+        self.assertEqual(
+            list(MilkRollupCoverage.objects.order_by('start_date').values_list('start_date', 'end_date')),
+            [(date(2024, 1, 1), date(2024, 3, 31)), (date(2024, 5, 1), None)]
+        )
+
+        rebuild_milk_rollups(date(2024, 4, 1), date(2024, 4, 30))
+        self.assertEqual(list(MilkRollupCoverage.objects.values_list('start_date', 'end_date')), [(date(2024, 1, 1), None)])
+        self.assertEqual(
+            list(MonthlyFarmMilkRollup.objects.values_list('month', 'record_count')), [(date(2024, 4, 1), 2)]
+        )
+
+    def test_health_checks_refresh_cows_once_resumed(self):
+        path = self.write_csv('activities.csv', ['cow_tag', 'title', 'activity_type', 'scheduled_date', 'health_status'], [
+            ['ROLL-0-0', 'Check', 'HEALTH_CHECK', '2024-04-01', 'SICK'],
+            ['ROLL-0-1', 'Feed', 'FEEDING', '2024-04-01', ''],
+            # Second chunk; ROLL-0-0 was only checked in the interrupted run
+            ['ROLL-1-0', 'Check', 'HEALTH_CHECK', '2024-04-03', 'RECOVERING'],
+            ['ROLL-1-0', 'Check', 'HEALTH_CHECK', '2024-04-02', 'SICK'],
+        ])
+
+        self.interrupt_after_first_chunk(path, 'activities', chunk_size=2)
+        # Health status is refreshed when the run finishes, not per chunk
+        self.assertIsNone(Cow.objects.get(tag_number='ROLL-0-0').health_status)
+
+        call_command('import_farm_data', 'activities', path, chunk_size=2, stdout=StringIO())
+        self.assertEqual(
+            dict(Cow.objects.values_list('tag_number', 'health_status')),
+            {'ROLL-0-0': 'SICK', 'ROLL-0-1': None, 'ROLL-1-0': 'RECOVERING', 'ROLL-1-1': None}
+        )
+        self.assertEqual(Cow.objects.get(tag_number='ROLL-1-0').last_health_check_date, date(2024, 4, 3))
+
+    def test_ndjson_line_that_is_not_an_object(self):
+        path = os.path.join(self.directory, 'milk.ndjson')
+        with open(path, 'w') as output:
+            output.write('{"cow_tag": "ROLL-0-0", "date": "2024-04-01"}\n[1, 2]\n')
+
+        with self.assertRaisesMessage(FarmDataImportError, 'Line 2 of'):
+            list(FarmDataImport(path, 'milk-records').chunks())
@@ -4,24 +4,36 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from .models import MilkRecord
+from cows.models import Cow
+from farms.models import Farm
+from users.models import User
 from .serializers import (
     MilkRecordSerializer, MilkRecordListSerializer, 
     DailyMilkProductionSerializer, BulkMilkProductionSerializer
 )
 from core_service.permissions import MilkRecordPermission
+from core_service.conditional import ConditionalGetMixin
+from core_service.queries import ActionQuerysetMixin
+from core_service.flat import FlatViewMixin
 from django.db import models
 
 # Create your views here.
 
-class MilkRecordViewSet(viewsets.ModelViewSet):
+class MilkRecordViewSet(ConditionalGetMixin, FlatViewMixin, ActionQuerysetMixin, viewsets.ModelViewSet):
     """ViewSet for MilkRecord model with role-based access"""
     queryset = MilkRecord.objects.all()
+    etag_models = [Cow, Farm, User]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_fields = ['date', 'quality_rating', 'cow__breed', 'farm']
     search_fields = ['cow__tag_number', 'cow__name', 'farmer__username', 'farmer__first_name', 'farmer__last_name', 'farm__name']
     ordering_fields = ['date', 'total_quantity_liters', 'created_at']
     ordering = ['-date', '-created_at']
     permission_classes = [MilkRecordPermission]
+    select_related_by_action = {
+        'list': ['cow', 'farmer', 'farm'],
+        'cow_production': ['cow', 'farmer', 'farm'],
+        'default': ['cow__farmer', 'cow__farm__agent', 'farmer', 'farm__agent'],
+    }
     
     def get_queryset(self):
         """Filter queryset based on user role"""
@@ -79,7 +91,8 @@ class MilkRecordViewSet(viewsets.ModelViewSet):
             return Response({
                 'message': f'Bulk milk production recorded successfully',
                 'records_created': result['created_records'],
-                'date': result['date']
+                'date': result['date'],
+                'errors': result['errors']
             }, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
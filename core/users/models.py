@@ -92,6 +92,10 @@ class User(AbstractUser):
         verbose_name = 'User'
         verbose_name_plural = 'Users'
         ordering = ['-created_at']
+        indexes = [
+            # Conditional GET validators read the table's newest updated_at
+            models.Index(fields=['updated_at'], name='users_updated_at_idx'),
+        ]
     
     def __str__(self):
         return f"{self.username} ({self.get_role_display()})"
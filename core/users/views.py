@@ -9,8 +9,9 @@ from django.contrib.auth import authenticate
 from .models import User
 from .serializers import UserSerializer, UserCreateSerializer, UserUpdateSerializer
 from core_service.permissions import IsSuperAdmin, IsSuperAdminOrAgent
+from core_service.conditional import ConditionalGetMixin
 
-class UserViewSet(viewsets.ModelViewSet):
+class UserViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """ViewSet for User model with role-based access"""
     queryset = User.objects.all()
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
@@ -0,0 +1,65 @@
+"""
+Dialect-aware SQL aggregate helpers for the reporting queries
+Postgres gets native FILTER clauses, SQLite falls back to SUM(CASE ...)
+"""
+
+from datetime import date, timedelta
+
+from sqlalchemy import func, case, cast, literal, type_coerce, Date
+
+BUCKETS = ("day", "week", "month")
+
+def dialect_name(db):
+    """Return the SQL dialect name ('postgresql', 'sqlite', ...) behind a session"""
+    return db.get_bind().dialect.name
+
+def count_where(db, condition):
+    """COUNT(*) of the rows matching condition"""
+    if dialect_name(db) == "postgresql":
+        return func.count().filter(condition)
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+def sum_where(db, column, condition):
+    """SUM(column) over the rows matching condition"""
+    if dialect_name(db) == "postgresql":
+        return func.sum(column).filter(condition)
+    return func.sum(case((condition, column), else_=None))
+
+def date_bucket(db, column, bucket):
+    """
+    Truncate a date column to the start of its day, ISO week (Monday) or month
+    Postgres uses date_trunc, SQLite date modifiers / strftime
+    """
+    if dialect_name(db) == "postgresql":
+        return cast(func.date_trunc(bucket, column), Date)
+    if bucket == "week":
+        # Next Sunday (or the day itself), then back to that week's Monday
+        return type_coerce(func.date(column, "weekday 0", "-6 days"), Date)
+    if bucket == "month":
+        return type_coerce(func.strftime("%Y-%m-01", column), Date)
+    return type_coerce(func.date(column), Date)
+
+def bucket_start(value, bucket):
+    """Python counterpart of date_bucket for a single date"""
+    if bucket == "week":
+        return value - timedelta(days=value.weekday())
+    if bucket == "month":
+        return value.replace(day=1)
+    return value
+
+def next_bucket(value, bucket):
+    """Start of the bucket following the one starting at value"""
+    if bucket == "week":
+        return value + timedelta(days=7)
+    if bucket == "month":
+        return (value.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return value + timedelta(days=1)
+
+def day_number(db, column):
+    """
+    Date as a day count, so window frames can use RANGE offsets in days
+    (Postgres date subtraction, SQLite julianday)
+    """
+    if dialect_name(db) == "postgresql":
+        return column - literal(date(1970, 1, 1), Date)
+    return func.julianday(column)
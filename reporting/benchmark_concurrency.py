@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+"""
+Concurrency benchmark for the reporting service
+Fires a mix of slow report requests and fast lookups at a running instance and
+reports throughput plus fast-request latency, so event-loop blocking shows up
+as fast requests queueing behind slow ones
+"""
+
+import argparse
+import statistics
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+SLOW_PATHS = [
+    "/reports/farm-summary?include_farms=true",
+    "/reports/production-summary",
+    "/reports/activity-summary",
+]
+
+FAST_PATHS = [
+    "/",
+    "/farms?limit=10",
+    "/cows?limit=10",
+]
+
+def fetch(base_url, path):
+    """Fetch a single URL and return (path, status, elapsed seconds)"""
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(base_url + path, timeout=60) as response:
+            response.read()
+            status = response.status
+    except Exception:
+        status = 0
+    return path, status, time.perf_counter() - start
+
+def run(base_url, total_requests, concurrency, slow_ratio):
+    """Run the mixed workload and print a summary"""
+    slow_every = max(1, round(1 / slow_ratio)) if slow_ratio > 0 else 0
+    paths = []
+    for i in range(total_requests):
+        if slow_every and i % slow_every == 0:
+            paths.append(SLOW_PATHS[i % len(SLOW_PATHS)])
+        else:
+            paths.append(FAST_PATHS[i % len(FAST_PATHS)])
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda path: fetch(base_url, path), paths))
+    elapsed = time.perf_counter() - start
+
+    failures = [r for r in results if r[1] != 200]
+    fast = sorted(r[2] for r in results if r[0] in FAST_PATHS)
+    slow = sorted(r[2] for r in results if r[0] in SLOW_PATHS)
+
+    def percentile(values, pct):
+        if not values:
+            return 0.0
+        return values[min(len(values) - 1, int(len(values) * pct))] * 1000
+
+    print(f"Requests:     {total_requests} ({len(slow)} slow, {len(fast)} fast), concurrency {concurrency}")
+    print(f"Elapsed:      {elapsed:.2f}s")
+    print(f"Throughput:   {total_requests / elapsed:.1f} req/s")
+    print(f"Failures:     {len(failures)}")
+    if fast:
+        print(f"Fast latency: p50 {percentile(fast, 0.5):.1f}ms  p95 {percentile(fast, 0.95):.1f}ms  "
+              f"mean {statistics.mean(fast) * 1000:.1f}ms")
+    if slow:
+        print(f"Slow latency: p50 {percentile(slow, 0.5):.1f}ms  p95 {percentile(slow, 0.95):.1f}ms  "
+              f"mean {statistics.mean(slow) * 1000:.1f}ms")
+    return not failures
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mixed slow/fast concurrency benchmark")
+    parser.add_argument("--url", default="http://127.0.0.1:8001", help="Base URL of the reporting service")
+    parser.add_argument("--requests", type=int, default=500, help="Total number of requests")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent client connections")
+    parser.add_argument("--slow-ratio", type=float, default=0.2, help="Fraction of requests hitting slow reports")
+    args = parser.parse_args()
+
+    print("Benchmarking FarmHub Reporting Service...")
+    print("=" * 60)
+    ok = run(args.url.rstrip("/"), args.requests, args.concurrency, args.slow_ratio)
+    print("=" * 60)
+    sys.exit(0 if ok else 1)
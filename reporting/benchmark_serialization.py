@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+"""
+Serialization benchmark for the /milk-records and /activities list endpoints
+Loads the same page of rows through the response_model path (ORM objects
+validated by Pydantic, then stdlib json) and the fast path (column tuples
+encoded by fastjson) and reports rows per second for each
+"""
+
+import argparse
+import json
+import sys
+import time
+from typing import List
+
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+import fastjson
+from database import DATABASE_URL
+from models import MilkRecord, Activity
+from schemas import MilkRecordResponse, ActivityResponse
+
+ENDPOINTS = {
+    "milk-records": (MilkRecord, MilkRecordResponse, [MilkRecord.date.desc(), MilkRecord.id.desc()]),
+    "activities": (Activity, ActivityResponse, [Activity.scheduled_date.desc(), Activity.id.desc()]),
+}
+
+def response_model_path(session, model, schema, order_by, limit):
+    """What FastAPI does with response_model: validate every row, then json.dumps"""
+    adapter = TypeAdapter(List[schema])
+    rows = session.scalars(select(model).order_by(*order_by).limit(limit)).all()
+    validated = adapter.validate_python(rows, from_attributes=True)
+    content = adapter.dump_python(validated, mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+def fast_path(session, model, schema, order_by, limit):
+    """Column tuples straight into fastjson"""
+    fields = list(schema.model_fields)
+    rows = session.execute(
+        select(*[getattr(model, field) for field in fields]).order_by(*order_by).limit(limit)
+    ).all()
+    return fastjson.dumps([dict(zip(fields, row)) for row in rows])
+
+def measure(function, session, endpoint, limit, repeat):
+    """Best-of-repeat rows per second, plus the last encoded body"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = function(session, *ENDPOINTS[endpoint], limit)
+        best = min(best, time.perf_counter() - start)
+    return len(json.loads(body)) / best, body
+
+def run(database_url, limit, repeat):
+    """Benchmark both paths for every endpoint and print a summary"""
+    engine = create_engine(database_url)
+    ok = True
+    with Session(engine) as session:
+        for endpoint in ENDPOINTS:
+            before, expected = measure(response_model_path, session, endpoint, limit, repeat)
+            after, body = measure(fast_path, session, endpoint, limit, repeat)
+            same = json.loads(body) == json.loads(expected)
+            ok = ok and same
+            print(f"/{endpoint}:")
+            print(f"  response_model: {before:12,.0f} rows/s")
+            print(f"  fast path:      {after:12,.0f} rows/s  ({after / before:.1f}x)"
+                  f"{'' if same else '  OUTPUT DIFFERS'}")
+    print(f"Encoder: {'orjson' if fastjson.orjson else 'json (orjson not installed)'}")
+    return ok
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="List endpoint serialization benchmark")
+    parser.add_argument("--database-url", default=DATABASE_URL, help="Database to read rows from")
+    parser.add_argument("--limit", type=int, default=1000, help="Rows per page (the endpoints allow up to 1000)")
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per path; the best is reported")
+    args = parser.parse_args()
+
+    print("Benchmarking FarmHub list serialization...")
+    print("=" * 60)
+    ok = run(args.database_url, args.limit, args.repeat)
+    print("=" * 60)
+    sys.exit(0 if ok else 1)
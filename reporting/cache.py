@@ -0,0 +1,291 @@
+"""
+Two-tier response cache for the reporting endpoints
+Tier 1 is an in-process LRU with a TTL, tier 2 is a SQLite file shared by all
+uvicorn workers on the host. Entries are tagged with a watermark of the source
+tables (MAX(updated_at) and COUNT(*) per table), so writes made through the
+Django core invalidate cached reports without waiting for the TTL to expire.
+"""
+
+import asyncio
+import functools
+import hashlib
+import inspect
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import time
+from collections import OrderedDict
+from datetime import date
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import select, func
+from sqlalchemy.engine import make_url
+
+import conditional
+import reportday
+from database import DATABASE_URL
+
+REPORT_CACHE_TTL = float(os.environ.get("REPORT_CACHE_TTL", "300"))
+REPORT_CACHE_MAX_ENTRIES = int(os.environ.get("REPORT_CACHE_MAX_ENTRIES", "512"))
+REPORT_CACHE_MAX_DISK_ENTRIES = int(os.environ.get("REPORT_CACHE_MAX_DISK_ENTRIES", "10000"))
+REPORT_CACHE_DIR = os.environ.get("REPORT_CACHE_DIR", tempfile.gettempdir())
+# The dashboard is loaded on every login, so it gets a short-lived cache of its own
+REPORT_DASHBOARD_CACHE_TTL = float(os.environ.get("REPORT_DASHBOARD_CACHE_TTL", "30"))
+# How long a computed watermark is trusted before the tables are checked again
+WATERMARK_INTERVAL = float(os.environ.get("REPORT_CACHE_WATERMARK_INTERVAL", "2"))
+
+def default_cache_path(database_url=DATABASE_URL, cache_dir=None):
+    """
+    Disk tier file for this deployment: named after REPORT_CACHE_NAMESPACE,
+    or a digest of the database URL (password left out), so deployments that
+    share a host and temp directory never serve each other's reports
+    """
+    namespace = os.environ.get("REPORT_CACHE_NAMESPACE")
+    if namespace:
+        namespace = re.sub(r"[^\w.-]", "_", namespace)
+    else:
+        url = make_url(database_url).render_as_string(hide_password=True)
+        namespace = hashlib.sha256(url.encode()).hexdigest()[:12]
+    return os.path.join(cache_dir or REPORT_CACHE_DIR, f"farmhub-report-cache-{namespace}.sqlite3")
+
+REPORT_CACHE_PATH = os.environ.get("REPORT_CACHE_PATH", default_cache_path())
+
+def normalize_params(params):
+    """Turn query parameters into a stable, JSON-encodable mapping"""
+    normalized = {}
+    for name, value in sorted(params.items()):
+        if value is None:
+            continue
+        if isinstance(value, date):
+            value = value.isoformat()
+        elif isinstance(value, (list, tuple)):
+            value = [str(item) for item in value]
+        elif not isinstance(value, (bool, int, float, str)):
+            value = str(value)
+        normalized[name] = value
+    return normalized
+
+def cache_key(endpoint, params):
+    """Key an entry by endpoint plus normalized query parameters"""
+    raw = json.dumps([endpoint, normalize_params(params)], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+class DiskTier:
+    """Shared on-disk tier backed by a SQLite file"""
+
+    def __init__(self, path, max_entries):
+        self.path = path
+        self.max_entries = max_entries
+        self._initialized = False
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+        if not self._initialized:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS report_cache ("
+                "key TEXT PRIMARY KEY, watermark TEXT NOT NULL, "
+                "expires_at REAL NOT NULL, value TEXT NOT NULL)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS report_cache_expires_idx ON report_cache (expires_at)"
+            )
+            self._initialized = True
+        return connection
+
+    def get(self, key, watermark):
+        """Return (status, value) where status is 'hit', 'miss' or 'stale'"""
+        connection = self._connect()
+        try:
+            row = connection.execute(
+                "SELECT watermark, expires_at, value FROM report_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return "miss", None
+            if row[0] != watermark or row[1] < time.time():
+                connection.execute("DELETE FROM report_cache WHERE key = ?", (key,))
+                return "stale", None
+            return "hit", json.loads(row[2])
+        finally:
+            connection.close()
+
+    def set(self, key, watermark, value, ttl):
+        """Store an entry and return the number of entries evicted to make room"""
+        connection = self._connect()
+        try:
+            connection.execute(
+                "INSERT OR REPLACE INTO report_cache (key, watermark, expires_at, value) VALUES (?, ?, ?, ?)",
+                (key, watermark, time.time() + ttl, json.dumps(value))
+            )
+            evicted = connection.execute(
+                "DELETE FROM report_cache WHERE expires_at < ?", (time.time(),)
+            ).rowcount
+            overflow = connection.execute("SELECT COUNT(*) FROM report_cache").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                evicted += connection.execute(
+                    "DELETE FROM report_cache WHERE key IN "
+                    "(SELECT key FROM report_cache ORDER BY expires_at LIMIT ?)", (overflow,)
+                ).rowcount
+            return evicted
+        finally:
+            connection.close()
+
+class ReportCache:
+    """In-process LRU in front of the shared disk tier, invalidated by table watermarks"""
+
+    def __init__(self, name, ttl=REPORT_CACHE_TTL, max_entries=REPORT_CACHE_MAX_ENTRIES,
+                 disk_path=REPORT_CACHE_PATH, max_disk_entries=REPORT_CACHE_MAX_DISK_ENTRIES):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.disk = DiskTier(disk_path, max_disk_entries) if disk_path else None
+        self._entries = OrderedDict()
+        self._watermarks = {}
+        self.stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "memory_evictions": 0,
+            "disk_evictions": 0,
+            "invalidations": 0,
+        }
+
+    async def watermark(self, db, tables):
+        """
+        Watermark of the source tables: MAX(updated_at) and COUNT(*) per table,
+        computed in one statement and reused for WATERMARK_INTERVAL seconds
+        """
+        return (await self._watermark(db, tables))[0]
+
+    async def _watermark(self, db, tables):
+        """(watermark, latest updated_at across the tables)"""
+        names = tuple(sorted(table.__tablename__ for table in tables))
+        cached = self._watermarks.get(names)
+        now = time.monotonic()
+        if cached and now - cached[0] < WATERMARK_INTERVAL:
+            return cached[1:]
+
+        columns = []
+        for table in sorted(tables, key=lambda table: table.__tablename__):
+            columns.append(select(func.max(table.updated_at)).scalar_subquery())
+            columns.append(select(func.count()).select_from(table).scalar_subquery())
+        row = (await db.execute(select(*columns))).one()
+        watermark = json.dumps([names, [str(value) for value in row]])
+        last_modified = max((value for value in row[::2] if value is not None), default=None)
+        self._watermarks[names] = (now, watermark, last_modified)
+        return watermark, last_modified
+
+    async def check_conditional(self, db, request, response, tables, *parts):
+        """
+        Answer a conditional GET from the tables' watermark; returns a 304
+        response when the client's copy is current, otherwise sets the
+        validators on response and returns None. The watermark is whole-table
+        and reused for WATERMARK_INTERVAL seconds, so the check costs at most
+        one small statement whatever the request filters
+        """
+        watermark, last_modified = await self._watermark(db, tables)
+        return conditional.check(request, response, last_modified, watermark, *parts)
+
+    def _memory_get(self, key, watermark):
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expires_at, entry_watermark, value = entry
+        if entry_watermark != watermark or expires_at < time.monotonic():
+            del self._entries[key]
+            self.stats["invalidations"] += 1
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def _memory_set(self, key, watermark, value):
+        self._entries[key] = (time.monotonic() + self.ttl, watermark, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["memory_evictions"] += 1
+
+    async def get_or_compute(self, db, endpoint, params, tables, compute, watermark=None):
+        """Return the cached response for endpoint/params, computing it on a miss"""
+        key = cache_key(endpoint, params)
+        if watermark is None:
+            watermark = await self.watermark(db, tables)
+
+        found, value = self._memory_get(key, watermark)
+        if found:
+            self.stats["memory_hits"] += 1
+            return value
+
+        if self.disk:
+            status, value = await asyncio.to_thread(self.disk.get, key, watermark)
+            if status == "hit":
+                self.stats["disk_hits"] += 1
+                self._memory_set(key, watermark, value)
+                return value
+            if status == "stale":
+                self.stats["invalidations"] += 1
+
+        self.stats["misses"] += 1
+        value = jsonable_encoder(await compute())
+        self._memory_set(key, watermark, value)
+        if self.disk:
+            self.stats["disk_evictions"] += await asyncio.to_thread(
+                self.disk.set, key, watermark, value, self.ttl
+            )
+        return value
+
+    def cached(self, *tables):
+        """
+        Decorate a report endpoint so its response is served from the cache
+        The endpoint must take its session as `db`; every other argument is
+        treated as a query parameter and becomes part of the cache key, along
+        with today's date because several reports are relative to it.
+        The wrapper also answers conditional GETs: the table watermark doubles
+        as the ETag source, so a matching If-None-Match returns 304 without
+        touching either cache tier.
+        """
+        def decorator(endpoint):
+            @functools.wraps(endpoint)
+            async def wrapper(request: Request, response: Response, **kwargs):
+                db = kwargs["db"]
+                watermark, last_modified = await self._watermark(db, tables)
+                not_modified = conditional.check(
+                    request, response, last_modified, watermark, reportday.today()
+                )
+                if not_modified:
+                    return not_modified
+
+                params = {name: value for name, value in kwargs.items() if name != "db"}
+                params["as_of"] = reportday.today()
+                return await self.get_or_compute(
+                    db, endpoint.__name__, params, tables,
+                    lambda: endpoint(**kwargs), watermark=watermark
+                )
+
+            # FastAPI reads the signature to resolve dependencies, so expose
+            # the endpoint's parameters plus the request/response the wrapper needs
+            signature = inspect.signature(endpoint)
+            wrapper.__signature__ = signature.replace(parameters=[
+                inspect.Parameter("request", inspect.Parameter.KEYWORD_ONLY, annotation=Request),
+                inspect.Parameter("response", inspect.Parameter.KEYWORD_ONLY, annotation=Response),
+                *[parameter.replace(kind=inspect.Parameter.KEYWORD_ONLY)
+                  for parameter in signature.parameters.values()],
+            ])
+            return wrapper
+        return decorator
+
+    def snapshot(self):
+        """Counters plus derived hit ratio, for the stats endpoint"""
+        lookups = self.stats["memory_hits"] + self.stats["disk_hits"] + self.stats["misses"]
+        hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+        return {
+            **self.stats,
+            "memory_entries": len(self._entries),
+            "hit_ratio": hits / lookups if lookups else 0.0,
+        }
+
+report_cache = ReportCache("reports")
+dashboard_cache = ReportCache("dashboard", ttl=REPORT_DASHBOARD_CACHE_TTL)
@@ -0,0 +1,56 @@
+"""
+Conditional GET support (ETag / Last-Modified) for the reporting endpoints
+Detail endpoints validate on the row's own updated_at; list and report
+endpoints on the ReportCache watermark of their tables (MAX(updated_at) and
+COUNT(*) per table), so a matching If-None-Match is answered with 304 before
+any rows are loaded or serialized
+"""
+
+import hashlib
+import json
+from email.utils import format_datetime
+from datetime import timezone
+
+from fastapi import Response
+
+def make_etag(*parts):
+    """Build a strong ETag from the values that determine a response"""
+    raw = json.dumps([str(part) for part in parts], separators=(",", ":"))
+    return '"' + hashlib.sha256(raw.encode()).hexdigest()[:32] + '"'
+
+def etag_matches(request, etag):
+    """True when the request's If-None-Match covers etag"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = [candidate.strip() for candidate in header.split(",")]
+    # If-None-Match uses the weak comparison function
+    return any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+def http_date(value):
+    """Format a naive-UTC or aware datetime as an HTTP date"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+def not_modified(etag, last_modified=None):
+    """304 response carrying the current validators"""
+    headers = {"ETag": etag}
+    if last_modified:
+        headers["Last-Modified"] = http_date(last_modified)
+    return Response(status_code=304, headers=headers)
+
+def check(request, response, last_modified, *parts):
+    """
+    Shared by list, detail and report endpoints: the ETag covers the URL
+    (path and query string) plus the given validator parts
+    """
+    etag = make_etag(request.url.path, request.url.query, last_modified, *parts)
+    if etag_matches(request, etag):
+        return not_modified(etag, last_modified)
+    response.headers["ETag"] = etag
+    if last_modified:
+        response.headers["Last-Modified"] = http_date(last_modified)
+    return None
@@ -0,0 +1,244 @@
+"""
+Shared fixtures for the reporting tests
+The app is bound to a throwaway SQLite file through the sync and async
+sessionmakers in database.py: either seeded with the budget dataset from
+../query_budgets.toml, or empty for tests that insert their own rows.
+"""
+
+import tomllib
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+import database
+import main
+import metrics
+from cache import report_cache, dashboard_cache
+from models import (
+    Base, User, Farm, Cow, MilkRecord, Activity, MilkYieldAnomaly,
+    MilkYieldForecast, FarmMilkYieldForecast, DailyMilkRollup,
+    MonthlyFarmMilkRollup,
+)
+
+BUDGETS_PATH = Path(__file__).resolve().parent.parent / "query_budgets.toml"
+ADMIN_TOKEN = "budget-token"
+
+with open(BUDGETS_PATH, "rb") as budgets_file:
+    DATASET = tomllib.load(budgets_file)["dataset"]
+
+ACTIVITY_TYPES = ("FEEDING", "HEALTH_CHECK", "VACCINATION", "MILKING", "MEDICATION", "WEIGHING")
+
+def seed_dataset(connection, sizes):
+    """
+    Insert the same shape of data the core budget tests use
+    Returns the placeholder values for the budget table's paths, which point
+    at the first farm, its first farmer and that farmer's first cow
+    """
+    today = date.today()
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    users, farms, cows, milk_records, activities = [], [], [], [], []
+    anomalies, forecasts, farm_forecasts = [], [], []
+
+    def add_user(role):
+        user_id = len(users) + 1
+        users.append({
+            "id": user_id, "username": f"budget_{role.lower()}_{user_id}", "email": f"{user_id}@farmhub.test",
+            "first_name": "Budget", "last_name": role.title(), "role": role, "is_active": True,
+            "is_staff": False, "is_superuser": False, "date_joined": now, "created_at": now, "updated_at": now,
+        })
+        return user_id
+
+    add_user("SUPER_ADMIN")
+    for _ in range(sizes["agents"]):
+        agent_id = add_user("AGENT")
+        for _ in range(sizes["farms_per_agent"]):
+            farm_id = len(farms) + 1
+            farms.append({
+                "id": farm_id, "name": f"Budget Farm {farm_id}", "agent_id": agent_id, "location": "Budget Valley",
+                "size_acres": Decimal("120.00"), "is_active": True, "created_at": now, "updated_at": now,
+            })
+            farm_forecasts.append({
+                "farm_id": farm_id, "as_of_date": today - timedelta(days=1),
+                "cow_count": sizes["farmers_per_farm"] * sizes["cows_per_farmer"],
+                "next_day_liters": Decimal("240.00"), "forecast_7_day_liters": Decimal("1680.00"),
+                "forecast_30_day_liters": Decimal("7200.00"), "updated_at": now,
+            })
+            for _ in range(sizes["farmers_per_farm"]):
+                farmer_id = add_user("FARMER")
+                for c in range(sizes["cows_per_farmer"]):
+                    cow_id = len(cows) + 1
+                    cows.append({
+                        "id": cow_id, "tag_number": f"BUD-{cow_id}", "name": f"Cow {cow_id}", "breed": "HOLSTEIN",
+                        "farmer_id": farmer_id, "farm_id": farm_id, "date_of_birth": today - timedelta(days=900 + c * 30),
+                        "status": "ACTIVE", "is_pregnant": False, "created_at": now, "updated_at": now,
+                    })
+                    for day in range(1, sizes["milk_days"] + 1):
+                        morning = Decimal(10 + (cow_id + day) % 5) + Decimal("0.50")
+                        evening = Decimal(8 + (cow_id * day) % 4)
+                        milk_records.append({
+                            "cow_id": cow_id, "farmer_id": farmer_id, "farm_id": farm_id,
+                            "date": today - timedelta(days=day), "morning_quantity_liters": morning,
+                            "evening_quantity_liters": evening, "total_quantity_liters": morning + evening,
+                            "quality_rating": "GOOD", "created_at": now, "updated_at": now,
+                        })
+                    for n in range(sizes["activities_per_cow"]):
+                        activity_type = ACTIVITY_TYPES[n % len(ACTIVITY_TYPES)]
+                        activities.append({
+                            "title": f"{activity_type.title()} {n}", "activity_type": activity_type, "cow_id": cow_id,
+                            "scheduled_date": today + timedelta(days=n * 3 - 12),
+                            "status": ("COMPLETED", "PLANNED")[n % 2],
+                            "health_status": "HEALTHY" if activity_type == "HEALTH_CHECK" else None,
+                            "cost": Decimal("15.00"), "created_at": now, "updated_at": now,
+                        })
+                    anomalies.append({
+                        "farm_id": farm_id, "cow_id": cow_id, "date": today - timedelta(days=2),
+                        "quantity_liters": Decimal("9.00"), "expected_liters": Decimal("20.00"),
+                        "z_score": -3.5, "drop_percentage": Decimal("55.00"), "updated_at": now,
+                    })
+                    forecasts.append({
+                        "farm_id": farm_id, "cow_id": cow_id, "as_of_date": today - timedelta(days=1),
+                        "level_liters": 20.0, "trend_liters": 0.1, "next_day_liters": Decimal("20.10"),
+                        "forecast_7_day_liters": Decimal("143.00"), "forecast_30_day_liters": Decimal("646.50"),
+                        "source_record_count": sizes["milk_days"], "source_updated_at": now, "updated_at": now,
+                    })
+
+    daily_rollups, monthly_rollups = build_rollups(milk_records, now)
+    for model, rows in (
+        (User, users), (Farm, farms), (Cow, cows), (MilkRecord, milk_records), (Activity, activities),
+        (MilkYieldAnomaly, anomalies), (MilkYieldForecast, forecasts), (FarmMilkYieldForecast, farm_forecasts),
+        (DailyMilkRollup, daily_rollups), (MonthlyFarmMilkRollup, monthly_rollups),
+    ):
+        connection.execute(insert(model), rows)
+
+    cow = cows[0]
+    return {
+        "admin_token": ADMIN_TOKEN,
+        "farmer_id": cow["farmer_id"],
+        "farm_id": cow["farm_id"],
+        "cow_id": cow["id"],
+        "cow_ids": ",".join(str(other["id"]) for other in cows if other["farmer_id"] == cow["farmer_id"]),
+    }
+
+def build_rollups(milk_records, now):
+    """The daily and monthly rollup rows rebuild_milk_rollups would write for these records"""
+    daily, monthly = {}, {}
+    for record in milk_records:
+        keys = (
+            (daily, (record["farm_id"], record["cow_id"], record["date"])),
+            (monthly, (record["farm_id"], record["date"].replace(day=1))),
+        )
+        for totals, key in keys:
+            count, total = totals.get(key, (0, Decimal(0)))
+            totals[key] = (count + 1, total + record["total_quantity_liters"])
+    return (
+        [{"farm_id": farm_id, "cow_id": cow_id, "date": day, "record_count": count,
+          "total_quantity_liters": total, "updated_at": now}
+         for (farm_id, cow_id, day), (count, total) in daily.items()],
+        [{"farm_id": farm_id, "month": month, "record_count": count,
+          "total_quantity_liters": total, "updated_at": now}
+         for (farm_id, month), (count, total) in monthly.items()],
+    )
+
+def insert_herd(engine, cow_count=2):
+    """
+    An agent's farm with one farmer owning cow_count cows, for tests that add
+    their own milk records; returns {"farm_id", "farmer_id", "cow_ids"}
+    """
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    with engine.begin() as connection:
+        for user_id, role in ((1, "AGENT"), (2, "FARMER")):
+            connection.execute(insert(User), {
+                "id": user_id, "username": f"herd_{role.lower()}", "email": f"herd_{user_id}@farmhub.test",
+                "first_name": "Herd", "last_name": role.title(), "role": role, "is_active": True,
+                "is_staff": False, "is_superuser": False, "date_joined": now, "created_at": now, "updated_at": now,
+            })
+        connection.execute(insert(Farm), {
+            "id": 1, "name": "Herd Farm", "agent_id": 1, "location": "Herd Valley", "size_acres": Decimal("40.00"),
+            "is_active": True, "created_at": now, "updated_at": now,
+        })
+        connection.execute(insert(Cow), [
+            {
+                "id": cow_id, "tag_number": f"HERD-{cow_id}", "name": f"Herd Cow {cow_id}", "breed": "JERSEY",
+                "farmer_id": 2, "farm_id": 1, "date_of_birth": date(2020, 1, 1), "status": "ACTIVE",
+                "is_pregnant": False, "created_at": now, "updated_at": now,
+            }
+            for cow_id in range(1, cow_count + 1)
+        ])
+    return {"farm_id": 1, "farmer_id": 2, "cow_ids": list(range(1, cow_count + 1))}
+
+def milk_row(cow_id, day, liters, **extra):
+    """A milk_records row of an insert_herd cow"""
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    liters = Decimal(str(liters))
+    return {
+        "cow_id": cow_id, "farmer_id": 2, "farm_id": 1, "date": day, "morning_quantity_liters": liters,
+        "evening_quantity_liters": Decimal("0.00"), "total_quantity_liters": liters, "quality_rating": "GOOD",
+        "created_at": now, "updated_at": now, **extra,
+    }
+
+@contextmanager
+def bound_app(path):
+    """
+    Bind the app's sessions to the SQLite file at path for the duration
+    Yields (client, statements, sync_engine); statements collects the SQL the
+    async engine runs, for the tests to clear and inspect
+    """
+    sync_engine = create_engine(f"sqlite:///{path}")
+    # NullPool: no pooled aiosqlite connection outlives the test loop
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool)
+    metrics.instrument_engine(async_engine.sync_engine)
+    statements = []
+
+    @event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    previous_binds = database.SessionLocal.kw["bind"], database.AsyncSessionLocal.kw["bind"]
+    database.SessionLocal.configure(bind=sync_engine)
+    database.AsyncSessionLocal.configure(bind=async_engine)
+    try:
+        yield TestClient(main.app), statements, sync_engine
+    finally:
+        database.SessionLocal.configure(bind=previous_binds[0])
+        database.AsyncSessionLocal.configure(bind=previous_binds[1])
+        sync_engine.dispose()
+
+@pytest.fixture(scope="module")
+def budget_app(tmp_path_factory):
+    """The reporting app bound to a database seeded with the budget dataset, plus a statement counter"""
+    path = tmp_path_factory.mktemp("budgets") / "reporting.sqlite3"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        context = seed_dataset(connection, DATASET)
+    engine.dispose()
+
+    with bound_app(path) as (client, statements, sync_engine):
+        context["sync_engine"] = sync_engine
+        yield client, statements, context
+
+@pytest.fixture
+def empty_app(tmp_path):
+    """The reporting app bound to an empty database: (client, statements, sync_engine)"""
+    path = tmp_path / "reporting.sqlite3"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    engine.dispose()
+    with bound_app(path) as app:
+        yield app
+
+@pytest.fixture
+def cold_caches(monkeypatch):
+    """Every call starts with empty caches, so it does the real work"""
+    monkeypatch.setattr(main, "REPORTING_ADMIN_TOKEN", ADMIN_TOKEN)
+    for cache in (report_cache, dashboard_cache):
+        monkeypatch.setattr(cache, "disk", None)
+        cache._entries.clear()
+        cache._watermarks.clear()
@@ -3,12 +3,16 @@ Database configuration for FastAPI reporting service
 Connects to the Django database in read-only mode
 """
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
 from dotenv import load_dotenv
 
+from metrics import WaiterCountingQueuePool, WaiterCountingAsyncQueuePool
+
 # Load environment variables
 load_dotenv()
 
@@ -44,6 +48,7 @@ else:
     engine = create_engine(
         DATABASE_URL,
         echo=False,
+        poolclass=WaiterCountingQueuePool,
         pool_pre_ping=True,
         pool_recycle=300,
         pool_size=10,
@@ -53,6 +58,41 @@ else:
 # Create sessionmaker
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine used by the FastAPI handlers so database I/O does not block the event loop:
+# asyncpg for PostgreSQL, aiosqlite for local SQLite
+ASYNC_DATABASE_URL = make_url(
+    DATABASE_URL
+    .replace("postgresql+psycopg2://", "postgresql+asyncpg://", 1)
+    .replace("sqlite://", "sqlite+aiosqlite://", 1)
+)
+
+if ASYNC_DATABASE_URL.get_backend_name() == "sqlite":
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        connect_args={"uri": True},
+        echo=False
+    )
+else:
+    # asyncpg does not understand libpq's sslmode parameter, pass it as ssl instead
+    async_connect_args = {}
+    sslmode = ASYNC_DATABASE_URL.query.get("sslmode")
+    if sslmode:
+        ASYNC_DATABASE_URL = ASYNC_DATABASE_URL.difference_update_query(["sslmode"])
+        async_connect_args["ssl"] = sslmode
+    async_engine = create_async_engine(
+        ASYNC_DATABASE_URL,
+        connect_args=async_connect_args,
+        echo=False,
+        poolclass=WaiterCountingAsyncQueuePool,
+        pool_pre_ping=True,
+        pool_recycle=300,
+        pool_size=10,
+        max_overflow=20
+    )
+
+# Create async sessionmaker
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
 # Create base for models
 Base = declarative_base()
 
@@ -66,16 +106,34 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db():
+    """
+    Dependency function to get an async database session
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
 def test_connection():
     """
     Test database connection
     """
     try:
         db = SessionLocal()
-        from sqlalchemy import text
         result = db.execute(text("SELECT 1")).fetchone()
         db.close()
         return True
     except Exception as e:
         print(f"Database connection failed: {e}")
         return False
+
+async def test_async_connection():
+    """
+    Test database connection through the async engine
+    """
+    try:
+        async with AsyncSessionLocal() as db:
+            await db.execute(text("SELECT 1"))
+        return True
+    except Exception as e:
+        print(f"Database connection failed: {e}")
+        return False
@@ -0,0 +1,167 @@
+"""
+Streaming export helpers for the reporting service
+Rows are read through a server-side cursor and written out chunk by chunk,
+so memory use is bounded by the chunk size rather than the export size
+"""
+
+import csv
+import io
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Boolean, Date, DateTime, Float, Integer, Numeric, Time
+
+from database import AsyncSessionLocal
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+    pq = None
+
+EXPORT_CHUNK_SIZE = 1000
+# Columnar exports write one record batch (and one Parquet row group) per chunk
+COLUMNAR_CHUNK_SIZE = 10000
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+def _json_default(value):
+    """Encode values the same way the JSON API does (ISO dates, Decimal as string)"""
+    if isinstance(value, (date, datetime, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def _format_ndjson(columns, rows):
+    return "".join(
+        json.dumps(dict(zip(columns, row)), default=_json_default) + "\n"
+        for row in rows
+    )
+
+def _csv_value(value):
+    if isinstance(value, (datetime, time)):
+        return value.isoformat()
+    return value
+
+def _format_csv(columns, rows, header):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(columns)
+    writer.writerows([_csv_value(value) for value in row] for row in rows)
+    return buffer.getvalue()
+
+async def _partitions(statement, chunk_size):
+    """
+    Execute statement on its own session and yield lists of rows
+    The request-scoped session is already closed once the response starts
+    streaming, so the export opens and owns a session for its whole lifetime
+    """
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(statement.execution_options(yield_per=chunk_size))
+        async for rows in result.partitions():
+            yield rows
+
+async def stream_rows(statement, columns, export_format):
+    """Yield NDJSON or CSV encoded chunks for statement"""
+    header = True
+    async for rows in _partitions(statement, EXPORT_CHUNK_SIZE):
+        if export_format == "csv":
+            yield _format_csv(columns, rows, header)
+        else:
+            yield _format_ndjson(columns, rows)
+        header = False
+    if header and export_format == "csv":
+        yield _format_csv(columns, [], header)
+
+def _arrow_type(column_type):
+    """Map a SQLAlchemy column type to its native Arrow type"""
+    if isinstance(column_type, Numeric) and not isinstance(column_type, Float):
+        return pa.decimal128(column_type.precision, column_type.scale)
+    if isinstance(column_type, Float):
+        return pa.float64()
+    if isinstance(column_type, Integer):
+        return pa.int64()
+    if isinstance(column_type, Boolean):
+        return pa.bool_()
+    if isinstance(column_type, DateTime):
+        # Django stores timestamps in UTC (USE_TZ = True)
+        return pa.timestamp("us", tz="UTC")
+    if isinstance(column_type, Date):
+        return pa.date32()
+    if isinstance(column_type, Time):
+        return pa.time64("us")
+    return pa.string()
+
+def arrow_schema(statement):
+    """Arrow schema for the columns selected by statement"""
+    return pa.schema([
+        pa.field(column.name, _arrow_type(column.type))
+        for column in statement.selected_columns
+    ])
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that hands written bytes back to the generator"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+async def stream_columnar(statement, export_format):
+    """
+    Yield a Parquet file or an Arrow IPC stream for statement, one record
+    batch per result chunk; only the current batch is held in memory
+    """
+    schema = arrow_schema(statement)
+    sink = _ChunkSink()
+    if export_format == "parquet":
+        writer = pq.ParquetWriter(sink, schema)
+    else:
+        writer = pa.ipc.new_stream(sink, schema)
+
+    try:
+        async for rows in _partitions(statement, COLUMNAR_CHUNK_SIZE):
+            arrays = [
+                pa.array(values, type=field.type)
+                for values, field in zip(zip(*rows), schema)
+            ]
+            writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+def export_response(statement, columns, export_format, filename):
+    """Build a StreamingResponse for an export query"""
+    if export_format in ("parquet", "arrow"):
+        if pa is None:
+            raise HTTPException(status_code=503, detail="Columnar export requires pyarrow")
+        body = stream_columnar(statement, export_format)
+    else:
+        body = stream_rows(statement, columns, export_format)
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{export_format}"'}
+    )
@@ -3,21 +3,39 @@ FarmHub Reporting Service - FastAPI Application
 Read-only reporting service that connects to the Django core database
 """
 
-from fastapi import FastAPI, Depends, HTTPException, Query
+from fastapi import FastAPI, Depends, Header, HTTPException, Path, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from sqlalchemy.orm import Session
+from fastapi.responses import JSONResponse, PlainTextResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
+import hmac
+import os
 import uvicorn
 from datetime import date, datetime, timedelta
-from sqlalchemy import func, and_
+from sqlalchemy import select, func, and_, or_, cast, Float
 
-from database import get_db, SessionLocal, test_connection
-from models import User, Farm, Cow, MilkRecord, Activity
+from database import get_async_db, test_async_connection, engine, async_engine
+from aggregates import count_where, sum_where, date_bucket, bucket_start, next_bucket, day_number
+from pagination import paginate, set_next_cursor, NEXT_CURSOR_HEADER
+from export import export_response
+from cache import report_cache, dashboard_cache
+import conditional
+import fastjson
+import metrics
+import reportday
+import slowlog
+from rollups import rollups_cover
+from models import (
+    User, Farm, Cow, MilkRecord, Activity,
+    DailyMilkRollup, MonthlyFarmMilkRollup, MilkYieldAnomaly,
+    MilkYieldForecast, FarmMilkYieldForecast
+)
 from schemas import (
     UserResponse, FarmResponse, CowResponse, 
     MilkRecordResponse, ActivityResponse,
-    ProductionSummary, ActivitySummary, FarmSummary
+    ProductionSummary, ActivitySummary, FarmSummary, ProductionTrend,
+    DashboardSummary, FinancialReport, HealthReport, CowProductionReport,
+    MilkYieldAnomalyResponse, MilkYieldForecastResponse, FarmMilkYieldForecastResponse
 )
 
 # Initialize FastAPI app
@@ -34,7 +52,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag", "Last-Modified"],
 )
+app.add_middleware(metrics.MetricsMiddleware)
+metrics.instrument_engine(async_engine.sync_engine)
+metrics.instrument_engine(engine)
+metrics.REGISTRY.register(metrics.PoolCollector({"async": async_engine, "sync": engine}))
+metrics.REGISTRY.register(metrics.CacheCollector((report_cache, dashboard_cache)))
+slowlog.instrument_engine(async_engine.sync_engine)
+slowlog.instrument_engine(engine)
+
+# Shared secret for the /admin endpoints; they are disabled while it is unset
+REPORTING_ADMIN_TOKEN = os.environ.get("REPORTING_ADMIN_TOKEN", "")
 
 @app.get("/")
 async def root():
@@ -49,7 +78,7 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    db_status = test_connection()
+    db_status = await test_async_connection()
     return {
         "status": "healthy" if db_status else "unhealthy",
         "database": "connected" if db_status else "disconnected",
@@ -70,68 +99,127 @@ async def test_endpoint():
         "deployment": "production"
     }
 
+@app.get("/cache/stats")
+async def cache_stats():
+    """Hit, miss and eviction counters for the report caches"""
+    return {cache.name: cache.snapshot() for cache in (report_cache, dashboard_cache)}
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Request, database pool and cache metrics in the Prometheus text format"""
+    return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+def require_admin_token(x_admin_token: Optional[str] = Header(None)):
+    """Allow the request only with the configured X-Admin-Token"""
+    if not REPORTING_ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, REPORTING_ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+@app.get("/admin/slow-queries", include_in_schema=False, dependencies=[Depends(require_admin_token)])
+async def get_slow_queries():
+    """Statements over the slow-query threshold, newest first, with their plans when captured"""
+    return {
+        "threshold_ms": slowlog.SLOW_QUERY_THRESHOLD_MS,
+        "explain": slowlog.SLOW_QUERY_EXPLAIN,
+        "queries": slowlog.entries(),
+    }
+
+# Stable sort keys for the list endpoints, also used to build keyset cursors
+USERS_SORT = [User.id]
+FARMS_SORT = [Farm.id]
+COWS_SORT = [Cow.id]
+MILK_RECORDS_SORT = [MilkRecord.date, MilkRecord.id]
+ACTIVITIES_SORT = [Activity.scheduled_date, Activity.id]
+
+# The largest lists select their response fields as plain columns and are
+# encoded by fastjson instead of being validated row by row
+MILK_RECORD_FIELDS = list(MilkRecordResponse.model_fields)
+MILK_RECORD_COLUMNS = [getattr(MilkRecord, field) for field in MILK_RECORD_FIELDS]
+ACTIVITY_FIELDS = list(ActivityResponse.model_fields)
+ACTIVITY_COLUMNS = [getattr(Activity, field) for field in ACTIVITY_FIELDS]
+
 # User endpoints
 @app.get("/users", response_model=List[UserResponse])
 async def get_users(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
     role: Optional[str] = Query(None),
-    db: SessionLocal = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get list of users with optional filtering"""
-    query = db.query(User)
+    query = select(User)
     
     if role:
         query = query.filter(User.role == role)
     
-    users = query.offset(skip).limit(limit).all()
+    not_modified = await report_cache.check_conditional(db, request, response, (User,))
+    if not_modified:
+        return not_modified
+
+    users = (await db.scalars(paginate(query, USERS_SORT, cursor, skip, limit))).all()
+    users = set_next_cursor(response, users, USERS_SORT, limit)
     return users
 
 @app.get("/users/{user_id}", response_model=UserResponse)
-async def get_user(user_id: int, db: SessionLocal = Depends(get_db)):
+async def get_user(user_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
     """Get specific user by ID"""
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    return user
+    return conditional.check(request, response, user.updated_at) or user
 
 # Farm endpoints
 @app.get("/farms", response_model=List[FarmResponse])
 async def get_farms(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
     is_active: Optional[bool] = Query(None),
-    db: SessionLocal = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get list of farms with optional filtering"""
-    query = db.query(Farm)
+    query = select(Farm)
     
     if is_active is not None:
         query = query.filter(Farm.is_active == is_active)
     
-    farms = query.offset(skip).limit(limit).all()
+    not_modified = await report_cache.check_conditional(db, request, response, (Farm,))
+    if not_modified:
+        return not_modified
+
+    farms = (await db.scalars(paginate(query, FARMS_SORT, cursor, skip, limit))).all()
+    farms = set_next_cursor(response, farms, FARMS_SORT, limit)
     return farms
 
 @app.get("/farms/{farm_id}", response_model=FarmResponse)
-async def get_farm(farm_id: int, db: SessionLocal = Depends(get_db)):
+async def get_farm(farm_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
     """Get specific farm by ID"""
-    farm = db.query(Farm).filter(Farm.id == farm_id).first()
+    farm = await db.get(Farm, farm_id)
     if not farm:
         raise HTTPException(status_code=404, detail="Farm not found")
-    return farm
+    return conditional.check(request, response, farm.updated_at) or farm
 
 # Cow endpoints
 @app.get("/cows", response_model=List[CowResponse])
 async def get_cows(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
     breed: Optional[str] = Query(None),
     status: Optional[str] = Query(None),
     farm_id: Optional[int] = Query(None),
-    db: SessionLocal = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get list of cows with optional filtering"""
-    query = db.query(Cow)
+    query = select(Cow)
     
     if breed:
         query = query.filter(Cow.breed == breed)
@@ -140,31 +228,25 @@ async def get_cows(
     if farm_id:
         query = query.filter(Cow.farm_id == farm_id)
     
-    cows = query.offset(skip).limit(limit).all()
+    not_modified = await report_cache.check_conditional(db, request, response, (Cow,))
+    if not_modified:
+        return not_modified
+
+    cows = (await db.scalars(paginate(query, COWS_SORT, cursor, skip, limit))).all()
+    cows = set_next_cursor(response, cows, COWS_SORT, limit)
     return cows
 
 @app.get("/cows/{cow_id}", response_model=CowResponse)
-async def get_cow(cow_id: int, db: SessionLocal = Depends(get_db)):
+async def get_cow(cow_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
     """Get specific cow by ID"""
-    cow = db.query(Cow).filter(Cow.id == cow_id).first()
+    cow = await db.get(Cow, cow_id)
     if not cow:
         raise HTTPException(status_code=404, detail="Cow not found")
-    return cow
+    return conditional.check(request, response, cow.updated_at) or cow
 
 # Milk record endpoints
-@app.get("/milk-records", response_model=List[MilkRecordResponse])
-async def get_milk_records(
-    skip: int = Query(0, ge=0),
-    limit: int = Query(100, ge=1, le=1000),
-    cow_id: Optional[int] = Query(None),
-    farm_id: Optional[int] = Query(None),
-    from_date: Optional[date] = Query(None),
-    to_date: Optional[date] = Query(None),
-    db: SessionLocal = Depends(get_db)
-):
-    """Get milk records with optional filtering"""
-    query = db.query(MilkRecord)
-    
+def _filter_milk_records(query, cow_id, farm_id, from_date, to_date):
+    """Apply the milk record list filters shared by the list and export endpoints"""
     if cow_id:
         query = query.filter(MilkRecord.cow_id == cow_id)
     if farm_id:
@@ -173,25 +255,36 @@ async def get_milk_records(
         query = query.filter(MilkRecord.date >= from_date)
     if to_date:
         query = query.filter(MilkRecord.date <= to_date)
-    
-    records = query.order_by(MilkRecord.date.desc()).offset(skip).limit(limit).all()
-    return records
+    return query
 
-# Activity endpoints
-@app.get("/activities", response_model=List[ActivityResponse])
-async def get_activities(
+@app.get("/milk-records", response_model=List[MilkRecordResponse])
+async def get_milk_records(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
     cow_id: Optional[int] = Query(None),
-    activity_type: Optional[str] = Query(None),
-    status: Optional[str] = Query(None),
+    farm_id: Optional[int] = Query(None),
     from_date: Optional[date] = Query(None),
     to_date: Optional[date] = Query(None),
-    db: SessionLocal = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Get activities with optional filtering"""
-    query = db.query(Activity)
+    """Get milk records with optional filtering"""
+    query = _filter_milk_records(select(MilkRecord), cow_id, farm_id, from_date, to_date)
     
+    not_modified = await report_cache.check_conditional(db, request, response, (MilkRecord,))
+    if not_modified:
+        return not_modified
+
+    query = query.with_only_columns(*MILK_RECORD_COLUMNS)
+    records = (await db.execute(paginate(query, MILK_RECORDS_SORT, cursor, skip, limit, descending=True))).all()
+    records = set_next_cursor(response, records, MILK_RECORDS_SORT, limit)
+    return fastjson.rows_response(MILK_RECORD_FIELDS, records, response)
+
+# Activity endpoints
+def _filter_activities(query, cow_id, activity_type, status, from_date, to_date):
+    """Apply the activity list filters shared by the list and export endpoints"""
     if cow_id:
         query = query.filter(Activity.cow_id == cow_id)
     if activity_type:
@@ -202,206 +295,589 @@ async def get_activities(
         query = query.filter(Activity.scheduled_date >= from_date)
     if to_date:
         query = query.filter(Activity.scheduled_date <= to_date)
+    return query
+
+@app.get("/activities", response_model=List[ActivityResponse])
+async def get_activities(
+    request: Request,
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
+    cow_id: Optional[int] = Query(None),
+    activity_type: Optional[str] = Query(None),
+    status: Optional[str] = Query(None),
+    from_date: Optional[date] = Query(None),
+    to_date: Optional[date] = Query(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get activities with optional filtering"""
+    query = _filter_activities(select(Activity), cow_id, activity_type, status, from_date, to_date)
     
-    activities = query.order_by(Activity.scheduled_date.desc()).offset(skip).limit(limit).all()
-    return activities
+    not_modified = await report_cache.check_conditional(db, request, response, (Activity,))
+    if not_modified:
+        return not_modified
+
+    query = query.with_only_columns(*ACTIVITY_COLUMNS)
+    activities = (await db.execute(paginate(query, ACTIVITIES_SORT, cursor, skip, limit, descending=True))).all()
+    activities = set_next_cursor(response, activities, ACTIVITIES_SORT, limit)
+    return fastjson.rows_response(ACTIVITY_FIELDS, activities, response)
+
+# Export endpoints
+@app.get("/export/milk-records")
+async def export_milk_records(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    cow_id: Optional[int] = Query(None),
+    farm_id: Optional[int] = Query(None),
+    from_date: Optional[date] = Query(None),
+    to_date: Optional[date] = Query(None)
+):
+    """Stream all matching milk records as NDJSON or CSV"""
+    columns = list(MilkRecordResponse.model_fields)
+    query = select(*[getattr(MilkRecord, column) for column in columns])
+    query = _filter_milk_records(query, cow_id, farm_id, from_date, to_date)
+    query = query.order_by(*[column.desc() for column in MILK_RECORDS_SORT])
+    return export_response(query, columns, format, "milk-records")
+
+@app.get("/export/activities")
+async def export_activities(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    cow_id: Optional[int] = Query(None),
+    activity_type: Optional[str] = Query(None),
+    status: Optional[str] = Query(None),
+    from_date: Optional[date] = Query(None),
+    to_date: Optional[date] = Query(None)
+):
+    """Stream all matching activities as NDJSON or CSV"""
+    columns = list(ActivityResponse.model_fields)
+    query = select(*[getattr(Activity, column) for column in columns])
+    query = _filter_activities(query, cow_id, activity_type, status, from_date, to_date)
+    query = query.order_by(*[column.desc() for column in ACTIVITIES_SORT])
+    return export_response(query, columns, format, "activities")
+
+@app.get("/export/milk-records.{columnar_format}")
+async def export_milk_records_columnar(
+    columnar_format: str = Path(..., pattern="^(parquet|arrow)$"),
+    cow_id: Optional[int] = Query(None),
+    farm_id: Optional[int] = Query(None),
+    from_date: Optional[date] = Query(None),
+    to_date: Optional[date] = Query(None)
+):
+    """Stream matching milk records as a Parquet file or an Arrow IPC stream"""
+    columns = list(MilkRecordResponse.model_fields)
+    query = select(*[getattr(MilkRecord, column) for column in columns])
+    query = _filter_milk_records(query, cow_id, farm_id, from_date, to_date)
+    query = query.order_by(*[column.desc() for column in MILK_RECORDS_SORT])
+    return export_response(query, columns, columnar_format, "milk-records")
+
+@app.get("/export/activities.{columnar_format}")
+async def export_activities_columnar(
+    columnar_format: str = Path(..., pattern="^(parquet|arrow)$"),
+    cow_id: Optional[int] = Query(None),
+    activity_type: Optional[str] = Query(None),
+    status: Optional[str] = Query(None),
+    from_date: Optional[date] = Query(None),
+    to_date: Optional[date] = Query(None)
+):
+    """Stream matching activities as a Parquet file or an Arrow IPC stream"""
+    columns = list(ActivityResponse.model_fields)
+    query = select(*[getattr(Activity, column) for column in columns])
+    query = _filter_activities(query, cow_id, activity_type, status, from_date, to_date)
+    query = query.order_by(*[column.desc() for column in ACTIVITIES_SORT])
+    return export_response(query, columns, columnar_format, "activities")
 
 # Reporting endpoints
 @app.get("/reports/production-summary", response_model=ProductionSummary)
+@report_cache.cached(MilkRecord)
 async def get_production_summary(
     from_date: Optional[date] = Query(None),
     to_date: Optional[date] = Query(None),
     farm_id: Optional[int] = Query(None),
-    db: SessionLocal = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get milk production summary report"""
-    query = db.query(MilkRecord)
+    # Aggregate in the database so memory use does not grow with the range,
+    # reading the daily rollups instead of raw records when they cover it
+    source = DailyMilkRollup if await rollups_cover(db, from_date, to_date) else MilkRecord
+    if source is DailyMilkRollup:
+        total_records = func.coalesce(func.sum(DailyMilkRollup.record_count), 0)
+        average = cast(func.sum(DailyMilkRollup.total_quantity_liters), Float) / func.nullif(func.sum(DailyMilkRollup.record_count), 0)
+    else:
+        total_records = func.count(MilkRecord.id)
+        average = func.avg(MilkRecord.total_quantity_liters)
+    
+    query = select(
+        total_records,
+        func.sum(source.total_quantity_liters),
+        average,
+        func.count(func.distinct(source.farm_id)),
+        func.count(func.distinct(source.cow_id))
+    )
     
     if from_date:
-        query = query.filter(MilkRecord.date >= from_date)
+        query = query.filter(source.date >= from_date)
     if to_date:
-        query = query.filter(MilkRecord.date <= to_date)
+        query = query.filter(source.date <= to_date)
     if farm_id:
-        query = query.filter(MilkRecord.farm_id == farm_id)
+        query = query.filter(source.farm_id == farm_id)
     
-    records = query.all()
-    
-    if not records:
-        return ProductionSummary(
-            total_records=0,
-            total_quantity_liters=0.0,
-            average_quantity_liters=0.0,
-            total_farms=0,
-            total_cows=0,
-            date_range={"from_date": from_date, "to_date": to_date}
-        )
-    
-    total_quantity = sum(record.total_quantity_liters for record in records)
-    average_quantity = total_quantity / len(records) if records else 0
-    total_farms = len(set(record.farm_id for record in records))
-    total_cows = len(set(record.cow_id for record in records))
+    total_records, total_quantity, average_quantity, total_farms, total_cows = (await db.execute(query)).one()
     
     return ProductionSummary(
-        total_records=len(records),
-        total_quantity_liters=float(total_quantity),
-        average_quantity_liters=float(average_quantity),
+        total_records=total_records,
+        total_quantity_liters=float(total_quantity or 0),
+        average_quantity_liters=float(average_quantity or 0),
         total_farms=total_farms,
         total_cows=total_cows,
         date_range={"from_date": from_date, "to_date": to_date}
     )
 
+async def _production_trend(db, bucket, from_date=None, to_date=None, farm_id=None, cow_id=None):
+    """
+    Milk production per day/week/month as a dense series: the grouping runs
+    in the database (on the daily rollups when they cover the range) and
+    buckets without records are filled with zeros
+    """
+    source = DailyMilkRollup if await rollups_cover(db, from_date, to_date) else MilkRecord
+    record_count = (
+        func.sum(DailyMilkRollup.record_count) if source is DailyMilkRollup else func.count(MilkRecord.id)
+    )
+    period = date_bucket(db, source.date, bucket)
+    query = select(
+        period,
+        record_count,
+        func.sum(source.total_quantity_liters),
+        func.count(func.distinct(source.cow_id))
+    ).group_by(period).order_by(period)
+
+    if from_date:
+        query = query.filter(source.date >= from_date)
+    if to_date:
+        query = query.filter(source.date <= to_date)
+    if farm_id:
+        query = query.filter(source.farm_id == farm_id)
+    if cow_id:
+        query = query.filter(source.cow_id == cow_id)
+
+    rows = {row[0]: row[1:] for row in (await db.execute(query)).all()}
+    if not rows and not (from_date and to_date):
+        return []
+
+    current = bucket_start(from_date or min(rows), bucket)
+    last = bucket_start(to_date or max(rows), bucket)
+    trend = []
+    while current <= last:
+        count, quantity, cows = rows.get(current, (0, 0, 0))
+        trend.append({
+            "period": current,
+            "record_count": count,
+            "total_quantity_liters": float(quantity or 0),
+            "cow_count": cows,
+        })
+        current = next_bucket(current, bucket)
+    return trend
+
+@app.get("/reports/production-trend", response_model=ProductionTrend)
+@report_cache.cached(MilkRecord)
+async def get_production_trend(
+    bucket: str = Query("day", pattern="^(day|week|month)$"),
+    from_date: Optional[date] = Query(None),
+    to_date: Optional[date] = Query(None),
+    farm_id: Optional[int] = Query(None),
+    cow_id: Optional[int] = Query(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get milk production grouped by day, week or month"""
+    return ProductionTrend(
+        bucket=bucket,
+        farm_id=farm_id,
+        cow_id=cow_id,
+        date_range={"from_date": from_date, "to_date": to_date},
+        production_trend=await _production_trend(db, bucket, from_date, to_date, farm_id, cow_id)
+    )
+
 @app.get("/reports/activity-summary", response_model=ActivitySummary)
+@report_cache.cached(Activity, Cow)
 async def get_activity_summary(
     from_date: Optional[date] = Query(None),
     to_date: Optional[date] = Query(None),
     farm_id: Optional[int] = Query(None),
-    db: SessionLocal = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get activity summary report"""
-    query = db.query(Activity)
+    # One grouped pass: per-type counts plus conditional status counts and cost
+    query = select(
+        Activity.activity_type,
+        func.count(Activity.id),
+        count_where(db, Activity.status == 'COMPLETED'),
+        count_where(db, Activity.status == 'PLANNED'),
+        func.sum(Activity.cost)
+    )
     
+    if farm_id:
+        query = query.join(Cow, Activity.cow_id == Cow.id).filter(Cow.farm_id == farm_id)
     if from_date:
         query = query.filter(Activity.scheduled_date >= from_date)
     if to_date:
         query = query.filter(Activity.scheduled_date <= to_date)
-    if farm_id:
-        query = query.join(Cow).filter(Cow.farm_id == farm_id)
-    
-    activities = query.all()
-    
-    if not activities:
-        return ActivitySummary(
-            total_activities=0,
-            completed_activities=0,
-            planned_activities=0,
-            total_cost=0.0,
-            activity_types={},
-            date_range={"from_date": from_date, "to_date": to_date}
-        )
     
-    completed = len([a for a in activities if a.status == 'COMPLETED'])
-    planned = len([a for a in activities if a.status == 'PLANNED'])
-    total_cost = sum(a.cost or 0 for a in activities)
+    rows = (await db.execute(query.group_by(Activity.activity_type))).all()
     
-    # Activity type distribution
-    activity_types = {}
-    for activity in activities:
-        activity_types[activity.activity_type] = activity_types.get(activity.activity_type, 0) + 1
+    activity_types = {activity_type: count for activity_type, count, _, _, _ in rows}
     
     return ActivitySummary(
-        total_activities=len(activities),
-        completed_activities=completed,
-        planned_activities=planned,
-        total_cost=float(total_cost),
+        total_activities=sum(row[1] for row in rows),
+        completed_activities=sum(row[2] for row in rows),
+        planned_activities=sum(row[3] for row in rows),
+        total_cost=float(sum(row[4] or 0 for row in rows)),
         activity_types=activity_types,
         date_range={"from_date": from_date, "to_date": to_date}
     )
 
 # NEW ENDPOINTS
 
+async def _farm_summary_rows(db, farm_id=None):
+    """
+    Per-farm summary rows computed in one statement: each metric is a grouped
+    subquery outer-joined to the farm and its agent, so the number of round
+    trips does not depend on the number of farms
+    """
+    thirty_days_ago = reportday.today() - timedelta(days=30)
+    
+    farmers = select(
+        Cow.farm_id.label('farm_id'),
+        func.count(func.distinct(Cow.farmer_id)).label('farmer_count')
+    ).join(User, Cow.farmer_id == User.id).filter(User.role == 'FARMER')
+    cows = select(
+        Cow.farm_id.label('farm_id'),
+        func.count(Cow.id).label('cow_count')
+    )
+    
+    if await rollups_cover(db):
+        # All-time totals from the monthly rollup, last 30 days from the daily rollup
+        milk = select(
+            MonthlyFarmMilkRollup.farm_id.label('farm_id'),
+            func.sum(MonthlyFarmMilkRollup.total_quantity_liters).label('total_milk')
+        )
+        recent = select(
+            DailyMilkRollup.farm_id.label('farm_id'),
+            func.sum(DailyMilkRollup.total_quantity_liters).label('recent_milk')
+        ).filter(DailyMilkRollup.date >= thirty_days_ago)
+        if farm_id:
+            milk = milk.filter(MonthlyFarmMilkRollup.farm_id == farm_id)
+            recent = recent.filter(DailyMilkRollup.farm_id == farm_id)
+        milk = milk.group_by(MonthlyFarmMilkRollup.farm_id).subquery()
+        recent = recent.group_by(DailyMilkRollup.farm_id).subquery()
+    else:
+        milk = select(
+            MilkRecord.farm_id.label('farm_id'),
+            func.sum(MilkRecord.total_quantity_liters).label('total_milk'),
+            sum_where(db, MilkRecord.total_quantity_liters, MilkRecord.date >= thirty_days_ago).label('recent_milk')
+        )
+        if farm_id:
+            milk = milk.filter(MilkRecord.farm_id == farm_id)
+        milk = milk.group_by(MilkRecord.farm_id).subquery()
+        recent = milk
+    
+    if farm_id:
+        farmers = farmers.filter(Cow.farm_id == farm_id)
+        cows = cows.filter(Cow.farm_id == farm_id)
+    
+    farmers = farmers.group_by(Cow.farm_id).subquery()
+    cows = cows.group_by(Cow.farm_id).subquery()
+    
+    query = select(
+        Farm.id,
+        Farm.name,
+        Farm.is_active,
+        Farm.location,
+        Farm.size_acres,
+        User.first_name,
+        User.last_name,
+        func.coalesce(farmers.c.farmer_count, 0),
+        func.coalesce(cows.c.cow_count, 0),
+        func.coalesce(milk.c.total_milk, 0),
+        func.coalesce(recent.c.recent_milk, 0)
+    ).outerjoin(User, Farm.agent_id == User.id) \
+        .outerjoin(farmers, farmers.c.farm_id == Farm.id) \
+        .outerjoin(cows, cows.c.farm_id == Farm.id) \
+        .outerjoin(milk, milk.c.farm_id == Farm.id)
+    if recent is not milk:
+        query = query.outerjoin(recent, recent.c.farm_id == Farm.id)
+    
+    if farm_id:
+        query = query.filter(Farm.id == farm_id)
+    
+    summaries = []
+    for (id, name, is_active, location, size_acres, agent_first, agent_last,
+         farmer_count, cow_count, total_milk, recent_milk) in (await db.execute(query.order_by(Farm.id))).all():
+        summaries.append(FarmSummary(
+            farm_id=id,
+            farm_name=name,
+            agent_name=f"{agent_first} {agent_last}" if agent_first is not None else "Unknown",
+            farmer_count=farmer_count,
+            cow_count=cow_count,
+            total_milk_production_liters=float(total_milk),
+            recent_milk_production_liters=float(recent_milk),
+            farm_status="Active" if is_active else "Inactive",
+            location=location,
+            size_acres=float(size_acres) if size_acres else None
+        ))
+    return summaries
+
 @app.get("/reports/farm-summary", response_model=FarmSummary)
+@report_cache.cached(Farm, User, Cow, MilkRecord)
 async def get_farm_summary(
     farm_id: Optional[int] = Query(None),
-    db: SessionLocal = Depends(get_db)
+    include_farms: bool = Query(False, description="Include the per-farm rows in the overall summary"),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get farm summary showing number of farmers, cows, and total milk production"""
     
     if farm_id:
         # Get specific farm summary
-        farm = db.query(Farm).filter(Farm.id == farm_id).first()
-        if not farm:
+        summaries = await _farm_summary_rows(db, farm_id)
+        if not summaries:
             raise HTTPException(status_code=404, detail="Farm not found")
-        
-        # Count farmers (users with FARMER role assigned to this farm)
-        farmer_count = db.query(User).join(Cow).filter(
-            and_(User.role == 'FARMER', Cow.farm_id == farm_id)
-        ).distinct().count()
-        
-        # Count cows
-        cow_count = db.query(Cow).filter(Cow.farm_id == farm_id).count()
-        
-        # Get total milk production
-        total_milk = db.query(func.sum(MilkRecord.total_quantity_liters)).filter(
-            MilkRecord.farm_id == farm_id
-        ).scalar() or 0
-        
-        # Get recent milk production (last 30 days)
-        thirty_days_ago = date.today() - timedelta(days=30)
-        recent_milk = db.query(func.sum(MilkRecord.total_quantity_liters)).filter(
-            and_(MilkRecord.farm_id == farm_id, MilkRecord.date >= thirty_days_ago)
-        ).scalar() or 0
-        
-        return FarmSummary(
-            farm_id=farm.id,
-            farm_name=farm.name,
-            agent_name=f"{farm.agent.first_name} {farm.agent.last_name}" if farm.agent else "Unknown",
-            farmer_count=farmer_count,
-            cow_count=cow_count,
-            total_milk_production_liters=float(total_milk),
-            recent_milk_production_liters=float(recent_milk),
-            farm_status="Active" if farm.is_active else "Inactive",
-            location=farm.location,
-            size_acres=float(farm.size_acres) if farm.size_acres else None
-        )
-    else:
-        # Get summary for all farms
-        farms = db.query(Farm).all()
-        farm_summaries = []
-        
-        for farm in farms:
-            # Count farmers for this farm
-            farmer_count = db.query(User).join(Cow).filter(
-                and_(User.role == 'FARMER', Cow.farm_id == farm.id)
-            ).distinct().count()
-            
-            # Count cows for this farm
-            cow_count = db.query(Cow).filter(Cow.farm_id == farm.id).count()
-            
-            # Get total milk production for this farm
-            total_milk = db.query(func.sum(MilkRecord.total_quantity_liters)).filter(
-                MilkRecord.farm_id == farm.id
-            ).scalar() or 0
-            
-            farm_summaries.append({
-                "farm_id": farm.id,
-                "farm_name": farm.name,
-                "agent_name": f"{farm.agent.first_name} {farm.agent.last_name}" if farm.agent else "Unknown",
-                "farmer_count": farmer_count,
-                "cow_count": cow_count,
-                "total_milk_production_liters": float(total_milk),
-                "farm_status": "Active" if farm.is_active else "Inactive"
+        return summaries[0]
+    
+    # Get summary for all farms
+    farm_summaries = await _farm_summary_rows(db)
+    
+    # Calculate overall totals
+    total_farmers = sum(fs.farmer_count for fs in farm_summaries)
+    total_cows = sum(fs.cow_count for fs in farm_summaries)
+    total_milk = sum(fs.total_milk_production_liters for fs in farm_summaries)
+    
+    return FarmSummary(
+        farm_id=None, # No single farm ID for overall summary
+        farm_name="Overall",
+        agent_name="N/A",
+        farmer_count=total_farmers,
+        cow_count=total_cows,
+        total_milk_production_liters=total_milk,
+        recent_milk_production_liters=0, # No recent milk for overall summary
+        farm_status="N/A",
+        location="N/A",
+        size_acres=None,
+        farms=farm_summaries if include_farms else None
+    )
+
+# Upper bound for the batch form of the per-cow production report
+MAX_BATCH_COWS = 500
+
+def _optional_float(value):
+    return float(value) if value is not None else None
+
+async def _cow_production_reports(db, cow_ids, from_date=None, to_date=None):
+    """
+    Per-cow production reports from a single statement: daily totals, rolling
+    7/30-day averages and day-over-day change (against the previous calendar
+    day, null when it has no record) come from window functions over the daily
+    series, the latest activity from ROW_NUMBER over activities
+    """
+    # Rolling windows at the start of the range need the 29 days before it
+    window_start = from_date - timedelta(days=29) if from_date else None
+    source = DailyMilkRollup if await rollups_cover(db, window_start, to_date) else MilkRecord
+
+    daily = select(
+        source.cow_id.label("cow_id"),
+        source.date.label("date"),
+        func.sum(source.total_quantity_liters).label("quantity")
+    ).filter(source.cow_id.in_(cow_ids)).group_by(source.cow_id, source.date)
+    if window_start:
+        daily = daily.filter(source.date >= window_start)
+    if to_date:
+        daily = daily.filter(source.date <= to_date)
+    daily = daily.cte("daily")
+
+    day = day_number(db, daily.c.date)
+    windowed = select(
+        daily.c.cow_id,
+        daily.c.date,
+        daily.c.quantity,
+        func.avg(daily.c.quantity).over(partition_by=daily.c.cow_id, order_by=day, range_=(-6, 0)).label("avg_7"),
+        func.avg(daily.c.quantity).over(partition_by=daily.c.cow_id, order_by=day, range_=(-29, 0)).label("avg_30"),
+        # A one-day RANGE frame holds the previous calendar day only, NULL when unrecorded
+        (daily.c.quantity - func.max(daily.c.quantity).over(
+            partition_by=daily.c.cow_id, order_by=day, range_=(-1, -1)
+        )).label("change")
+    ).cte("windowed")
+
+    ranked = select(
+        *[getattr(Activity, field) for field in ActivityResponse.model_fields],
+        func.row_number().over(
+            partition_by=Activity.cow_id,
+            order_by=(Activity.scheduled_date.desc(), Activity.scheduled_time.desc(), Activity.id.desc())
+        ).label("row_number")
+    ).filter(Activity.cow_id.in_(cow_ids)).subquery("ranked_activity")
+    latest = select(ranked).filter(ranked.c.row_number == 1).subquery("latest_activity")
+
+    in_range = windowed.c.cow_id == Cow.id
+    if from_date:
+        in_range = and_(in_range, windowed.c.date >= from_date)
+
+    query = select(
+        Cow.id,
+        Cow.tag_number,
+        Cow.name,
+        Cow.breed,
+        User.first_name,
+        User.last_name,
+        Farm.name,
+        windowed.c.date,
+        windowed.c.quantity,
+        windowed.c.avg_7,
+        windowed.c.avg_30,
+        windowed.c.change,
+        func.sum(windowed.c.quantity).over(partition_by=Cow.id),
+        func.count(windowed.c.date).over(partition_by=Cow.id),
+        *[latest.c[field] for field in ActivityResponse.model_fields]
+    ).select_from(Cow) \
+        .outerjoin(User, Cow.farmer_id == User.id) \
+        .outerjoin(Farm, Cow.farm_id == Farm.id) \
+        .outerjoin(latest, latest.c.cow_id == Cow.id) \
+        .outerjoin(windowed, in_range) \
+        .filter(Cow.id.in_(cow_ids)) \
+        .order_by(Cow.id, windowed.c.date)
+
+    reports = {}
+    for row in (await db.execute(query)).all():
+        (cow_id, tag, name, breed, farmer_first, farmer_last, farm_name,
+         day_date, quantity, avg_7, avg_30, change, total, days_recorded) = row[:14]
+        report = reports.get(cow_id)
+        if report is None:
+            activity = dict(zip(ActivityResponse.model_fields, row[14:]))
+            report = reports[cow_id] = CowProductionReport(
+                cow_id=cow_id,
+                cow_tag=tag,
+                cow_name=name,
+                breed=breed,
+                farmer_name=f"{farmer_first} {farmer_last}" if farmer_first is not None else "Unknown",
+                farm_name=farm_name or "Unknown",
+                total_production_liters=float(total or 0),
+                average_daily_production=float(total) / days_recorded if days_recorded else 0.0,
+                days_recorded=days_recorded,
+                production_trend=[],
+                latest_activity=ActivityResponse(**activity) if activity["id"] is not None else None
+            )
+        if day_date is not None:
+            report.production_trend.append({
+                "date": day_date,
+                "total_quantity_liters": float(quantity or 0),
+                "rolling_7_day_average": _optional_float(avg_7),
+                "rolling_30_day_average": _optional_float(avg_30),
+                "day_over_day_change": _optional_float(change),
             })
-        
-        # Calculate overall totals
-        total_farmers = sum(fs["farmer_count"] for fs in farm_summaries)
-        total_cows = sum(fs["cow_count"] for fs in farm_summaries)
-        total_milk = sum(fs["total_milk_production_liters"] for fs in farm_summaries)
-        
-        return FarmSummary(
-            farm_id=None, # No single farm ID for overall summary
-            farm_name="Overall",
-            agent_name="N/A",
-            farmer_count=total_farmers,
-            cow_count=total_cows,
-            total_milk_production_liters=total_milk,
-            recent_milk_production_liters=0, # No recent milk for overall summary
-            farm_status="N/A",
-            location="N/A",
-            size_acres=None
+
+    for report in reports.values():
+        if report.production_trend:
+            last = report.production_trend[-1]
+            report.rolling_7_day_average = last["rolling_7_day_average"]
+            report.rolling_30_day_average = last["rolling_30_day_average"]
+            report.day_over_day_change = last["day_over_day_change"]
+    return [reports[cow_id] for cow_id in cow_ids if cow_id in reports]
+
+@app.get("/reports/cows/production", response_model=List[CowProductionReport])
+@report_cache.cached(MilkRecord, Activity, Cow, Farm, User)
+async def get_cows_production(
+    cow_ids: str = Query(..., pattern=r"^\d+(,\d+)*$", description="Comma-separated cow ids"),
+    from_date: Optional[date] = Query(None),
+    to_date: Optional[date] = Query(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get production reports for many cows in one query"""
+    ids = list(dict.fromkeys(int(cow_id) for cow_id in cow_ids.split(",")))
+    if len(ids) > MAX_BATCH_COWS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_COWS} cows per request")
+    return await _cow_production_reports(db, ids, from_date, to_date)
+
+@app.get("/reports/cows/{cow_id}/production", response_model=CowProductionReport)
+@report_cache.cached(MilkRecord, Activity, Cow, Farm, User)
+async def get_cow_production(
+    cow_id: int,
+    from_date: Optional[date] = Query(None),
+    to_date: Optional[date] = Query(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get the production report for a single cow"""
+    reports = await _cow_production_reports(db, [cow_id], from_date, to_date)
+    if not reports:
+        raise HTTPException(status_code=404, detail="Cow not found")
+    return reports[0]
+
+@app.get("/reports/milk-anomalies", response_model=List[MilkYieldAnomalyResponse])
+@report_cache.cached(MilkYieldAnomaly, Cow)
+async def get_milk_anomalies(
+    from_date: Optional[date] = Query(None, description="Defaults to 30 days ago"),
+    to_date: Optional[date] = Query(None),
+    farm_id: Optional[int] = Query(None),
+    cow_id: Optional[int] = Query(None),
+    limit: int = Query(200, ge=1, le=1000),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get the yield drops flagged by the detect_milk_anomalies job, most recent and severe first"""
+    query = select(
+        MilkYieldAnomaly.cow_id,
+        Cow.tag_number,
+        Cow.name,
+        MilkYieldAnomaly.farm_id,
+        MilkYieldAnomaly.date,
+        MilkYieldAnomaly.quantity_liters,
+        MilkYieldAnomaly.expected_liters,
+        MilkYieldAnomaly.z_score,
+        MilkYieldAnomaly.drop_percentage
+    ).join(Cow, MilkYieldAnomaly.cow_id == Cow.id) \
+        .filter(MilkYieldAnomaly.date >= (from_date or reportday.today() - timedelta(days=30)))
+    
+    if to_date:
+        query = query.filter(MilkYieldAnomaly.date <= to_date)
+    if farm_id:
+        query = query.filter(MilkYieldAnomaly.farm_id == farm_id)
+    if cow_id:
+        query = query.filter(MilkYieldAnomaly.cow_id == cow_id)
+    
+    rows = (await db.execute(
+        query.order_by(MilkYieldAnomaly.date.desc(), MilkYieldAnomaly.z_score).limit(limit)
+    )).all()
+    return [
+        MilkYieldAnomalyResponse(
+            cow_id=cow, cow_tag=tag, cow_name=name, farm_id=farm, date=day,
+            quantity_liters=quantity, expected_liters=expected,
+            z_score=z_score, drop_percentage=drop
         )
+        for cow, tag, name, farm, day, quantity, expected, z_score, drop in rows
+    ]
+
+@app.get("/reports/cows/{cow_id}/forecast", response_model=MilkYieldForecastResponse)
+async def get_cow_forecast(cow_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
+    """Get a cow's cached 7/30-day yield forecast from the forecast_milk_yield job"""
+    forecast = await db.scalar(select(MilkYieldForecast).filter(MilkYieldForecast.cow_id == cow_id))
+    if not forecast:
+        raise HTTPException(status_code=404, detail="Forecast not found")
+    return conditional.check(request, response, forecast.updated_at) or forecast
+
+@app.get("/reports/farms/{farm_id}/forecast", response_model=FarmMilkYieldForecastResponse)
+async def get_farm_forecast(farm_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
+    """Get a farm's cached 7/30-day yield forecast from the forecast_milk_yield job"""
+    forecast = await db.scalar(select(FarmMilkYieldForecast).filter(FarmMilkYieldForecast.farm_id == farm_id))
+    if not forecast:
+        raise HTTPException(status_code=404, detail="Forecast not found")
+    return conditional.check(request, response, forecast.updated_at) or forecast
 
 @app.get("/reports/milk-production")
+@report_cache.cached(MilkRecord, Cow, Farm, User)
 async def get_milk_production_filtered(
     farm_id: Optional[int] = Query(None),
     farmer_id: Optional[int] = Query(None),
     from_date: Optional[date] = Query(None),
     to_date: Optional[date] = Query(None),
     limit: int = Query(100, ge=1, le=1000),
-    db: SessionLocal = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get milk production filtered by farm, farmer, or date range"""
     
-    query = db.query(MilkRecord)
+    query = select(MilkRecord)
     
     # Apply filters
     if farm_id:
@@ -414,13 +890,13 @@ async def get_milk_production_filtered(
         query = query.filter(MilkRecord.date <= to_date)
     
     # Get records with related data - using explicit join conditions
-    records = query.join(Cow, MilkRecord.cow_id == Cow.id).join(Farm, Cow.farm_id == Farm.id).join(User, MilkRecord.farmer_id == User.id).add_columns(
+    records = (await db.execute(query.join(Cow, MilkRecord.cow_id == Cow.id).join(Farm, Cow.farm_id == Farm.id).join(User, MilkRecord.farmer_id == User.id).add_columns(
         Cow.tag_number,
         Cow.name.label('cow_name'),
         Farm.name.label('farm_name'),
         User.first_name.label('farmer_first_name'),
         User.last_name.label('farmer_last_name')
-    ).order_by(MilkRecord.date.desc()).limit(limit).all()
+    ).order_by(MilkRecord.date.desc()).limit(limit))).all()
     
     # Format response
     production_data = []
@@ -461,20 +937,21 @@ async def get_milk_production_filtered(
     }
 
 @app.get("/reports/recent-activities")
+@report_cache.cached(Activity, Cow, Farm)
 async def get_recent_activities_summary(
     days: int = Query(7, ge=1, le=90, description="Number of days to look back"),
     activity_type: Optional[str] = Query(None),
     farm_id: Optional[int] = Query(None),
     limit: int = Query(50, ge=1, le=200),
-    db: SessionLocal = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get recent activity summaries for the specified number of days"""
     
     # Calculate date range
-    end_date = date.today()
+    end_date = reportday.today()
     start_date = end_date - timedelta(days=days)
     
-    query = db.query(Activity)
+    query = select(Activity)
     
     # Apply filters
     query = query.filter(Activity.scheduled_date >= start_date)
@@ -485,18 +962,19 @@ async def get_recent_activities_summary(
     # Get activities with related data - using explicit join conditions
     if farm_id:
         # If farm_id filter is applied, we need to join Cow and Farm for filtering
-        activities = query.join(Cow, Activity.cow_id == Cow.id).join(Farm, Cow.farm_id == Farm.id).filter(Cow.farm_id == farm_id).add_columns(
+        query = query.join(Cow, Activity.cow_id == Cow.id).join(Farm, Cow.farm_id == Farm.id).filter(Cow.farm_id == farm_id).add_columns(
             Cow.tag_number,
             Cow.name.label('cow_name'),
             Farm.name.label('farm_name')
-        ).order_by(Activity.scheduled_date.desc(), Activity.scheduled_time.desc()).limit(limit).all()
+        ).order_by(Activity.scheduled_date.desc(), Activity.scheduled_time.desc()).limit(limit)
     else:
         # If no farm_id filter, we can do the joins normally
-        activities = query.join(Cow, Activity.cow_id == Cow.id).join(Farm, Cow.farm_id == Farm.id).add_columns(
+        query = query.join(Cow, Activity.cow_id == Cow.id).join(Farm, Cow.farm_id == Farm.id).add_columns(
         Cow.tag_number,
         Cow.name.label('cow_name'),
         Farm.name.label('farm_name')
-    ).order_by(Activity.scheduled_date.desc(), Activity.scheduled_time.desc()).limit(limit).all()
+    ).order_by(Activity.scheduled_date.desc(), Activity.scheduled_time.desc()).limit(limit)
+    activities = (await db.execute(query)).all()
     
     # Format response
     activity_data = []
@@ -561,6 +1039,226 @@ async def get_recent_activities_summary(
         "recent_activities": activity_data
     }
 
+# Activity types broken out in the financial report
+COST_TYPES = {
+    'vaccination_cost': 'VACCINATION',
+    'health_check_cost': 'HEALTH_CHECK',
+    'medication_cost': 'MEDICATION',
+}
+
+@app.get("/reports/financial", response_model=FinancialReport)
+@report_cache.cached(Activity, Cow, Farm)
+async def get_financial_report(
+    from_date: Optional[date] = Query(None),
+    to_date: Optional[date] = Query(None),
+    farm_id: Optional[int] = Query(None),
+    agent_id: Optional[int] = Query(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get activity costs by type, by month and by farm"""
+    conditions = [Activity.status != 'CANCELLED']
+    if from_date:
+        conditions.append(Activity.scheduled_date >= from_date)
+    if to_date:
+        conditions.append(Activity.scheduled_date <= to_date)
+    if farm_id:
+        conditions.append(Cow.farm_id == farm_id)
+    if agent_id:
+        conditions.append(Cow.farm_id.in_(select(Farm.id).filter(Farm.agent_id == agent_id)))
+
+    # Monthly totals with per-type costs in one grouped pass; the overall
+    # totals are the sum of the months
+    month = date_bucket(db, Activity.scheduled_date, "month")
+    monthly_query = select(
+        month,
+        func.count(Activity.id),
+        func.sum(Activity.cost),
+        *[sum_where(db, Activity.cost, Activity.activity_type == activity_type)
+          for activity_type in COST_TYPES.values()]
+    ).join(Cow, Activity.cow_id == Cow.id).filter(*conditions).group_by(month).order_by(month)
+    months = {row[0]: row[1:] for row in (await db.execute(monthly_query)).all()}
+
+    monthly_breakdown = []
+    if months or (from_date and to_date):
+        current = bucket_start(from_date or min(months), "month")
+        last = bucket_start(to_date or max(months), "month")
+        while current <= last:
+            count, total, *type_costs = months.get(current, (0, 0) + (0,) * len(COST_TYPES))
+            monthly_breakdown.append({
+                "month": current,
+                "activity_count": count,
+                "total_cost": float(total or 0),
+                **{name: float(cost or 0) for name, cost in zip(COST_TYPES, type_costs)},
+            })
+            current = next_bucket(current, "month")
+
+    farm_query = select(
+        Farm.id,
+        Farm.name,
+        func.count(Activity.id),
+        func.sum(Activity.cost)
+    ).select_from(Activity).join(Cow, Activity.cow_id == Cow.id).join(Farm, Cow.farm_id == Farm.id) \
+        .filter(*conditions).group_by(Farm.id, Farm.name).order_by(func.sum(Activity.cost).desc(), Farm.id)
+    cost_per_farm = [
+        {
+            "farm_id": farm,
+            "farm_name": name,
+            "activity_count": count,
+            "total_cost": float(total or 0),
+        }
+        for farm, name, count, total in (await db.execute(farm_query)).all()
+    ]
+
+    return FinancialReport(
+        total_activity_costs=sum(entry["total_cost"] for entry in monthly_breakdown),
+        vaccination_costs=sum(entry["vaccination_cost"] for entry in monthly_breakdown),
+        health_check_costs=sum(entry["health_check_cost"] for entry in monthly_breakdown),
+        medication_costs=sum(entry["medication_cost"] for entry in monthly_breakdown),
+        monthly_breakdown=monthly_breakdown,
+        cost_per_farm=cost_per_farm,
+        date_range={"from_date": from_date, "to_date": to_date}
+    )
+
+# Average bovine gestation, used to project calving dates from breeding dates
+GESTATION_DAYS = 283
+
+@app.get("/reports/health", response_model=HealthReport)
+@report_cache.cached(Activity, Cow, Farm)
+async def get_health_report(
+    days: int = Query(30, ge=1, le=3650, description="Look-back window for health checks and calvings"),
+    schedule_days: int = Query(30, ge=1, le=365, description="Look-ahead window for the breeding schedule"),
+    farm_id: Optional[int] = Query(None),
+    agent_id: Optional[int] = Query(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get herd health, vaccination, calving and breeding figures"""
+    today = reportday.today()
+    since = today - timedelta(days=days)
+    until = today + timedelta(days=schedule_days)
+
+    # Cow figures come from the health status denormalized onto cows, so they
+    # scale with herd size rather than with the activity history
+    cows = select(Cow.id).filter(Cow.status == 'ACTIVE')
+    if farm_id:
+        cows = cows.filter(Cow.farm_id == farm_id)
+    if agent_id:
+        cows = cows.filter(Cow.farm_id.in_(select(Farm.id).filter(Farm.agent_id == agent_id)))
+
+    def cows_with(health_status):
+        return select(func.count()).select_from(
+            cows.filter(Cow.health_status == health_status).subquery()
+        ).scalar_subquery()
+
+    def activities(activity_type, *conditions):
+        return select(func.count(Activity.id)).filter(
+            Activity.activity_type == activity_type, Activity.cow_id.in_(cows), *conditions
+        ).scalar_subquery()
+
+    row = (await db.execute(select(
+        activities('HEALTH_CHECK', Activity.status == 'COMPLETED', Activity.scheduled_date >= since),
+        cows_with('HEALTHY'),
+        cows_with('SICK'),
+        cows_with('RECOVERING'),
+        activities('VACCINATION', Activity.status.in_(['PLANNED', 'IN_PROGRESS'])),
+        activities('CALVING', Activity.status == 'COMPLETED', Activity.scheduled_date >= since)
+    ))).one()
+
+    planned_breedings = (await db.execute(
+        select(Activity.scheduled_date, Cow.id, Cow.tag_number, Cow.name)
+        .join(Cow, Activity.cow_id == Cow.id)
+        .filter(
+            Activity.activity_type == 'BREEDING',
+            Activity.status.in_(['PLANNED', 'IN_PROGRESS']),
+            Activity.scheduled_date >= today,
+            Activity.scheduled_date <= until,
+            Activity.cow_id.in_(cows)
+        )
+    )).all()
+    expected_calvings = (await db.execute(
+        select(Cow.last_breeding_date, Cow.id, Cow.tag_number, Cow.name).filter(
+            Cow.is_pregnant.is_(True),
+            Cow.last_breeding_date >= today - timedelta(days=GESTATION_DAYS),
+            Cow.last_breeding_date <= until - timedelta(days=GESTATION_DAYS),
+            Cow.id.in_(cows)
+        )
+    )).all()
+
+    breeding_schedule = [
+        {"date": scheduled, "event": "BREEDING", "cow_id": cow, "cow_tag": tag, "cow_name": name}
+        for scheduled, cow, tag, name in planned_breedings
+    ] + [
+        {"date": bred + timedelta(days=GESTATION_DAYS), "event": "EXPECTED_CALVING",
+         "cow_id": cow, "cow_tag": tag, "cow_name": name}
+        for bred, cow, tag, name in expected_calvings
+    ]
+    breeding_schedule.sort(key=lambda entry: (entry["date"], entry["cow_id"]))
+
+    return HealthReport(
+        total_health_checks=row[0],
+        healthy_cows=row[1],
+        sick_cows=row[2],
+        recovering_cows=row[3],
+        pending_vaccinations=row[4],
+        recent_calvings=row[5],
+        breeding_schedule=breeding_schedule
+    )
+
+@app.get("/reports/dashboard", response_model=DashboardSummary)
+@dashboard_cache.cached(Farm, Cow, User, MilkRecord, Activity)
+async def get_dashboard(
+    agent_id: Optional[int] = Query(None, description="Limit the numbers to the farms managed by this agent"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get the dashboard headline numbers in a single statement"""
+    today = reportday.today()
+    day_start, day_end = reportday.day_bounds(today)
+
+    farms = select(Farm.id)
+    cows = select(Cow.id)
+    if agent_id:
+        farms = farms.filter(Farm.agent_id == agent_id)
+        cows = cows.filter(Cow.farm_id.in_(farms))
+
+    if agent_id:
+        farmers = select(func.count(func.distinct(Cow.farmer_id))).filter(Cow.id.in_(cows))
+    else:
+        farmers = select(func.count(User.id)).filter(User.role == 'FARMER')
+
+    milk_today = select(func.coalesce(func.sum(MilkRecord.total_quantity_liters), 0)).filter(MilkRecord.date == today)
+    activities = select(func.count(Activity.id))
+    if agent_id:
+        milk_today = milk_today.filter(MilkRecord.farm_id.in_(farms))
+        activities = activities.filter(Activity.cow_id.in_(cows))
+
+    completed_today = activities.filter(
+        Activity.status == 'COMPLETED',
+        or_(
+            and_(Activity.end_time >= day_start, Activity.end_time < day_end),
+            and_(Activity.end_time.is_(None), Activity.scheduled_date == today)
+        )
+    )
+    pending = activities.filter(Activity.status.in_(['PLANNED', 'IN_PROGRESS']))
+
+    row = (await db.execute(select(
+        select(func.count()).select_from(farms.subquery()).scalar_subquery(),
+        select(func.count()).select_from(cows.subquery()).scalar_subquery(),
+        farmers.scalar_subquery(),
+        select(func.count()).select_from(farms.filter(Farm.is_active.is_(True)).subquery()).scalar_subquery(),
+        milk_today.scalar_subquery(),
+        completed_today.scalar_subquery(),
+        pending.scalar_subquery()
+    ))).one()
+
+    return DashboardSummary(
+        total_farms=row[0],
+        total_cows=row[1],
+        total_farmers=row[2],
+        active_farms=row[3],
+        milk_production_today=float(row[4] or 0),
+        activities_completed_today=row[5],
+        activities_pending=row[6]
+    )
+
 if __name__ == "__main__":
     uvicorn.run(
         "main:app",
@@ -0,0 +1,210 @@
+"""
+Prometheus metrics for the reporting service
+Request and statement metrics are prometheus_client instruments in a registry
+of the service's own, rendered at /metrics; the connection pool and report
+cache figures are read by collectors at scrape time. Values are per worker
+process; scrape each worker or run a single one under load.
+"""
+
+import threading
+import time
+from contextvars import ContextVar
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.registry import Collector
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from starlette.routing import Match
+
+CONTENT_TYPE = CONTENT_TYPE_LATEST
+UNMATCHED_ROUTE = "unmatched"
+
+REGISTRY = CollectorRegistry()
+
+# Route template of the request being served, used to attribute DB queries
+current_route = ContextVar("current_route", default="none")
+
+REQUESTS = Counter(
+    "farmhub_reporting_http_requests_total", "HTTP requests by method, route and status",
+    ("method", "route", "status"), registry=REGISTRY
+)
+REQUEST_LATENCY = Histogram(
+    "farmhub_reporting_http_request_duration_seconds", "HTTP request latency by method and route",
+    ("method", "route"), registry=REGISTRY
+)
+IN_FLIGHT = Gauge(
+    "farmhub_reporting_http_requests_in_flight", "HTTP requests currently being served", ("route",),
+    registry=REGISTRY
+)
+DB_QUERIES = Counter(
+    "farmhub_reporting_db_queries_total", "Database statements run, by route ('none' outside requests)",
+    ("route",), registry=REGISTRY
+)
+DB_QUERY_LATENCY = Histogram(
+    "farmhub_reporting_db_query_duration_seconds", "Database statement latency by route ('none' outside requests)",
+    ("route",), registry=REGISTRY
+)
+DB_QUERY_ERRORS = Counter(
+    "farmhub_reporting_db_query_errors_total", "Database statements that raised, by route", ("route",),
+    registry=REGISTRY
+)
+
+def route_template(scope):
+    """The path template of the route a request will hit, to keep label cardinality bounded"""
+    app = scope.get("app")
+    for route in getattr(getattr(app, "router", None), "routes", ()):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+    return UNMATCHED_ROUTE
+
+class MetricsMiddleware:
+    """ASGI middleware recording request counts, latency and in-flight requests per route"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route = route_template(scope)
+        status = {"code": 500}
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        token = current_route.set(route)
+        in_flight = IN_FLIGHT.labels(route=route)
+        in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUEST_LATENCY.labels(method=scope["method"], route=route).observe(time.perf_counter() - start)
+            REQUESTS.labels(method=scope["method"], route=route, status=status["code"]).inc()
+            in_flight.dec()
+            current_route.reset(token)
+
+def instrument_engine(engine):
+    """Time every statement run through a (sync) engine and attribute it to the current route"""
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        start = conn.info["metrics_query_start"].pop()
+        route = current_route.get()
+        DB_QUERIES.labels(route=route).inc()
+        DB_QUERY_LATENCY.labels(route=route).observe(time.perf_counter() - start)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(exception_context):
+        starts = exception_context.connection.info.get("metrics_query_start") \
+            if exception_context.connection is not None else None
+        if starts:
+            starts.pop()
+        DB_QUERY_ERRORS.labels(route=current_route.get()).inc()
+
+class WaiterCountingPool:
+    """
+    Pool mixin counting the callers currently inside connect(): waiting for a
+    connection to be checked in, or for a new one to be opened. It wraps the
+    public Pool.connect() rather than the pool's internal queue, and survives
+    engine.dispose(), which recreates the pool from its class
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._waiters_lock = threading.Lock()
+        self._waiting = 0
+
+    def connect(self):
+        with self._waiters_lock:
+            self._waiting += 1
+        try:
+            return super().connect()
+        finally:
+            with self._waiters_lock:
+                self._waiting -= 1
+
+    def waiters(self):
+        return self._waiting
+
+class WaiterCountingQueuePool(WaiterCountingPool, QueuePool):
+    """QueuePool for sync engines, with waiters()"""
+
+class WaiterCountingAsyncQueuePool(WaiterCountingPool, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool for async engines, with waiters()"""
+
+class PoolCollector(Collector):
+    """Connection pool gauges per engine (sync or async), read at scrape time"""
+
+    def __init__(self, engines):
+        self.engines = engines
+
+    def collect(self):
+        families = {
+            "size": GaugeMetricFamily(
+                "farmhub_reporting_db_pool_size", "Configured connection pool size", labels=("engine",)
+            ),
+            "checkedout": GaugeMetricFamily(
+                "farmhub_reporting_db_pool_checked_out", "Connections currently checked out of the pool",
+                labels=("engine",)
+            ),
+            "checkedin": GaugeMetricFamily(
+                "farmhub_reporting_db_pool_checked_in", "Idle connections held by the pool", labels=("engine",)
+            ),
+            "overflow": GaugeMetricFamily(
+                "farmhub_reporting_db_pool_overflow", "Connections open beyond pool_size (negative while below it)",
+                labels=("engine",)
+            ),
+            "waiters": GaugeMetricFamily(
+                "farmhub_reporting_db_pool_waiters", "Callers waiting in the pool for a connection",
+                labels=("engine",)
+            ),
+        }
+        for name, engine in self.engines.items():
+            pool = engine.pool
+            for method, family in families.items():
+                # Pools without a fixed size (NullPool, StaticPool) lack these,
+                # and only the WaiterCounting pools have waiters()
+                if hasattr(pool, method):
+                    family.add_metric([name], getattr(pool, method)())
+        yield from families.values()
+
+class CacheCollector(Collector):
+    """Report cache counters, entries and hit ratio, read from ReportCache.snapshot() at scrape time"""
+
+    EVENTS = ("memory_hits", "disk_hits", "misses", "memory_evictions", "disk_evictions", "invalidations")
+
+    def __init__(self, caches):
+        self.caches = caches
+
+    def collect(self):
+        events = CounterMetricFamily(
+            "farmhub_reporting_cache_events", "Report cache lookups and evictions by cache and event",
+            labels=("cache", "event")
+        )
+        entries = GaugeMetricFamily(
+            "farmhub_reporting_cache_memory_entries", "Entries in the in-process cache tier", labels=("cache",)
+        )
+        hit_ratio = GaugeMetricFamily(
+            "farmhub_reporting_cache_hit_ratio", "Report cache hits (either tier) over lookups", labels=("cache",)
+        )
+        for cache in self.caches:
+            snapshot = cache.snapshot()
+            for event_name in self.EVENTS:
+                events.add_metric([cache.name, event_name], snapshot[event_name])
+            entries.add_metric([cache.name], snapshot["memory_entries"])
+            hit_ratio.add_metric([cache.name], snapshot["hit_ratio"])
+        yield from (events, entries, hit_ratio)
+
+def render():
+    """All metrics in the Prometheus text exposition format"""
+    return generate_latest(REGISTRY)
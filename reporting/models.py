@@ -3,7 +3,7 @@ SQLAlchemy models that mirror the Django models for read-only access
 These models map to the same database tables created by Django
 """
 
-from sqlalchemy import Column, Integer, String, Text, DateTime, Date, Time, Boolean, ForeignKey, Numeric
+from sqlalchemy import Column, Integer, String, Text, DateTime, Date, Time, Boolean, ForeignKey, Numeric, Float
 from sqlalchemy.orm import relationship
 from database import Base
 
@@ -68,6 +68,8 @@ class Cow(Base):
     status = Column(String(20))
     is_pregnant = Column(Boolean, default=False)
     last_breeding_date = Column(Date)
+    health_status = Column(String(20))
+    last_health_check_date = Column(Date)
     created_at = Column(DateTime)
     updated_at = Column(DateTime)
     
@@ -116,9 +118,86 @@ class Activity(Base):
     status = Column(String(20))
     description = Column(Text)
     notes = Column(Text)
+    health_status = Column(String(20))
     cost = Column(Numeric(10, 2))
     created_at = Column(DateTime)
     updated_at = Column(DateTime)
     
     # Relationships
     cow = relationship("Cow", back_populates="activities")
+
+class DailyMilkRollup(Base):
+    """DailyMilkRollup model mapping to Django's milk_daily_rollups table"""
+    __tablename__ = "milk_daily_rollups"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    farm_id = Column(Integer, ForeignKey("farms.id"))
+    cow_id = Column(Integer, ForeignKey("cows.id"))
+    date = Column(Date)
+    record_count = Column(Integer)
+    total_quantity_liters = Column(Numeric(12, 2))
+    updated_at = Column(DateTime)
+
+class MonthlyFarmMilkRollup(Base):
+    """MonthlyFarmMilkRollup model mapping to Django's milk_monthly_farm_rollups table"""
+    __tablename__ = "milk_monthly_farm_rollups"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    farm_id = Column(Integer, ForeignKey("farms.id"))
+    month = Column(Date)
+    record_count = Column(Integer)
+    total_quantity_liters = Column(Numeric(14, 2))
+    updated_at = Column(DateTime)
+
+class MilkRollupCoverage(Base):
+    """MilkRollupCoverage model mapping to Django's milk_rollup_coverage table"""
+    __tablename__ = "milk_rollup_coverage"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    start_date = Column(Date)
+    end_date = Column(Date)
+    rebuilt_at = Column(DateTime)
+
+class MilkYieldAnomaly(Base):
+    """MilkYieldAnomaly model mapping to Django's milk_yield_anomalies table"""
+    __tablename__ = "milk_yield_anomalies"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    farm_id = Column(Integer, ForeignKey("farms.id"))
+    cow_id = Column(Integer, ForeignKey("cows.id"))
+    date = Column(Date)
+    quantity_liters = Column(Numeric(6, 2))
+    expected_liters = Column(Numeric(6, 2))
+    z_score = Column(Float)
+    drop_percentage = Column(Numeric(5, 2))
+    updated_at = Column(DateTime)
+
+class MilkYieldForecast(Base):
+    """MilkYieldForecast model mapping to Django's milk_yield_forecasts table"""
+    __tablename__ = "milk_yield_forecasts"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    farm_id = Column(Integer, ForeignKey("farms.id"))
+    cow_id = Column(Integer, ForeignKey("cows.id"), unique=True)
+    as_of_date = Column(Date)
+    level_liters = Column(Float)
+    trend_liters = Column(Float)
+    next_day_liters = Column(Numeric(8, 2))
+    forecast_7_day_liters = Column(Numeric(10, 2))
+    forecast_30_day_liters = Column(Numeric(10, 2))
+    source_record_count = Column(Integer)
+    source_updated_at = Column(DateTime)
+    updated_at = Column(DateTime)
+
+class FarmMilkYieldForecast(Base):
+    """FarmMilkYieldForecast model mapping to Django's milk_farm_yield_forecasts table"""
+    __tablename__ = "milk_farm_yield_forecasts"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    farm_id = Column(Integer, ForeignKey("farms.id"), unique=True)
+    as_of_date = Column(Date)
+    cow_count = Column(Integer)
+    next_day_liters = Column(Numeric(12, 2))
+    forecast_7_day_liters = Column(Numeric(14, 2))
+    forecast_30_day_liters = Column(Numeric(14, 2))
+    updated_at = Column(DateTime)
@@ -0,0 +1,74 @@
+"""
+Keyset (cursor) pagination helpers for the reporting list endpoints
+A cursor is an opaque token holding the sort key of the last row of a page;
+the next page seeks past it with an index predicate instead of OFFSET
+"""
+
+import base64
+import json
+from datetime import date
+
+from fastapi import HTTPException
+from sqlalchemy import tuple_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Integer sort keys are 64-bit columns; larger values cannot be bound
+MAX_INTEGER_KEY = 2 ** 63 - 1
+
+def encode_cursor(values):
+    """Encode a row's sort key values into an opaque cursor token"""
+    payload = [value.isoformat() if isinstance(value, date) else value for value in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(token, types):
+    """Decode a cursor token back into sort key values of the given types"""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(payload, list) or len(payload) != len(types):
+            raise ValueError("cursor has the wrong number of keys")
+        values = tuple(
+            date.fromisoformat(value) if value_type is date else value_type(value)
+            for value, value_type in zip(payload, types)
+        )
+        if any(isinstance(value, int) and abs(value) > MAX_INTEGER_KEY for value in values):
+            raise ValueError("cursor key out of range")
+        return values
+    except (ValueError, TypeError, OverflowError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def paginate(query, columns, cursor, skip, limit, descending=False):
+    """
+    Order query by columns and apply either keyset seeking (when a cursor is
+    given) or the legacy skip/limit window. One row past limit is fetched so
+    set_next_cursor can tell whether another page follows.
+    """
+    if descending:
+        query = query.order_by(*[column.desc() for column in columns])
+    else:
+        query = query.order_by(*columns)
+
+    if cursor:
+        values = decode_cursor(cursor, [column.type.python_type for column in columns])
+        key = tuple_(*columns) if len(columns) > 1 else columns[0]
+        bound = tuple_(*values) if len(columns) > 1 else values[0]
+        query = query.filter(key < bound if descending else key > bound)
+    else:
+        query = query.offset(skip)
+
+    return query.limit(limit + 1)
+
+def set_next_cursor(response, rows, columns, limit):
+    """
+    Expose the cursor for the next page when paginate() fetched a row past
+    limit, and return the page without it; the last page gets no cursor
+    """
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            [getattr(last, column.key) for column in columns]
+        )
+    return rows
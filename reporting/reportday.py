@@ -0,0 +1,26 @@
+"""
+The calendar day reports call "today"
+Dates are taken in REPORTING_TIME_ZONE (default UTC, the core's TIME_ZONE).
+The core stores timestamps in UTC, so day bounds come back as UTC-aware
+datetimes that compare correctly with them on every backend.
+"""
+
+import os
+from datetime import datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+REPORTING_TIME_ZONE = ZoneInfo(os.environ.get("REPORTING_TIME_ZONE", "UTC"))
+
+def now():
+    """The current time in REPORTING_TIME_ZONE"""
+    return datetime.now(REPORTING_TIME_ZONE)
+
+def today():
+    """Today's date in REPORTING_TIME_ZONE"""
+    return now().date()
+
+def day_bounds(day):
+    """[start, end) of a calendar day in REPORTING_TIME_ZONE, as UTC-aware datetimes"""
+    start = datetime.combine(day, time.min, tzinfo=REPORTING_TIME_ZONE)
+    end = datetime.combine(day + timedelta(days=1), time.min, tzinfo=REPORTING_TIME_ZONE)
+    return start.astimezone(timezone.utc), end.astimezone(timezone.utc)
@@ -0,0 +1,36 @@
+"""
+Read-side helpers for the milk production rollup tables maintained by the
+Django core. Reports switch to the rollups only when the requested range is
+fully covered by a rebuilt range, otherwise they fall back to raw records.
+"""
+
+from sqlalchemy import select, func, or_
+from sqlalchemy.exc import DBAPIError
+
+from models import MilkRecord, MilkRollupCoverage
+
+async def rollups_cover(db, from_date=None, to_date=None):
+    """
+    Return True when the rollups hold complete data for [from_date, to_date]
+    An open from_date starts at the earliest milk record, an open to_date
+    requires open-ended coverage
+    """
+    try:
+        if from_date is None:
+            from_date = await db.scalar(select(func.min(MilkRecord.date)))
+            if from_date is None:
+                return False
+        
+        query = select(MilkRollupCoverage.id).filter(MilkRollupCoverage.start_date <= from_date)
+        if to_date is None:
+            query = query.filter(MilkRollupCoverage.end_date.is_(None))
+        else:
+            query = query.filter(or_(
+                MilkRollupCoverage.end_date.is_(None),
+                MilkRollupCoverage.end_date >= to_date
+            ))
+        return await db.scalar(query.limit(1)) is not None
+    except DBAPIError:
+        # Rollup tables not migrated yet on this database
+        await db.rollback()
+        return False
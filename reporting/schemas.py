@@ -113,6 +113,45 @@ class FarmSummary(BaseSchema):
     farm_status: str
     location: Optional[str] = None
     size_acres: Optional[float] = None
+    farms: Optional[List["FarmSummary"]] = None
+
+class ProductionTrend(BaseSchema):
+    bucket: str
+    farm_id: Optional[int] = None
+    cow_id: Optional[int] = None
+    date_range: Dict[str, Optional[date]]
+    production_trend: List[Dict[str, Any]]
+
+class MilkYieldAnomalyResponse(BaseSchema):
+    cow_id: int
+    cow_tag: str
+    cow_name: Optional[str] = None
+    farm_id: int
+    date: date
+    quantity_liters: Decimal
+    expected_liters: Decimal
+    z_score: float
+    drop_percentage: Decimal
+
+class MilkYieldForecastResponse(BaseSchema):
+    cow_id: int
+    farm_id: int
+    as_of_date: date
+    level_liters: float
+    trend_liters: float
+    next_day_liters: Decimal
+    forecast_7_day_liters: Decimal
+    forecast_30_day_liters: Decimal
+    updated_at: datetime
+
+class FarmMilkYieldForecastResponse(BaseSchema):
+    farm_id: int
+    as_of_date: date
+    cow_count: int
+    next_day_liters: Decimal
+    forecast_7_day_liters: Decimal
+    forecast_30_day_liters: Decimal
+    updated_at: datetime
 
 # Enhanced response schemas with relationships
 class CowWithRelations(CowResponse):
@@ -163,6 +202,10 @@ class CowProductionReport(BaseSchema):
     average_daily_production: float
     production_trend: List[Dict[str, Any]]
     latest_activity: Optional[ActivityResponse] = None
+    days_recorded: int = 0
+    rolling_7_day_average: Optional[float] = None
+    rolling_30_day_average: Optional[float] = None
+    day_over_day_change: Optional[float] = None
 
 class HealthReport(BaseSchema):
     total_health_checks: int
@@ -180,3 +223,4 @@ class FinancialReport(BaseSchema):
     medication_costs: float
     monthly_breakdown: List[Dict[str, Any]]
     cost_per_farm: List[Dict[str, Any]]
+    date_range: Dict[str, Optional[date]] = {}
@@ -0,0 +1,116 @@
+"""
+Slow-query log for the reporting service
+Statements slower than SLOW_QUERY_THRESHOLD_MS are logged with their bound
+parameters, calling route and duration, and kept in a ring buffer served by
+the admin-only /admin/slow-queries endpoint. With SLOW_QUERY_EXPLAIN enabled
+the plan is captured too: EXPLAIN (ANALYZE, BUFFERS) on PostgreSQL, EXPLAIN
+QUERY PLAN on SQLite.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+from sqlalchemy import event
+
+from metrics import current_route
+
+SLOW_QUERY_THRESHOLD_MS = float(os.environ.get("SLOW_QUERY_THRESHOLD_MS", "200"))
+SLOW_QUERY_EXPLAIN = os.environ.get("SLOW_QUERY_EXPLAIN", "False").lower() == "true"
+SLOW_QUERY_LOG_SIZE = int(os.environ.get("SLOW_QUERY_LOG_SIZE", "100"))
+# Longest parameter repr kept per entry, so bulk IN lists do not flood the log
+MAX_PARAMETERS_LENGTH = 2000
+
+logger = logging.getLogger("reporting.slow_queries")
+
+_entries = deque(maxlen=SLOW_QUERY_LOG_SIZE)
+_lock = threading.Lock()
+
+def _explainable(statement):
+    # ANALYZE executes the statement again, so only ever explain reads
+    return statement.lstrip().split(None, 1)[0].upper() in ("SELECT", "WITH")
+
+def _explain(conn, statement, parameters):
+    """Run EXPLAIN for a statement on the connection that executed it"""
+    dialect = conn.dialect.name
+    if dialect == "postgresql":
+        prefix, savepoint = "EXPLAIN (ANALYZE, BUFFERS) ", True
+    elif dialect == "sqlite":
+        prefix, savepoint = "EXPLAIN QUERY PLAN ", False
+    else:
+        return None
+
+    cursor = conn.connection.cursor()
+    try:
+        # A failed EXPLAIN must not abort the caller's transaction
+        if savepoint:
+            cursor.execute("SAVEPOINT slow_query_explain")
+        try:
+            cursor.execute(prefix + statement, parameters)
+            rows = cursor.fetchall()
+        except Exception:
+            if savepoint:
+                cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+            raise
+        if savepoint:
+            cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+    finally:
+        cursor.close()
+
+    if dialect == "sqlite":
+        # (id, parent, notused, detail)
+        return "\n".join(row[-1] for row in rows)
+    return "\n".join(row[0] for row in rows)
+
+def record(statement, parameters, duration_ms, route, plan=None):
+    """Log a slow statement and keep it in the ring buffer"""
+    parameters = repr(parameters)
+    if len(parameters) > MAX_PARAMETERS_LENGTH:
+        parameters = parameters[:MAX_PARAMETERS_LENGTH] + "..."
+    entry = {
+        "at": datetime.now(timezone.utc).isoformat(),
+        "route": route,
+        "duration_ms": round(duration_ms, 2),
+        "statement": statement,
+        "parameters": parameters,
+        "plan": plan,
+    }
+    with _lock:
+        _entries.append(entry)
+    logger.warning("Slow query (%.1f ms) on %s: %s params=%s", duration_ms, route, statement, parameters)
+    return entry
+
+def entries():
+    """Buffered slow queries, newest first"""
+    with _lock:
+        return list(reversed(_entries))
+
+def instrument_engine(engine):
+    """Watch every statement run through a (sync) engine"""
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("slow_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        duration_ms = (time.perf_counter() - conn.info["slow_query_start"].pop()) * 1000
+        if duration_ms < SLOW_QUERY_THRESHOLD_MS:
+            return
+
+        plan = None
+        if SLOW_QUERY_EXPLAIN and not executemany and _explainable(statement):
+            try:
+                plan = _explain(conn, statement, parameters)
+            except Exception as exc:
+                plan = f"EXPLAIN failed: {exc}"
+        record(statement, parameters, duration_ms, current_route.get(), plan)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(exception_context):
+        connection = exception_context.connection
+        starts = connection.info.get("slow_query_start") if connection is not None else None
+        if starts:
+            starts.pop()
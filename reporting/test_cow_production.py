@@ -0,0 +1,79 @@
+"""
+Tests for the per-cow production reports, single and batched
+
+Run with: python -m pytest -q test_cow_production.py
+"""
+
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import insert
+
+from conftest import build_rollups, insert_herd, milk_row
+from models import DailyMilkRollup, MilkRecord, MilkRollupCoverage, MonthlyFarmMilkRollup
+
+START = date(2024, 3, 1)
+
+# Cow 1 skips 3 March; cow 2 only has 1 and 5 March
+RECORDS = [
+    (1, 0, "10.00"), (1, 1, "12.50"), (1, 3, "11.00"), (1, 4, "9.00"),
+    (2, 0, "20.00"), (2, 4, "18.00"),
+]
+
+@pytest.fixture(params=["raw", "rollups"])
+def herd_app(request, empty_app, cold_caches):
+    """Both read paths: raw milk records, or rollups covering every date"""
+    client, _, engine = empty_app
+    insert_herd(engine)
+    rows = [milk_row(cow_id, START + timedelta(days=day), liters) for cow_id, day, liters in RECORDS]
+    with engine.begin() as connection:
+        connection.execute(insert(MilkRecord), rows)
+        if request.param == "rollups":
+            daily, monthly = build_rollups(rows, datetime(2024, 3, 6))
+            connection.execute(insert(DailyMilkRollup), daily)
+            connection.execute(insert(MonthlyFarmMilkRollup), monthly)
+            connection.execute(insert(MilkRollupCoverage), {"start_date": date(2023, 1, 1), "end_date": None})
+    return client
+
+def trend(report, field):
+    return [(entry["date"], entry[field]) for entry in report["production_trend"]]
+
+def test_day_over_day_change_is_against_the_previous_calendar_day(herd_app):
+    response = herd_app.get("/reports/cows/1/production")
+    assert response.status_code == 200
+    report = response.json()
+
+    assert trend(report, "day_over_day_change") == [
+        ("2024-03-01", None),
+        ("2024-03-02", 2.5),
+        # 3 March has no record, so 4 March has nothing to compare with
+        ("2024-03-04", None),
+        ("2024-03-05", -2.0),
+    ]
+    assert report["day_over_day_change"] == -2.0
+    assert report["days_recorded"] == 4
+    assert report["total_production_liters"] == 42.5
+    averages = [average for _, average in trend(report, "rolling_7_day_average")]
+    assert averages == pytest.approx([10.0, 11.25, 33.5 / 3, 10.625])
+
+def test_range_start_compares_with_the_day_before_it(herd_app):
+    report = herd_app.get("/reports/cows/1/production?from_date=2024-03-02&to_date=2024-03-04").json()
+    assert trend(report, "day_over_day_change") == [("2024-03-02", 2.5), ("2024-03-04", None)]
+    assert report["day_over_day_change"] is None
+
+def test_batch_matches_single_reports(herd_app):
+    response = herd_app.get("/reports/cows/production?cow_ids=2,99,1,2")
+    assert response.status_code == 200
+    reports = response.json()
+
+    # Requested order, unknown ids left out, repeats collapsed
+    assert [report["cow_id"] for report in reports] == [2, 1]
+    assert trend(reports[0], "day_over_day_change") == [("2024-03-01", None), ("2024-03-05", None)]
+    for report in reports:
+        assert report == herd_app.get(f"/reports/cows/{report['cow_id']}/production").json()
+
+def test_unknown_cow_and_oversized_batch(herd_app):
+    assert herd_app.get("/reports/cows/99/production").status_code == 404
+    oversized = ",".join(str(cow_id) for cow_id in range(1, 502))
+    assert herd_app.get(f"/reports/cows/production?cow_ids={oversized}").status_code == 400
+    assert herd_app.get("/reports/cows/production?cow_ids=1,x").status_code == 422
@@ -0,0 +1,78 @@
+"""
+Tests for the dashboard's "today" figures around midnight
+
+Run with: python -m pytest -q test_dashboard.py
+"""
+
+from datetime import date, datetime, timezone
+from zoneinfo import ZoneInfo
+
+import pytest
+from sqlalchemy import insert
+
+import reportday
+from conftest import insert_herd, milk_row
+from models import Activity, MilkRecord
+
+DHAKA = ZoneInfo("Asia/Dhaka")
+
+def completed(end_time):
+    """A completed activity of cow 1 that ended at end_time (naive UTC, as the core stores it)"""
+    return {
+        "title": "Milking", "activity_type": "MILKING", "cow_id": 1, "scheduled_date": end_time.date(),
+        "status": "COMPLETED", "end_time": end_time, "created_at": end_time, "updated_at": end_time,
+    }
+
+@pytest.fixture
+def midnight_app(empty_app, cold_caches):
+    client, _, engine = empty_app
+    insert_herd(engine)
+    with engine.begin() as connection:
+        connection.execute(insert(Activity), [
+            completed(datetime(2024, 2, 29, 17, 55)),
+            completed(datetime(2024, 2, 29, 23, 50)),
+            completed(datetime(2024, 3, 1, 0, 10)),
+        ])
+        connection.execute(insert(MilkRecord), [
+            milk_row(1, date(2024, 2, 29), "11.00"),
+            milk_row(1, date(2024, 3, 1), "13.50"),
+        ])
+    return client
+
+def at(monkeypatch, zone, wall_time):
+    """Run the reports as if it were wall_time in zone"""
+    monkeypatch.setattr(reportday, "REPORTING_TIME_ZONE", zone)
+    monkeypatch.setattr(reportday, "now", lambda: wall_time.replace(tzinfo=zone))
+
+def test_day_bounds_are_utc():
+    assert reportday.day_bounds(date(2024, 3, 1)) == (
+        datetime(2024, 3, 1, tzinfo=timezone.utc), datetime(2024, 3, 2, tzinfo=timezone.utc)
+    )
+
+def test_day_bounds_in_another_time_zone(monkeypatch):
+    monkeypatch.setattr(reportday, "REPORTING_TIME_ZONE", DHAKA)
+    start, end = reportday.day_bounds(date(2024, 3, 1))
+    assert (start, end) == (
+        datetime(2024, 2, 29, 18, tzinfo=timezone.utc), datetime(2024, 3, 1, 18, tzinfo=timezone.utc)
+    )
+    assert start.tzinfo is not None and end.tzinfo is not None
+
+def test_just_after_midnight_utc(midnight_app, monkeypatch):
+    at(monkeypatch, ZoneInfo("UTC"), datetime(2024, 3, 1, 0, 5))
+    summary = midnight_app.get("/reports/dashboard").json()
+    # Only the activity that ended after midnight counts; yesterday's milk does not
+    assert summary["activities_completed_today"] == 1
+    assert summary["milk_production_today"] == 13.5
+
+def test_just_after_midnight_in_dhaka(midnight_app, monkeypatch):
+    # 00:05 on 1 March in Dhaka is 18:05 UTC on 29 February
+    at(monkeypatch, DHAKA, datetime(2024, 3, 1, 0, 5))
+    summary = midnight_app.get("/reports/dashboard").json()
+    assert summary["activities_completed_today"] == 2
+    assert summary["milk_production_today"] == 13.5
+
+def test_just_before_midnight_utc(midnight_app, monkeypatch):
+    at(monkeypatch, ZoneInfo("UTC"), datetime(2024, 2, 29, 23, 55))
+    summary = midnight_app.get("/reports/dashboard").json()
+    assert summary["activities_completed_today"] == 2
+    assert summary["milk_production_today"] == 11.0
@@ -0,0 +1,188 @@
+"""
+Tests for the streaming NDJSON, CSV, Parquet and Arrow exports
+
+Run with: python -m pytest -q test_export.py
+"""
+
+import csv
+import io
+import json
+from datetime import date, datetime, time, timezone
+from decimal import Decimal
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+from sqlalchemy import insert, select
+
+import export
+from conftest import insert_herd, milk_row
+from models import Activity, MilkRecord
+from schemas import ActivityResponse, MilkRecordResponse
+
+MILK_COLUMNS = list(MilkRecordResponse.model_fields)
+ACTIVITY_COLUMNS = list(ActivityResponse.model_fields)
+CREATED_AT = datetime(2024, 3, 1, 6, 30, 15, 123456)
+
+@pytest.fixture
+def herd_app(empty_app, cold_caches):
+    """Seven milk records, one with the awkward values, and two activities"""
+    client, _, engine = empty_app
+    insert_herd(engine)
+    with engine.begin() as connection:
+        connection.execute(insert(MilkRecord), [
+            milk_row(1 + n % 2, date(2024, 3, 1 + n), f"{10 + n}.25", created_at=CREATED_AT)
+            for n in range(6)
+        ])
+        connection.execute(insert(MilkRecord), [
+            milk_row(
+                1, date(2024, 2, 29), "12.50", created_at=CREATED_AT, fat_percentage=Decimal("3.75"),
+                protein_percentage=Decimal("3.10"), notes='Ate, then "rested"\nlate',
+            ),
+        ])
+        connection.execute(insert(Activity), [
+            {
+                "title": "Vaccination, spring", "activity_type": "VACCINATION", "cow_id": 1,
+                "scheduled_date": date(2024, 3, 2), "scheduled_time": time(9, 30), "status": "COMPLETED",
+                "start_time": datetime(2024, 3, 2, 9, 31), "end_time": datetime(2024, 3, 2, 9, 45),
+                "cost": Decimal("45.50"), "created_at": CREATED_AT, "updated_at": CREATED_AT,
+            },
+            {
+                "title": "Feeding", "activity_type": "FEEDING", "cow_id": 2, "scheduled_date": date(2024, 3, 1),
+                "scheduled_time": None, "status": "PLANNED", "start_time": None, "end_time": None, "cost": None,
+                "created_at": CREATED_AT, "updated_at": CREATED_AT,
+            },
+        ])
+    return client, engine
+
+def stored_rows(engine, model, columns, sort):
+    """The rows as the database returns them, in the export order"""
+    query = select(*[getattr(model, column) for column in columns]).order_by(*[column.desc() for column in sort])
+    with engine.connect() as connection:
+        return [dict(zip(columns, row)) for row in connection.execute(query)]
+
+def stored_milk_records(engine):
+    return stored_rows(engine, MilkRecord, MILK_COLUMNS, [MilkRecord.date, MilkRecord.id])
+
+def as_text(value):
+    if value is None:
+        return None
+    if isinstance(value, (date, datetime, time)):
+        return value.isoformat()
+    return value if isinstance(value, (int, str)) else str(value)
+
+def as_utc(row):
+    return {
+        column: value.replace(tzinfo=timezone.utc) if isinstance(value, datetime) else value
+        for column, value in row.items()
+    }
+
+def fetch(client, path):
+    response = client.get(path)
+    assert response.status_code == 200
+    return response
+
+def test_ndjson_round_trip(herd_app):
+    client, engine = herd_app
+    response = fetch(client, "/export/milk-records")
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert response.headers["content-disposition"] == 'attachment; filename="milk-records.ndjson"'
+
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert rows == [
+        {column: as_text(value) for column, value in row.items()}
+        for row in stored_milk_records(engine)
+    ]
+    # Decimals keep their scale as strings, like the JSON API
+    awkward = rows[-1]
+    assert awkward["total_quantity_liters"] == "12.50"
+    assert awkward["fat_percentage"] == "3.75"
+    assert awkward["created_at"] == "2024-03-01T06:30:15.123456"
+
+def test_csv_round_trip(herd_app):
+    client, engine = herd_app
+    response = fetch(client, "/export/milk-records?format=csv")
+    assert response.headers["content-type"].startswith("text/csv")
+
+    reader = csv.DictReader(io.StringIO(response.text, newline=""))
+    assert reader.fieldnames == MILK_COLUMNS
+    assert list(reader) == [
+        {column: "" if value is None else str(as_text(value)) for column, value in row.items()}
+        for row in stored_milk_records(engine)
+    ]
+
+def test_csv_quotes_text(herd_app):
+    client, _ = herd_app
+    text = fetch(client, "/export/milk-records?format=csv&to_date=2024-02-29").text
+    assert '"Ate, then ""rested""\nlate"' in text
+    assert next(csv.DictReader(io.StringIO(text, newline="")))["notes"] == 'Ate, then "rested"\nlate'
+
+def test_csv_header_on_empty_results(herd_app):
+    client, _ = herd_app
+    assert fetch(client, "/export/milk-records?format=csv&farm_id=99").text == ",".join(MILK_COLUMNS) + "\r\n"
+    assert fetch(client, "/export/activities?format=csv&cow_id=99").text == ",".join(ACTIVITY_COLUMNS) + "\r\n"
+    assert fetch(client, "/export/milk-records?farm_id=99").text == ""
+
+def read_parquet(response):
+    return pq.read_table(io.BytesIO(response.content))
+
+def read_arrow(response):
+    return pa.ipc.open_stream(io.BytesIO(response.content)).read_all()
+
+@pytest.mark.parametrize("export_format, read", [("parquet", read_parquet), ("arrow", read_arrow)])
+def test_columnar_round_trip(herd_app, export_format, read):
+    client, engine = herd_app
+    response = fetch(client, f"/export/milk-records.{export_format}")
+    assert response.headers["content-type"] == export.MEDIA_TYPES[export_format]
+
+    table = read(response)
+    assert table.column_names == MILK_COLUMNS
+    assert table.to_pylist() == [as_utc(row) for row in stored_milk_records(engine)]
+    # Decimals stay exact, not floats
+    assert table.schema.field("total_quantity_liters").type == pa.decimal128(6, 2)
+    assert table.schema.field("fat_percentage").type == pa.decimal128(4, 2)
+    assert table.schema.field("date").type == pa.date32()
+    assert table.schema.field("created_at").type == pa.timestamp("us", tz="UTC")
+    assert table.column("total_quantity_liters").to_pylist()[-1] == Decimal("12.50")
+
+@pytest.mark.parametrize("export_format, read", [("parquet", read_parquet), ("arrow", read_arrow)])
+def test_columnar_activities(herd_app, export_format, read):
+    client, engine = herd_app
+    table = read(fetch(client, f"/export/activities.{export_format}"))
+    expected = stored_rows(engine, Activity, ACTIVITY_COLUMNS, [Activity.scheduled_date, Activity.id])
+    assert table.to_pylist() == [as_utc(row) for row in expected]
+    assert table.schema.field("scheduled_time").type == pa.time64("us")
+
+@pytest.mark.parametrize("export_format, read", [("parquet", read_parquet), ("arrow", read_arrow)])
+def test_columnar_empty_results_keep_the_schema(herd_app, export_format, read):
+    client, _ = herd_app
+    table = read(fetch(client, f"/export/milk-records.{export_format}?farm_id=99"))
+    assert table.num_rows == 0
+    assert table.column_names == MILK_COLUMNS
+    assert table.schema.field("total_quantity_liters").type == pa.decimal128(6, 2)
+
+def test_streams_across_partitions(herd_app, monkeypatch):
+    client, engine = herd_app
+    monkeypatch.setattr(export, "EXPORT_CHUNK_SIZE", 3)
+    monkeypatch.setattr(export, "COLUMNAR_CHUNK_SIZE", 3)
+    expected = stored_milk_records(engine)
+
+    rows = [json.loads(line) for line in fetch(client, "/export/milk-records").text.splitlines()]
+    assert [row["id"] for row in rows] == [row["id"] for row in expected]
+
+    # One header, however many chunks
+    lines = list(csv.reader(io.StringIO(fetch(client, "/export/milk-records?format=csv").text, newline="")))
+    assert lines[0] == MILK_COLUMNS
+    assert [int(line[0]) for line in lines[1:]] == [row["id"] for row in expected]
+
+    # One record batch, and one Parquet row group, per chunk
+    batches = list(pa.ipc.open_stream(io.BytesIO(fetch(client, "/export/milk-records.arrow").content)))
+    assert [batch.num_rows for batch in batches] == [3, 3, 1]
+    parquet = pq.ParquetFile(io.BytesIO(fetch(client, "/export/milk-records.parquet").content))
+    assert [parquet.metadata.row_group(n).num_rows for n in range(parquet.num_row_groups)] == [3, 3, 1]
+    assert parquet.read().to_pylist() == [as_utc(row) for row in expected]
+
+def test_unknown_columnar_format(herd_app):
+    client, _ = herd_app
+    assert client.get("/export/milk-records.xlsx").status_code in (404, 422)
+    assert client.get("/export/milk-records?format=parquet").status_code == 422
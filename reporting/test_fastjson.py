@@ -0,0 +1,136 @@
+"""
+Tests for byte-level parity of the fast JSON list path with the old
+response_model path
+
+Run with: python -m pytest -q test_fastjson.py
+"""
+
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+from typing import List
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+
+import database
+import fastjson
+from conftest import insert_herd, milk_row
+from models import Activity, MilkRecord
+from schemas import ActivityResponse, MilkRecordResponse
+
+CREATED_AT = datetime(2024, 3, 1, 6, 30, 15, 123456)
+
+def legacy_app():
+    """The list endpoints as they were: ORM objects through response_model"""
+    app = FastAPI()
+
+    @app.get("/milk-records", response_model=List[MilkRecordResponse])
+    def get_milk_records():
+        with database.SessionLocal() as db:
+            return db.query(MilkRecord).order_by(MilkRecord.date.desc(), MilkRecord.id.desc()).all()
+
+    @app.get("/activities", response_model=List[ActivityResponse])
+    def get_activities():
+        with database.SessionLocal() as db:
+            return db.query(Activity).order_by(Activity.scheduled_date.desc(), Activity.id.desc()).all()
+
+    return TestClient(app)
+
+@pytest.fixture(params=["orjson", "json"])
+def herd_app(request, empty_app, cold_caches, monkeypatch):
+    """Records and activities with empty, fractional and non-ASCII values, encoded by either backend"""
+    if request.param == "json":
+        monkeypatch.setattr(fastjson, "orjson", None)
+    client, _, engine = empty_app
+    insert_herd(engine)
+    with engine.begin() as connection:
+        connection.execute(insert(MilkRecord), [
+            milk_row(1, date(2024, 3, 1), "12.50", created_at=CREATED_AT, fat_percentage=Decimal("3.75"),
+                     protein_percentage=Decimal("3.00"), notes="Café, \"calm\" ✓\n"),
+            milk_row(2, date(2024, 3, 1), "0.05", created_at=CREATED_AT.replace(microsecond=0),
+                     fat_percentage=None, protein_percentage=None, notes=None),
+            milk_row(1, date(2024, 2, 29), "100.00", created_at=None, fat_percentage=Decimal("4.10"),
+                     protein_percentage=Decimal("0.00"), notes=""),
+        ])
+        connection.execute(insert(Activity), [
+            {
+                "title": "Vaccination ✓", "activity_type": "VACCINATION", "cow_id": 1,
+                "scheduled_date": date(2024, 3, 2), "scheduled_time": time(9, 30, 5), "status": "COMPLETED",
+                "start_time": datetime(2024, 3, 2, 9, 31), "end_time": datetime(2024, 3, 2, 9, 45, 0, 500),
+                "description": "Spring round", "cost": Decimal("45.50"),
+                "created_at": CREATED_AT, "updated_at": CREATED_AT,
+            },
+            {
+                "title": "Feeding", "activity_type": "FEEDING", "cow_id": 2,
+                "scheduled_date": date(2024, 3, 1), "scheduled_time": None, "status": "PLANNED",
+                "start_time": None, "end_time": None, "description": None, "cost": None,
+                "created_at": CREATED_AT, "updated_at": CREATED_AT,
+            },
+        ])
+    return client
+
+@pytest.mark.parametrize("path", ["/milk-records", "/activities"])
+def test_list_bytes_match_response_model(herd_app, path):
+    response = herd_app.get(path)
+    expected = legacy_app().get(path)
+    assert response.status_code == expected.status_code == 200
+    assert response.headers["content-type"] == expected.headers["content-type"]
+    assert response.content == expected.content
+
+def test_decimal_is_a_string(herd_app):
+    record = next(record for record in herd_app.get("/milk-records").json() if record["id"] == 1)
+    assert record["total_quantity_liters"] == "12.50"
+    assert record["fat_percentage"] == "3.75"
+    assert b'"total_quantity_liters":"12.50"' in herd_app.get("/milk-records").content
+
+def legacy_dumps(schema, rows):
+    """What response_model plus FastAPI's JSONResponse produce for rows"""
+    response = legacy_app()
+    app = response.app
+
+    @app.get("/rows", response_model=List[schema])
+    def get_rows():
+        return rows
+
+    return response.get("/rows").content
+
+AWARE = [
+    datetime(2024, 3, 1, 6, 30, 15, 123456, tzinfo=timezone.utc),
+    datetime(2024, 3, 1, 6, 30, tzinfo=timezone.utc),
+    datetime(2024, 3, 1, 8, 30, tzinfo=timezone(timedelta(hours=2))),
+    datetime(2024, 3, 1, 1, 0, tzinfo=timezone(timedelta(hours=-5, minutes=-30))),
+]
+
+@pytest.mark.parametrize("backend", ["orjson", "json"])
+@pytest.mark.parametrize("value", AWARE, ids=["utc-micro", "utc", "plus-2", "minus-5-30"])
+def test_aware_datetimes_match_response_model(monkeypatch, backend, value):
+    if backend == "json":
+        monkeypatch.setattr(fastjson, "orjson", None)
+    row = {
+        "id": 1, "title": "Check", "activity_type": "HEALTH_CHECK", "cow_id": 1,
+        "scheduled_date": date(2024, 3, 1), "scheduled_time": time(6, 30), "start_time": value,
+        "end_time": None, "status": "PLANNED", "cost": Decimal("1E+1"), "created_at": value,
+    }
+    row = {field: row.get(field) for field in ActivityResponse.model_fields}
+    encoded = fastjson.dumps([row])
+    assert encoded == legacy_dumps(ActivityResponse, [row])
+    # UTC is written as "Z", like Pydantic, never "+00:00"
+    if value.utcoffset() == timedelta(0):
+        assert b"+00:00" not in encoded and encoded.count(b'Z"') == 2
+
+@pytest.mark.parametrize("backend", ["orjson", "json"])
+def test_decimals_match_response_model(monkeypatch, backend):
+    if backend == "json":
+        monkeypatch.setattr(fastjson, "orjson", None)
+    row = {field: None for field in MilkRecordResponse.model_fields}
+    row.update(
+        id=1, cow_id=1, farmer_id=2, farm_id=1, date=date(2024, 3, 1),
+        morning_quantity_liters=Decimal("0.10"), evening_quantity_liters=Decimal("0"),
+        total_quantity_liters=Decimal("0.1"), fat_percentage=Decimal("12345678901234567890.12"),
+    )
+    encoded = fastjson.dumps([row])
+    assert encoded == legacy_dumps(MilkRecordResponse, [row])
+    assert b'"morning_quantity_liters":"0.10"' in encoded
+    assert b'"fat_percentage":"12345678901234567890.12"' in encoded
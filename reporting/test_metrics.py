@@ -0,0 +1,53 @@
+"""
+Tests for the reporting /metrics endpoint and the waiter-counting pools
+
+Run with: python -m pytest -q test_metrics.py
+"""
+
+import threading
+import time
+
+from sqlalchemy import create_engine, text
+
+from metrics import WaiterCountingQueuePool
+
+def test_waiters_counts_callers_blocked_on_an_exhausted_pool(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.sqlite3'}", poolclass=WaiterCountingQueuePool,
+        pool_size=1, max_overflow=0, pool_timeout=5
+    )
+    held = engine.connect()
+    assert engine.pool.waiters() == 0
+
+    def wait_for_connection():
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+
+    waiters = [threading.Thread(target=wait_for_connection) for _ in range(2)]
+    for waiter in waiters:
+        waiter.start()
+    deadline = time.monotonic() + 5
+    while engine.pool.waiters() < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert engine.pool.waiters() == 2
+    assert engine.pool.checkedout() == 1
+
+    held.close()
+    for waiter in waiters:
+        waiter.join(5)
+    assert engine.pool.waiters() == 0
+    engine.dispose()
+
+def test_metrics_exposition(budget_app, cold_caches):
+    client, statements, context = budget_app
+    client.get("/cows")
+    body = client.get("/metrics").text
+
+    queries = [line for line in body.splitlines() if line.startswith('farmhub_reporting_db_queries_total{route="/cows"}')]
+    assert queries and float(queries[0].split()[-1]) >= 1
+    for family in (
+        "farmhub_reporting_http_request_duration_seconds", "farmhub_reporting_http_requests_in_flight",
+        "farmhub_reporting_db_pool_checked_out", "farmhub_reporting_db_pool_overflow",
+        "farmhub_reporting_db_pool_waiters", "farmhub_reporting_cache_hit_ratio",
+    ):
+        assert f"# TYPE {family} " in body, family
@@ -0,0 +1,109 @@
+"""
+Tests for the keyset cursors of the reporting list endpoints
+
+Run with: python -m pytest -q test_pagination.py
+"""
+
+import base64
+import json
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import insert
+
+from conftest import insert_herd, milk_row
+from models import Activity, MilkRecord
+from pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+
+@pytest.fixture
+def herd_app(empty_app, cold_caches):
+    """Three cows milked on the same five days, so every date is shared by three records"""
+    client, _, engine = empty_app
+    insert_herd(engine, cow_count=3)
+    with engine.begin() as connection:
+        connection.execute(insert(MilkRecord), [
+            milk_row(cow_id, date(2024, 3, 1) + timedelta(days=day), 10 + cow_id)
+            for day in range(5)
+            for cow_id in (3, 1, 2)
+        ])
+        connection.execute(insert(Activity), [
+            {
+                "title": f"Feeding {n}", "activity_type": "FEEDING", "cow_id": 1 + n % 3,
+                "scheduled_date": date(2024, 3, 1) + timedelta(days=n // 4), "status": "PLANNED",
+                "created_at": datetime(2024, 3, 1), "updated_at": datetime(2024, 3, 1),
+            }
+            for n in range(10)
+        ])
+    return client
+
+def walk(client, path, limit):
+    """Follow the cursors from the first page; returns the pages' ids and the last page's headers"""
+    pages, cursor = [], None
+    while True:
+        params = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+        response = client.get(path, params=params)
+        assert response.status_code == 200
+        pages.append([row["id"] for row in response.json()])
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            return pages
+        assert len(pages) < 20, "cursor does not advance"
+
+@pytest.mark.parametrize("limit", [1, 4, 5, 15, 100])
+def test_milk_record_cursor_round_trip(herd_app, limit):
+    expected = [row["id"] for row in herd_app.get("/milk-records", params={"limit": 1000}).json()]
+    dates = [row["date"] for row in herd_app.get("/milk-records", params={"limit": 1000}).json()]
+    assert len(expected) == 15 and len(set(dates)) == 5
+
+    pages = walk(herd_app, "/milk-records", limit)
+    assert [row_id for page in pages for row_id in page] == expected
+    # Pages are full up to the last one, which is never empty and carries no cursor
+    assert all(len(page) == limit for page in pages[:-1])
+    assert 0 < len(pages[-1]) <= limit
+    assert len(pages) == -(-15 // limit)
+
+def test_ties_are_ordered_by_id(herd_app):
+    rows = herd_app.get("/milk-records", params={"limit": 1000}).json()
+    keys = [(row["date"], row["id"]) for row in rows]
+    assert keys == sorted(keys, reverse=True)
+
+def test_activity_cursor_round_trip(herd_app):
+    expected = [row["id"] for row in herd_app.get("/activities", params={"limit": 1000}).json()]
+    pages = walk(herd_app, "/activities", 3)
+    assert [row_id for page in pages for row_id in page] == expected
+    assert [len(page) for page in pages] == [3, 3, 3, 1]
+
+def test_cow_cursor_on_an_exactly_full_last_page(herd_app):
+    assert walk(herd_app, "/cows", 3) == [[1, 2, 3]]
+    assert walk(herd_app, "/cows", 1) == [[1], [2], [3]]
+
+def token(payload):
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+@pytest.mark.parametrize("cursor", [
+    "not a cursor!",
+    "%%%%",
+    base64.urlsafe_b64encode(b"\xff\xfe").decode(),
+    token({"date": "2024-03-01"}),
+    token(["2024-03-01"]),
+    token(["2024-03-01", 1, 2]),
+    token(["yesterday", 1]),
+    token([20240301, 1]),
+    token(["2024-03-01", "one"]),
+    token(["2024-03-01", [1]]),
+    token(["2024-03-01", 2 ** 70]),
+    "WyIyMDI0LTAzLTAxIixJbmZpbml0eV0",  # ["2024-03-01",Infinity]
+])
+def test_tampered_cursor_is_a_bad_request(herd_app, cursor):
+    response = herd_app.get("/milk-records", params={"cursor": cursor})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+def test_tampered_single_key_cursor(herd_app):
+    assert herd_app.get("/cows", params={"cursor": token([-(2 ** 64)])}).status_code == 400
+    assert herd_app.get("/cows", params={"cursor": token([None])}).status_code == 400
+
+def test_encode_decode():
+    cursor = encode_cursor([date(2024, 3, 1), 42])
+    assert "=" not in cursor
+    assert decode_cursor(cursor, [date, int]) == (date(2024, 3, 1), 42)
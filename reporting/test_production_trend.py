@@ -0,0 +1,101 @@
+"""
+Tests for the dense day/week/month production trend
+
+Run with: python -m pytest -q test_production_trend.py
+"""
+
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import insert
+
+from conftest import build_rollups, insert_herd, milk_row
+from models import DailyMilkRollup, MilkRecord, MilkRollupCoverage, MonthlyFarmMilkRollup
+
+# Around the new year, with gaps of a few days and a whole month
+RECORDS = [
+    (1, date(2023, 12, 30), "10.00"),
+    (1, date(2024, 1, 2), "5.00"),
+    (2, date(2024, 1, 2), "7.50"),
+    (2, date(2024, 3, 15), "4.00"),
+]
+
+@pytest.fixture(params=["raw", "rollups"])
+def herd_app(request, empty_app, cold_caches):
+    """Both read paths: raw milk records, or rollups covering every date"""
+    client, _, engine = empty_app
+    insert_herd(engine)
+    rows = [milk_row(cow_id, day, liters) for cow_id, day, liters in RECORDS]
+    with engine.begin() as connection:
+        connection.execute(insert(MilkRecord), rows)
+        if request.param == "rollups":
+            daily, monthly = build_rollups(rows, datetime(2024, 4, 1))
+            connection.execute(insert(DailyMilkRollup), daily)
+            connection.execute(insert(MonthlyFarmMilkRollup), monthly)
+            connection.execute(insert(MilkRollupCoverage), {"start_date": date(2023, 1, 1), "end_date": None})
+    return client
+
+def trend(client, **params):
+    response = client.get("/reports/production-trend", params=params)
+    assert response.status_code == 200
+    return [
+        (entry["period"], entry["record_count"], entry["total_quantity_liters"], entry["cow_count"])
+        for entry in response.json()["production_trend"]
+    ]
+
+def test_days_are_zero_filled(herd_app):
+    assert trend(herd_app, bucket="day", from_date="2023-12-29", to_date="2024-01-03") == [
+        ("2023-12-29", 0, 0.0, 0),
+        ("2023-12-30", 1, 10.0, 1),
+        ("2023-12-31", 0, 0.0, 0),
+        ("2024-01-01", 0, 0.0, 0),
+        ("2024-01-02", 2, 12.5, 2),
+        ("2024-01-03", 0, 0.0, 0),
+    ]
+
+def test_open_range_spans_the_first_to_the_last_record(herd_app):
+    days = trend(herd_app, bucket="day")
+    assert (days[0][0], days[-1][0], len(days)) == ("2023-12-30", "2024-03-15", 77)
+    assert sum(count for _, count, _, _ in days) == 4
+    assert sum(quantity for _, _, quantity, _ in days) == 26.5
+
+def test_months_across_the_year_boundary(herd_app):
+    assert trend(herd_app, bucket="month") == [
+        ("2023-12-01", 1, 10.0, 1),
+        ("2024-01-01", 2, 12.5, 2),
+        ("2024-02-01", 0, 0.0, 0),
+        ("2024-03-01", 1, 4.0, 1),
+    ]
+    # A range starting mid-month still reports whole-month buckets
+    assert [period for period, *_ in trend(herd_app, bucket="month", from_date="2023-11-15", to_date="2024-01-10")] == [
+        "2023-11-01", "2023-12-01", "2024-01-01",
+    ]
+
+def test_iso_weeks_across_the_year_boundary(herd_app):
+    # 30 Dec 2023 is a Saturday, 2 Jan 2024 a Tuesday
+    assert trend(herd_app, bucket="week", from_date="2023-12-20", to_date="2024-01-10") == [
+        ("2023-12-18", 0, 0.0, 0),
+        ("2023-12-25", 1, 10.0, 1),
+        ("2024-01-01", 2, 12.5, 2),
+        ("2024-01-08", 0, 0.0, 0),
+    ]
+
+def test_filters(herd_app):
+    assert trend(herd_app, bucket="month", cow_id=2) == [
+        ("2024-01-01", 1, 7.5, 1),
+        ("2024-02-01", 0, 0.0, 0),
+        ("2024-03-01", 1, 4.0, 1),
+    ]
+    assert trend(herd_app, bucket="month", farm_id=1, to_date="2023-12-31") == [("2023-12-01", 1, 10.0, 1)]
+
+def test_open_range_without_rows_is_empty(herd_app):
+    assert trend(herd_app, bucket="day", farm_id=99) == []
+    assert trend(herd_app, bucket="week", from_date="2024-04-01") == []
+    assert trend(herd_app, bucket="month", to_date="2023-01-31") == []
+
+def test_closed_range_without_rows_is_all_zeros(herd_app):
+    assert trend(herd_app, bucket="week", from_date="2024-02-01", to_date="2024-02-14") == [
+        ("2024-01-29", 0, 0.0, 0),
+        ("2024-02-05", 0, 0.0, 0),
+        ("2024-02-12", 0, 0.0, 0),
+    ]
@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+"""
+Query and latency budgets for every reporting route
+Calls each [[reporting]] entry with cold caches against the budget_app
+fixture (conftest.py), a SQLite database seeded as shaped by [dataset] in
+../query_budgets.toml, and fails when a response has the wrong status, runs
+more SQL statements than its budget or takes longer than its wall-clock budget. The reporting service has no authentication, so
+unlike the core budgets there is one call per route rather than per role.
+The milk rollups are seeded too but only marked as covering the data while
+the entries flagged `rollups` are measured on them, so those routes are
+checked on both read paths and must return the same payload from each.
+
+Run with: python -m pytest -q test_query_budgets.py
+"""
+
+import os
+import time
+import tomllib
+from datetime import date, datetime, timedelta
+
+import pytest
+from fastapi.routing import APIRoute
+from sqlalchemy import delete, insert
+
+import main
+from cache import report_cache, dashboard_cache
+from conftest import BUDGETS_PATH
+from models import MilkRollupCoverage
+
+# Slow CI runners can stretch the wall-clock budgets without touching the table
+TIME_SCALE = float(os.environ.get("QUERY_BUDGET_TIME_SCALE", "1"))
+
+with open(BUDGETS_PATH, "rb") as budgets_file:
+    BUDGETS = tomllib.load(budgets_file)
+
+def test_every_route_has_a_budget():
+    routes = {route.path for route in main.app.routes if isinstance(route, APIRoute)}
+    budgeted = {entry["route"] for entry in BUDGETS["reporting"]}
+    assert sorted(routes - budgeted) == [], "Add these routes to query_budgets.toml"
+
+def call_route(client, statements, context, entry):
+    """Make one request, returning (response, statements run, elapsed ms)"""
+    path = entry.get("path", entry["route"]).format(**context)
+    headers = {name: value.format(**context) for name, value in entry.get("headers", {}).items()}
+
+    statements.clear()
+    start = time.perf_counter()
+    response = client.request(entry.get("method", "GET"), path, headers=headers)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    return response, list(statements), elapsed_ms
+
+def assert_within_budget(entry, path, response, statements, elapsed_ms):
+    assert response.status_code == entry.get("status", 200), f"{path}: {response.text[:300]}"
+    assert len(statements) <= entry["queries"], (
+        f"{path} ran {len(statements)} queries (budget {entry['queries']}):\n" + "\n".join(statements)
+    )
+    max_ms = entry.get("max_ms", BUDGETS["defaults"]["max_ms"]) * TIME_SCALE
+    assert elapsed_ms <= max_ms, f"{path} took {elapsed_ms:.0f} ms (budget {max_ms:.0f} ms)"
+
+@pytest.mark.parametrize("entry", BUDGETS["reporting"], ids=lambda entry: entry["route"])
+def test_route_budget(budget_app, cold_caches, entry):
+    client, statements, context = budget_app
+    path = entry.get("path", entry["route"]).format(**context)
+    assert_within_budget(entry, path, *call_route(client, statements, context, entry))
+
+@pytest.mark.parametrize(
+    "entry", [entry for entry in BUDGETS["reporting"] if entry.get("rollups")], ids=lambda entry: entry["route"]
+)
+def test_rollup_route_budget(budget_app, cold_caches, entry):
+    """Raw and rollup reads both stay within budget and return the same payload"""
+    client, statements, context = budget_app
+    path = entry.get("path", entry["route"]).format(**context)
+    raw_response, raw_statements, raw_ms = call_route(client, statements, context, entry)
+    assert_within_budget(entry, f"{path} (raw)", raw_response, raw_statements, raw_ms)
+    assert not any("milk_daily_rollups" in statement for statement in raw_statements)
+
+    with context["sync_engine"].begin() as connection:
+        connection.execute(insert(MilkRollupCoverage), [
+            {"start_date": date.today() - timedelta(days=400), "end_date": None, "rebuilt_at": datetime.now()}
+        ])
+    try:
+        for cache in (report_cache, dashboard_cache):
+            cache._entries.clear()
+            cache._watermarks.clear()
+        rollup_response, rollup_statements, rollup_ms = call_route(client, statements, context, entry)
+    finally:
+        with context["sync_engine"].begin() as connection:
+            connection.execute(delete(MilkRollupCoverage))
+
+    assert_within_budget(entry, f"{path} (rollups)", rollup_response, rollup_statements, rollup_ms)
+    assert any("milk_daily_rollups" in statement for statement in rollup_statements), (
+        f"{path} did not read the rollups:\n" + "\n".join(rollup_statements)
+    )
+    assert rollup_response.json() == raw_response.json()
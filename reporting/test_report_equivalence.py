@@ -0,0 +1,223 @@
+"""
+Tests that the grouped report queries return what the old row-at-a-time
+implementation (reporting/main.py before the SQL aggregation work) returned
+
+Run with: python -m pytest -q test_report_equivalence.py
+"""
+
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import and_, func, insert
+
+import database
+import reportday
+from conftest import seed_dataset
+from models import Activity, Cow, Farm, MilkRecord, MilkRollupCoverage, User
+from schemas import ActivitySummary, FarmSummary, ProductionSummary
+
+SIZES = {
+    "agents": 2, "farms_per_agent": 2, "farmers_per_farm": 2, "cows_per_farmer": 3,
+    # Longer than the farm summary's 30-day window
+    "milk_days": 40, "activities_per_cow": 8,
+}
+EMPTY_FARM_ID = 100
+
+# The old implementation, as of d30d1e4, on the sync session; date.today() is
+# reportday.today() as everywhere else since the reports moved to UTC days
+
+def legacy_production_summary(db, from_date=None, to_date=None, farm_id=None):
+    query = db.query(MilkRecord)
+    if from_date:
+        query = query.filter(MilkRecord.date >= from_date)
+    if to_date:
+        query = query.filter(MilkRecord.date <= to_date)
+    if farm_id:
+        query = query.filter(MilkRecord.farm_id == farm_id)
+    records = query.all()
+    if not records:
+        return ProductionSummary(
+            total_records=0, total_quantity_liters=0.0, average_quantity_liters=0.0, total_farms=0,
+            total_cows=0, date_range={"from_date": from_date, "to_date": to_date}
+        )
+    total_quantity = sum(record.total_quantity_liters for record in records)
+    return ProductionSummary(
+        total_records=len(records),
+        total_quantity_liters=float(total_quantity),
+        average_quantity_liters=float(total_quantity / len(records)),
+        total_farms=len(set(record.farm_id for record in records)),
+        total_cows=len(set(record.cow_id for record in records)),
+        date_range={"from_date": from_date, "to_date": to_date}
+    )
+
+def legacy_activity_summary(db, from_date=None, to_date=None, farm_id=None):
+    query = db.query(Activity)
+    if from_date:
+        query = query.filter(Activity.scheduled_date >= from_date)
+    if to_date:
+        query = query.filter(Activity.scheduled_date <= to_date)
+    if farm_id:
+        query = query.join(Cow).filter(Cow.farm_id == farm_id)
+    activities = query.all()
+    if not activities:
+        return ActivitySummary(
+            total_activities=0, completed_activities=0, planned_activities=0, total_cost=0.0,
+            activity_types={}, date_range={"from_date": from_date, "to_date": to_date}
+        )
+    activity_types = {}
+    for activity in activities:
+        activity_types[activity.activity_type] = activity_types.get(activity.activity_type, 0) + 1
+    return ActivitySummary(
+        total_activities=len(activities),
+        completed_activities=len([a for a in activities if a.status == 'COMPLETED']),
+        planned_activities=len([a for a in activities if a.status == 'PLANNED']),
+        total_cost=float(sum(a.cost or 0 for a in activities)),
+        activity_types=activity_types,
+        date_range={"from_date": from_date, "to_date": to_date}
+    )
+
+def legacy_farm(db, farm):
+    farmer_count = db.query(User).join(Cow).filter(
+        and_(User.role == 'FARMER', Cow.farm_id == farm.id)
+    ).distinct().count()
+    cow_count = db.query(Cow).filter(Cow.farm_id == farm.id).count()
+    total_milk = db.query(func.sum(MilkRecord.total_quantity_liters)).filter(
+        MilkRecord.farm_id == farm.id
+    ).scalar() or 0
+    recent_milk = db.query(func.sum(MilkRecord.total_quantity_liters)).filter(
+        and_(MilkRecord.farm_id == farm.id, MilkRecord.date >= reportday.today() - timedelta(days=30))
+    ).scalar() or 0
+    return FarmSummary(
+        farm_id=farm.id,
+        farm_name=farm.name,
+        agent_name=f"{farm.agent.first_name} {farm.agent.last_name}" if farm.agent else "Unknown",
+        farmer_count=farmer_count,
+        cow_count=cow_count,
+        total_milk_production_liters=float(total_milk),
+        recent_milk_production_liters=float(recent_milk),
+        farm_status="Active" if farm.is_active else "Inactive",
+        location=farm.location,
+        size_acres=float(farm.size_acres) if farm.size_acres else None
+    )
+
+def legacy_farm_summary(db, farm_id=None):
+    if farm_id:
+        farm = db.query(Farm).filter(Farm.id == farm_id).first()
+        return legacy_farm(db, farm) if farm else None
+    farms = [legacy_farm(db, farm) for farm in db.query(Farm).all()]
+    return FarmSummary(
+        farm_id=None, farm_name="Overall", agent_name="N/A",
+        farmer_count=sum(farm.farmer_count for farm in farms),
+        cow_count=sum(farm.cow_count for farm in farms),
+        total_milk_production_liters=sum(farm.total_milk_production_liters for farm in farms),
+        recent_milk_production_liters=0, farm_status="N/A", location="N/A", size_acres=None
+    )
+
+@pytest.fixture(params=["raw", "rollups"])
+def seeded_app(request, empty_app, cold_caches):
+    """
+    The budget dataset plus the odd cases: a farm without an agent, cows or
+    records, a cow owned by an agent, and activities without a cost or with
+    other statuses. Read from raw records, or from rollups covering all dates
+    """
+    client, _, engine = empty_app
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    with engine.begin() as connection:
+        seed_dataset(connection, SIZES)
+        connection.execute(insert(Farm), {
+            "id": EMPTY_FARM_ID, "name": "Empty Farm", "agent_id": None, "location": None, "size_acres": None,
+            "is_active": False, "created_at": now, "updated_at": now,
+        })
+        connection.execute(insert(Cow), {
+            "id": 1000, "tag_number": "AGENT-1", "name": "Agent's Cow", "breed": "JERSEY", "farmer_id": 2,
+            "farm_id": 1, "date_of_birth": date(2020, 1, 1), "status": "ACTIVE", "is_pregnant": False,
+            "created_at": now, "updated_at": now,
+        })
+        connection.execute(insert(Activity), [
+            {
+                "title": f"Extra {status}", "activity_type": "MEDICATION", "cow_id": cow_id,
+                "scheduled_date": reportday.today() - timedelta(days=days), "status": status, "cost": cost,
+                "created_at": now, "updated_at": now,
+            }
+            for cow_id, days, status, cost in (
+                (1000, 1, "IN_PROGRESS", None), (7, 3, "CANCELLED", Decimal("7.25")), (8, 40, "COMPLETED", None),
+            )
+        ])
+        if request.param == "rollups":
+            connection.execute(insert(MilkRollupCoverage), {"start_date": date(2000, 1, 1), "end_date": None})
+    return client
+
+def assert_same(response, legacy):
+    """The endpoint's JSON against the old model; floats only up to rounding"""
+    assert response.status_code == 200
+    expected = legacy.model_dump(mode="json")
+    actual = response.json()
+    assert actual.keys() == expected.keys()
+    for key, value in expected.items():
+        if isinstance(value, float):
+            assert actual[key] == pytest.approx(value, rel=1e-12), key
+        else:
+            assert actual[key] == value, key
+
+def days_ago(days):
+    return (reportday.today() - timedelta(days=days)).isoformat()
+
+FILTERS = [
+    {},
+    {"farm_id": 1},
+    {"farm_id": 3},
+    {"farm_id": EMPTY_FARM_ID},
+    {"farm_id": 99},
+    {"from_date": days_ago(10)},
+    {"to_date": days_ago(35)},
+    {"from_date": days_ago(20), "to_date": days_ago(5), "farm_id": 2},
+    {"from_date": days_ago(-10)},
+]
+
+@pytest.mark.parametrize("params", FILTERS)
+def test_production_summary(seeded_app, params):
+    with database.SessionLocal() as db:
+        legacy = legacy_production_summary(db, **{
+            name: date.fromisoformat(value) if name.endswith("date") else value for name, value in params.items()
+        })
+    assert_same(seeded_app.get("/reports/production-summary", params=params), legacy)
+
+@pytest.mark.parametrize("params", FILTERS)
+def test_activity_summary(seeded_app, params):
+    with database.SessionLocal() as db:
+        legacy = legacy_activity_summary(db, **{
+            name: date.fromisoformat(value) if name.endswith("date") else value for name, value in params.items()
+        })
+    assert_same(seeded_app.get("/reports/activity-summary", params=params), legacy)
+
+def test_farm_summary_overall(seeded_app):
+    with database.SessionLocal() as db:
+        legacy = legacy_farm_summary(db)
+    assert_same(seeded_app.get("/reports/farm-summary"), legacy)
+
+@pytest.mark.parametrize("farm_id", [1, 2, 4, EMPTY_FARM_ID])
+def test_farm_summary_single(seeded_app, farm_id):
+    with database.SessionLocal() as db:
+        legacy = legacy_farm_summary(db, farm_id)
+    assert_same(seeded_app.get("/reports/farm-summary", params={"farm_id": farm_id}), legacy)
+
+def test_farm_summary_unknown_farm(seeded_app):
+    with database.SessionLocal() as db:
+        assert legacy_farm_summary(db, 99) is None
+    assert seeded_app.get("/reports/farm-summary", params={"farm_id": 99}).status_code == 404
+
+def test_include_farms_rows_match_single_farm_summaries(seeded_app):
+    response = seeded_app.get("/reports/farm-summary", params={"include_farms": True})
+    assert response.status_code == 200
+    rows = response.json()["farms"]
+    with database.SessionLocal() as db:
+        legacy = [legacy_farm(db, farm) for farm in db.query(Farm).order_by(Farm.id)]
+    assert [row["farm_id"] for row in rows] == [farm.farm_id for farm in legacy] == [1, 2, 3, 4, EMPTY_FARM_ID]
+    for row, farm in zip(rows, legacy):
+        expected = farm.model_dump(mode="json")
+        assert row == {**expected, **{
+            key: pytest.approx(value, rel=1e-12) for key, value in expected.items() if isinstance(value, float)
+        }}
+    assert rows[0]["cow_count"] == 7 and rows[0]["farmer_count"] == 2
+    assert rows[-1]["agent_name"] == "Unknown" and rows[-1]["total_milk_production_liters"] == 0.0